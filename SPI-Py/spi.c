@@ -2,6 +2,7 @@
  *	adapted for use in Python
  * 	by Louis Thiery
  * 	Lots more flexibility and cleanup by Connor Wolf (imaginaryindustries.com)
+ * 	10/2015: handling multiple SPI devices by Markus Schwaiger (lists (at) msedv.at)
  *
  * compile for Python using: "python setup.py build"
  * compiled module will be in "./build/lib.linux-armv6l-2.7/spi.so"
@@ -19,6 +20,7 @@
 
 #include <Python.h>
 #include <stdint.h>
+#include <errno.h>
 #include <unistd.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -28,25 +30,41 @@
 #include <linux/types.h>
 #include <linux/spi/spidev.h>
 
-static void pabort(const char *s)
-{
-	perror(s);
-	abort();
-}
+/*
+ * Each openSPI() call opens its own spidev file descriptor and returns it, so that several devices
+ * (e.g. CE0 and CE1) can be driven from the same process: transfer(), transfer_into() and closeSPI() take that fd.
+ * Mode, bits per word and speed are configured per fd; transfers use them by leaving the per-transfer
+ * overrides at 0.
+ *
+ * transfer_frames() batches several chip-select frames (e.g. a sequence of register accesses) in one
+ * SPI_IOC_MESSAGE(n) ioctl, saving a system call and a Python/C crossing per frame.
+ *
+ * Transfers run without the GIL. A transfer is a single SPI_IOC_MESSAGE ioctl, which spidev serializes
+ * per device, so concurrent transfers on the same fd never interleave on the bus. Closing an fd while
+ * another thread is transferring on it is up to the caller to prevent (the fd number may be reused).
+ */
 
-static const char *device = "/dev/spidev0.0";
-static uint8_t mode;
-static uint8_t bits = 8;
-static uint32_t speed = 500000;
-static uint16_t delay;
+static PyObject* spiError(int fd, const char *s)
+{
+	// Reports the failed ioctl as an OSError instead of aborting the whole interpreter
+	int err = errno;
 
-int ret = 0;
-int fd;
+	if (fd >= 0)
+		close(fd);
+	errno = err;
+	return PyErr_SetFromErrnoWithFilename(PyExc_OSError, s);
+}
 
 
 static PyObject* openSPI(PyObject *self, PyObject *args, PyObject *kwargs)
 {
-
+	int ret = 0;
+	int fd;
+	const char *device = "/dev/spidev0.0";
+	uint8_t mode = 0;
+	uint8_t bits = 8;
+	uint32_t speed = 500000;
+	uint16_t delay = 0;
 	static char* kwlist[] = {"device", "mode", "bits", "speed", "delay", NULL};
 
 	// Adding some sort of mode parsing would probably be a nice idea for the future, so you don't have to specify it as a bitfield
@@ -54,164 +72,361 @@ static PyObject* openSPI(PyObject *self, PyObject *args, PyObject *kwargs)
 	// For the moment the default mode ("0"), will probably work for 99% of people who need a SPI interface, so I'm not working on that
 	//
 
-
-	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|siiii:keywords", kwlist, &device, &mode, &bits, &speed, &delay))
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|sbbIH:openSPI", kwlist, &device, &mode, &bits, &speed, &delay))
 		return NULL;
-	// It's not clearly documented, but it seems that PyArg_ParseTupleAndKeywords basically only modifies the values passed to it if the
-	// keyword pertaining to that value is passed to the function. As such, the defaults specified by the variable definition are used
-	// unless you pass a kwd argument.
-	// Note that there isn't any proper bounds-checking, so if you pass a value that exceeds the variable size, it's just truncated before
-	// being stuffed into  the avasilable space. For example, passing a bits-per-word of 500 gets truncated to 244. Unfortunately, the
-	// PyArg_ParseTupleAndKeywords function only seems to support ints of 32 bits.
-
-	PyErr_Clear();
-
-	// printf("Mode: %i, Bits: %i, Speed: %i, Delay: %i\n", mode, bits, speed, delay);
-
-
+	// The values are locals, so a call no longer inherits the arguments of a previous call (the defaults above
+	// apply to every keyword not passed).
 
 	fd = open(device, O_RDWR);
 	if (fd < 0)
-		pabort("can't open device");
+		return spiError(-1, device);
 
 	/*
 	 * Setup SPI mode
 	 */
 	ret = ioctl(fd, SPI_IOC_WR_MODE, &mode);
 	if (ret == -1)
-		pabort("can't set spi mode");
+		return spiError(fd, "can't set spi mode");
 
 	ret = ioctl(fd, SPI_IOC_RD_MODE, &mode);
 	if (ret == -1)
-		pabort("can't get spi mode");
+		return spiError(fd, "can't get spi mode");
 
 	/*
 	 * bits per word
 	 */
 	ret = ioctl(fd, SPI_IOC_WR_BITS_PER_WORD, &bits);
 	if (ret == -1)
-		pabort("can't set bits per word");
+		return spiError(fd, "can't set bits per word");
 
 	ret = ioctl(fd, SPI_IOC_RD_BITS_PER_WORD, &bits);
 	if (ret == -1)
-		pabort("can't get bits per word");
+		return spiError(fd, "can't get bits per word");
 
 	/*
 	 * max speed hz
 	 */
 	ret = ioctl(fd, SPI_IOC_WR_MAX_SPEED_HZ, &speed);
 	if (ret == -1)
-		pabort("can't set max speed hz");
+		return spiError(fd, "can't set max speed hz");
 
 	ret = ioctl(fd, SPI_IOC_RD_MAX_SPEED_HZ, &speed);
 	if (ret == -1)
-		pabort("can't get max speed hz");
+		return spiError(fd, "can't get max speed hz");
 
-	// Stuff the various initilization parameters into a dict, and return that.
+	// Stuff the fd and the various initilization parameters into a dict, and return that.
 	// Note that the returned values may not be completely real. It seems that, at least for the speed value,
 	// the hardware only has several possible settings (250000, 500000, 1000000, etc...) Strangely enough, the
 	// ioctl for setting the speed *returns the speed you specify*. However, the hardware seems to default to the
 	// closest avalable value *below* the specified rate. (i.e. you will never get a speed faster then you spec),
 	// but you may get a slower value.
 
-	//It would probably be a good idea to bin-down the passed arguement to the available values, and return
-	// that.
-
-	PyObject* retDict;
-	retDict = PyDict_New();
-
-#if PY_MAJOR_VERSION >= 3
-	PyDict_SetItem(retDict, PyBytes_FromString("mode"), PyLong_FromLong((long)mode));
-	PyDict_SetItem(retDict, PyBytes_FromString("bits"), PyLong_FromLong((long)bits));
-	PyDict_SetItem(retDict, PyBytes_FromString("speed"), PyLong_FromLong((long)speed));
-	PyDict_SetItem(retDict, PyBytes_FromString("delay"), PyLong_FromLong((long)delay));
-#else
-	PyDict_SetItem(retDict, PyString_FromString("mode"), PyInt_FromLong((long)mode));
-	PyDict_SetItem(retDict, PyString_FromString("bits"), PyInt_FromLong((long)bits));
-	PyDict_SetItem(retDict, PyString_FromString("speed"), PyInt_FromLong((long)speed));
-	PyDict_SetItem(retDict, PyString_FromString("delay"), PyInt_FromLong((long)delay));
-#endif
-
+	PyObject* retDict = Py_BuildValue("{s:i,s:i,s:i,s:k,s:i}",
+					  "fd", fd, "mode", (int)mode, "bits", (int)bits,
+					  "speed", (unsigned long)speed, "delay", (int)delay);
+	if (retDict == NULL)
+		close(fd);
 
 	return retDict;
 }
 
 
 
-static PyObject* transfer(PyObject* self, PyObject* arg)
+/*
+ * tx data can be any object supporting the buffer protocol (bytes, bytearray, memoryview, array('B')), used in place,
+ * or, for compatibility, a tuple or a list of ints, copied to a temporary buffer.
+ * On success view is filled and must be released with PyBuffer_Release(); *copy is a PyMem buffer to be freed
+ * (NULL when the data was used in place).
+ */
+static int getTxBuffer(PyObject* data, Py_buffer* view, uint8_t** copy)
 {
-	PyObject* transferTuple;
+	*copy = NULL;
 
-	if(!PyArg_ParseTuple(arg, "O", &transferTuple))		// "O" - Gets non-NULL borrowed reference to Python argument.
-		return NULL;					// As far as I can tell, it's mostly just copying arg[0] into transferTuple
-								// and making sure at least one arg has been passed (I think)
+	if (PyObject_CheckBuffer(data))
+		return PyObject_GetBuffer(data, view, PyBUF_SIMPLE);
 
-	if(!PyTuple_Check(transferTuple))			// The only argument we support is a single tuple.
-		pabort("Only accepts a single tuple as an argument\n");
-
-
-	uint32_t tupleSize = PyTuple_Size(transferTuple);
+	if (!PyTuple_Check(data) && !PyList_Check(data))
+	{
+		PyErr_SetString(PyExc_TypeError, "data must be a bytes-like object or a tuple of ints");
+		return -1;
+	}
 
-	uint8_t tx[tupleSize];
-	uint8_t rx[tupleSize];
-	PyObject* tempItem;
+	Py_ssize_t size = PySequence_Fast_GET_SIZE(data);
+	PyObject** items = PySequence_Fast_ITEMS(data);
+	Py_ssize_t i;
 
-	uint16_t i=0;
+	*copy = PyMem_Malloc(size > 0 ? size : 1);
+	if (*copy == NULL)
+	{
+		PyErr_NoMemory();
+		return -1;
+	}
 
-	while(i < tupleSize)
+	for (i = 0; i < size; i++)
 	{
-		tempItem = PyTuple_GetItem(transferTuple, i);		//
 #if PY_MAJOR_VERSION >= 3
-		if(!PyLong_Check(tempItem))
+		if(!PyLong_Check(items[i]))
 #else
-		if(!PyInt_Check(tempItem))
+		if(!PyInt_Check(items[i]))
 #endif
 		{
-			pabort("non-integer contained in tuple\n");
+			PyMem_Free(*copy);
+			*copy = NULL;
+			PyErr_SetString(PyExc_TypeError, "non-integer contained in tuple");
+			return -1;
 		}
 #if PY_MAJOR_VERSION >= 3
-		tx[i] = (uint8_t)PyLong_AsSsize_t(tempItem);
+		(*copy)[i] = (uint8_t)PyLong_AsSsize_t(items[i]);
 #else
-		tx[i] = (uint8_t)PyInt_AsSsize_t(tempItem);
+		(*copy)[i] = (uint8_t)PyInt_AsSsize_t(items[i]);
 #endif
+	}
 
-		i++;
+	// The view only describes the copy, it does not own it
+	return PyBuffer_FillInfo(view, NULL, *copy, size, 1, PyBUF_SIMPLE);
+}
 
-	}
+static void releaseTxBuffer(Py_buffer* view, uint8_t* copy)
+{
+	PyBuffer_Release(view);
+	if (copy != NULL)
+		PyMem_Free(copy);
+}
 
+static int spiMessage(int fd, const void* tx, void* rx, Py_ssize_t len)
+{
+	// speed_hz and bits_per_word at 0 mean "the values set on this fd by openSPI", so that devices opened
+	// at different speeds do not override each other. cs_change = 0: the chip select is released at the end
+	// of the message, which is what frames a register access on the MFRC522.
 	struct spi_ioc_transfer tr = {
 		.tx_buf = (unsigned long)tx,
 		.rx_buf = (unsigned long)rx,
-		.len = tupleSize,
-		.delay_usecs = delay,
-		.speed_hz = speed,
-		.bits_per_word = bits,
-                .cs_change = 0,
+		.len = (uint32_t)len,
+		.delay_usecs = 0,
+		.speed_hz = 0,
+		.bits_per_word = 0,
+		.cs_change = 0,
 	};
 
+	int ret;
+
+	if (len == 0)
+		return 0;
+
+	// The GIL is released for the duration of the bus transaction, so that the other Python threads keep running.
+	// tx and rx stay valid: they are held by Py_buffer views (an exported bytearray cannot be resized) or owned
+	// by the caller. errno is preserved across Py_END_ALLOW_THREADS.
+	Py_BEGIN_ALLOW_THREADS
 	ret = ioctl(fd, SPI_IOC_MESSAGE(1), &tr);
-	if (ret < 1)
-		pabort("can't send spi message");
+	Py_END_ALLOW_THREADS
+
+	return ret < 1 ? -1 : 0;
+}
+
+
+static PyObject* transfer(PyObject* self, PyObject* arg)
+{
+	int fd;
+	PyObject* data;
+	Py_buffer tx;
+	uint8_t* copy;
+
+	if(!PyArg_ParseTuple(arg, "iO", &fd, &data))	// "O" - Gets non-NULL borrowed reference to Python argument.
+		return NULL;
+
+	if (getTxBuffer(data, &tx, &copy) < 0)
+		return NULL;
+
+	// The received bytes go straight into the returned object
+	PyObject* rx = PyBytes_FromStringAndSize(NULL, tx.len);
+	if (rx == NULL)
+	{
+		releaseTxBuffer(&tx, copy);
+		return NULL;
+	}
+
+	if (spiMessage(fd, tx.buf, PyBytes_AS_STRING(rx), tx.len) < 0)
+	{
+		releaseTxBuffer(&tx, copy);
+		Py_DECREF(rx);
+		return spiError(-1, "can't send spi message");
+	}
+
+	releaseTxBuffer(&tx, copy);
+	return rx;
+}
+
 
-	transferTuple = PyTuple_New(tupleSize);
-	for(i=0;i<tupleSize;i++)
-		PyTuple_SetItem(transferTuple, i, Py_BuildValue("i",rx[i]));
+static PyObject* transfer_into(PyObject* self, PyObject* arg)
+{
+	int fd;
+	PyObject* data;
+	Py_buffer tx;
+	Py_buffer rx;
+	uint8_t* copy;
+
+	if(!PyArg_ParseTuple(arg, "iOw*", &fd, &data, &rx))	// "w*" - writable buffer, e.g. a bytearray.
+		return NULL;
+
+	if (getTxBuffer(data, &tx, &copy) < 0)
+	{
+		PyBuffer_Release(&rx);
+		return NULL;
+	}
+
+	if (rx.len < tx.len)
+	{
+		releaseTxBuffer(&tx, copy);
+		PyBuffer_Release(&rx);
+		PyErr_SetString(PyExc_ValueError, "rx buffer is shorter than tx data");
+		return NULL;
+	}
+
+	// tx and rx may be the same buffer: spidev copies the tx data before clocking the bus
+	if (spiMessage(fd, tx.buf, rx.buf, tx.len) < 0)
+	{
+		releaseTxBuffer(&tx, copy);
+		PyBuffer_Release(&rx);
+		return spiError(-1, "can't send spi message");
+	}
 
-	return transferTuple;
+	Py_ssize_t len = tx.len;
+	releaseTxBuffer(&tx, copy);
+	PyBuffer_Release(&rx);
+	return PyLong_FromSsize_t(len);
 }
 
 
-static PyObject* closeSPI(PyObject* self,PyObject* args)
+/*
+ * Largest batch of transfer_frames(): SPI_IOC_MESSAGE(n) encodes n * sizeof(struct spi_ioc_transfer) in the
+ * 14 bit size field of the ioctl number.
+ */
+#define SPI_MAX_FRAMES ((1 << _IOC_SIZEBITS) / sizeof(struct spi_ioc_transfer) - 1)
+
+static PyObject* transfer_frames(PyObject* self, PyObject* arg)
 {
+	int fd;
+	int ret;
+	PyObject* frames;
+	PyObject* seq;
+	PyObject* rx = NULL;
+	Py_buffer* views;
+	struct spi_ioc_transfer* tr;
+	uint8_t* rx_buf;
+	Py_ssize_t n, i, m, got = 0, total = 0;
+
+	if(!PyArg_ParseTuple(arg, "iO", &fd, &frames))
+		return NULL;
+
+	seq = PySequence_Fast(frames, "frames must be a sequence of bytes-like objects");
+	if (seq == NULL)
+		return NULL;
+
+	n = PySequence_Fast_GET_SIZE(seq);
+	if (n > (Py_ssize_t)SPI_MAX_FRAMES)
+	{
+		Py_DECREF(seq);
+		return PyErr_Format(PyExc_ValueError, "at most %d frames per batch", (int)SPI_MAX_FRAMES);
+	}
+
+	views = PyMem_Calloc(n > 0 ? n : 1, sizeof(Py_buffer));
+	tr = PyMem_Calloc(n > 0 ? n : 1, sizeof(struct spi_ioc_transfer));
+	if (views == NULL || tr == NULL)
+	{
+		PyErr_NoMemory();
+		goto done;
+	}
+
+	for (got = 0; got < n; got++)
+	{
+		if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(seq, got), &views[got], PyBUF_SIMPLE) < 0)
+			goto done;
+		total += views[got].len;
+	}
+
+	// All the frames are received in the returned object, one after the other
+	rx = PyBytes_FromStringAndSize(NULL, total);
+	if (rx == NULL)
+		goto done;
+
+	rx_buf = (uint8_t*)PyBytes_AS_STRING(rx);
+	m = 0;
+	for (i = 0; i < n; i++)
+	{
+		if (views[i].len == 0)
+			continue;
+		tr[m].tx_buf = (unsigned long)views[i].buf;
+		tr[m].rx_buf = (unsigned long)rx_buf;
+		tr[m].len = (uint32_t)views[i].len;
+		// cs_change = 1 between the frames: the MFRC522 takes each chip-select frame as one register access
+		tr[m].cs_change = 1;
+		rx_buf += views[i].len;
+		m++;
+	}
+
+	if (m > 0)
+	{
+		// cs_change on the last transfer would keep the device selected after the message
+		tr[m - 1].cs_change = 0;
+
+		Py_BEGIN_ALLOW_THREADS
+		ret = ioctl(fd, SPI_IOC_MESSAGE(m), tr);
+		Py_END_ALLOW_THREADS
+
+		if (ret < 1)
+		{
+			Py_CLEAR(rx);
+			spiError(-1, "can't send spi message");
+		}
+	}
+
+done:
+	for (i = 0; i < got; i++)
+		PyBuffer_Release(&views[i]);
+	PyMem_Free(views);
+	PyMem_Free(tr);
+	Py_DECREF(seq);
+	return rx;
+}
+
+
+static PyObject* setSpeed(PyObject* self, PyObject* args)
+{
+	int fd;
+	uint32_t speed;
+
+	if(!PyArg_ParseTuple(args, "iI", &fd, &speed))
+		return NULL;
+
+	// As in openSPI(), the driver reports the speed requested: the controller may run at the closest lower rate
+	if (ioctl(fd, SPI_IOC_WR_MAX_SPEED_HZ, &speed) == -1)
+		return spiError(-1, "can't set max speed hz");
+	if (ioctl(fd, SPI_IOC_RD_MAX_SPEED_HZ, &speed) == -1)
+		return spiError(-1, "can't get max speed hz");
+
+	return PyLong_FromUnsignedLong(speed);
+}
+
+
+static PyObject* closeSPI(PyObject* self, PyObject* args)
+{
+	int fd;
+
+	if(!PyArg_ParseTuple(args, "i", &fd))
+		return NULL;
+
 	close(fd);
 	Py_RETURN_NONE;
 }
 
 static PyMethodDef SpiMethods[] =
 {
-	{"openSPI", (PyCFunction)openSPI, METH_VARARGS | METH_KEYWORDS, "Open SPI Port."},
-	{"transfer", (PyCFunction)transfer, METH_VARARGS, "Transfer data."},
-	{"closeSPI", (PyCFunction)closeSPI, METH_NOARGS, "Close SPI port."},
+	{"openSPI", (PyCFunction)openSPI, METH_VARARGS | METH_KEYWORDS, "Open SPI Port, returns a dict with its fd."},
+	{"transfer", (PyCFunction)transfer, METH_VARARGS, "Transfer data on the fd returned by openSPI, returns the bytes received."},
+	{"transfer_into", (PyCFunction)transfer_into, METH_VARARGS, "Transfer data on the fd returned by openSPI, writing the bytes received into a bytearray."},
+	{"transfer_frames", (PyCFunction)transfer_frames, METH_VARARGS, "Transfer a sequence of frames on the fd returned by openSPI, in one message, returns the bytes received by all the frames."},
+	{"setSpeed", (PyCFunction)setSpeed, METH_VARARGS, "Change the max speed of the fd returned by openSPI, returns the speed set."},
+	{"closeSPI", (PyCFunction)closeSPI, METH_VARARGS, "Close SPI port."},
 	{NULL, NULL, 0, NULL}
 };
 
@@ -12,7 +12,7 @@ while True:
     (status, uid_data) = reader.scan(scan_once=False)  # uid_data is 5 bytes: UID (4 bytes) | checksum (1 byte)
 
     if status == reader.STATUS_OK:
-        print(f"Found tag {uid_data[0:4]}")
+        print(f"Found tag {uid_data[0:4].hex()}")
 
         print("2 >>> select_tag(...) --- Select the tag")
         status = reader.select_tag(uid_data)
@@ -30,7 +30,7 @@ while True:
             (status, read_data) = reader.read_block(block_number)
 
             if status == reader.STATUS_OK:
-                print(f"Block {block_number}: {bytes(read_data).hex()}")
+                print(f"Block {block_number}: {read_data.hex()}")
 
             print("write_block(...) --- Write a block")
             # Write only the 3rd, 4th and 5th byte of the block 4 (sector 1, block 0)
@@ -42,12 +42,13 @@ while True:
             if status == reader.STATUS_OK:
                 (status, read_data) = reader.read_block(block_number)
                 if status == reader.STATUS_OK:
-                    print(f"Block {block_number} new data: {bytes(read_data).hex()}")
+                    print(f"Block {block_number} new data: {read_data.hex()}")
 
             print("dump() --- Dump the entire tag")
             (status, dump_data) = reader.dump()
             if status == reader.STATUS_OK:
                 print("Entire dump:")
-                print(dump_data)
+                for i in range(0, len(dump_data), 16):
+                    print(f"{i // 16:3d}: {dump_data[i:i + 16].hex()}")
 
             time.sleep(1)
@@ -1,8 +1,15 @@
 __version__ = "1.0.0"
 
-try:
-    from .rc522 import RC522
-    from .rc522manager import RC522Manager
-    from .utils import get_block_number, get_block_repr, get_access_bits
-except RuntimeError:
-    print("Must be used on Raspberry Pi")
+from .rc522 import RC522
+from .rc522manager import RC522Manager
+from .ultralight import UltralightReader
+from .async_manager import AsyncRC522Manager
+from .scheduler import PollScheduler
+from .events import TagEvent, PresenceTracker
+from .keyring import KeyRing, KeyHintCache
+from .metrics import Metrics, prometheus_text
+from .transport import Transport, SpiTransport, MeteredTransport
+from .tag_image import TagImage
+from .simulator import MFRC522Simulator, MifareClassicTag, MifareUltralightTag, NTAGTag, TimingModel
+from .utils import get_block_number, get_block_repr, get_access_bits, calculate_crc_a, get_sector_number, \
+    get_sector_size, get_trailer_block_number, get_blocks_number, get_value_block, parse_value_block
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from .events import PresenceTracker, TagEvent
+from .keyring import KeyRing
+from .rc522manager import RC522Manager
+
+
+class AsyncRC522Manager:
+    """
+    Asyncio front end of RC522Manager.
+
+    All the SPI traffic runs in a single dedicated executor thread, so the calls are serialized and the event loop
+    never stalls on the reader; the waits between two scans use asyncio.sleep().
+
+    Example:
+        async with AsyncRC522Manager() as reader:
+            async for event in reader.events():
+                if event.kind == TagEvent.ARRIVED:
+                    ...
+    """
+
+    DEFAULT_SCAN_INTERVAL = RC522Manager.DEFAULT_SCAN_INTERVAL
+    DEFAULT_DEPARTURE_MISSES = PresenceTracker.DEFAULT_DEPARTURE_MISSES
+
+    STATUS_OK = RC522Manager.STATUS_OK
+    STATUS_NO_TAG_ERR = RC522Manager.STATUS_NO_TAG_ERR
+    STATUS_ERR = RC522Manager.STATUS_ERR
+
+    def __init__(self, manager: RC522Manager | None = None, **kwargs):
+        """
+        :param manager: manager to drive, None to create one with kwargs (device, speed, debug, transport)
+        """
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rc522")
+        self.manager: RC522Manager = manager if manager is not None else RC522Manager(**kwargs)
+
+    async def __aenter__(self) -> "AsyncRC522Manager":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs a blocking function in the reader thread, serialized with the other operations: e.g. a sequence of
+        manager calls that must not be interleaved with the others, or a method of UltralightReader.
+        :param function: function to run, with its args and kwargs
+        :return: the result of the function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(function, *args, **kwargs))
+
+    async def close(self):
+        """
+        Waits for the pending operations and stops the reader thread.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+
+    async def scan(self, scan_interval: float = DEFAULT_SCAN_INTERVAL, scan_once: bool = False) -> (int, bytes):
+        """
+        Scans for a tag once or until a tag appears, as RC522Manager.scan(), sleeping asynchronously between scans.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+        """
+        while True:
+            (status, uid_data) = await self.run(self.manager.scan, scan_once=True)
+            if status == self.STATUS_OK or scan_once:
+                return status, uid_data
+            await asyncio.sleep(scan_interval)
+
+    async def select_tag(self, uid_data) -> int:
+        return await self.run(self.manager.select_tag, uid_data)
+
+    def set_auth(self, auth_method: int = RC522Manager.DEFAULT_AUTH_METHOD, key: list[int] = RC522Manager.DEFAULT_KEY):
+        self.manager.set_auth(auth_method=auth_method, key=key)
+
+    def reset_auth(self):
+        self.manager.reset_auth()
+
+    def set_key_ring(self, key_ring: KeyRing | None):
+        self.manager.set_key_ring(key_ring)
+
+    async def read_block(self, block_number: int) -> (int, bytes):
+        return await self.run(self.manager.read_block, block_number)
+
+    async def write_block(self, block_number: int, new_bytes) -> int:
+        return await self.run(self.manager.write_block, block_number, new_bytes)
+
+    async def write_blocks(self, blocks: dict[int, bytes | list[int | None]],
+                           image: bytearray | list[list[int]] | None = None) -> int:
+        return await self.run(self.manager.write_blocks, blocks, image)
+
+    async def dump(self, sectors_number: int = RC522Manager.DEFAULT_SECTORS_NUMBER) -> (int, bytearray):
+        return await self.run(self.manager.dump, sectors_number)
+
+    async def events(self, scan_interval: float = DEFAULT_SCAN_INTERVAL,
+                     departure_misses: int = DEFAULT_DEPARTURE_MISSES) -> AsyncIterator[TagEvent]:
+        """
+        Scans continuously with RC522Manager.presence_scan(), yielding the arrival and departure of the tags.
+        The reader is not polled while the consumer handles an event, and an arrived tag is already selected, so it
+        can be authenticated, read and written before asking for the next event.
+        :param scan_interval: seconds between two scans
+        :param departure_misses: consecutive scans without the tag before its departure
+        :return: async iterator of TagEvent
+        """
+        tracker = PresenceTracker(departure_misses)
+
+        while True:
+            (status, uid) = await self.run(self.manager.presence_scan)
+
+            for event in tracker.update(uid if status == self.STATUS_OK else None):
+                yield event
+
+            await asyncio.sleep(scan_interval)
@@ -0,0 +1 @@
+from .benchmark import Benchmark, OPERATIONS, compare, load_baseline, save_baseline
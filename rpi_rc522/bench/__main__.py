@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import argparse
+import sys
+
+from .benchmark import Benchmark, OPERATIONS, WAIT_STRATEGIES, compare, load_baseline, save_baseline
+
+
+def build_transport(args):
+    if args.backend == "spi":
+        from ..transport import SpiTransport
+        return SpiTransport(device=args.device, speed=args.speed,
+                            pin_irq=args.pin_irq if "irq" in args.wait_strategies else None)
+
+    from ..simulator import MFRC522Simulator, MifareClassicTag, TimingModel
+    timing = TimingModel(spi_speed=args.speed, realtime=not args.instant)
+    tag = MifareClassicTag(size=4096 if args.sectors > 16 else 1024)
+    return MFRC522Simulator(tags=[tag], timing=timing)
+
+
+def print_results(results: dict):
+    print(f"{'operation':<12}{'n':>6}{'fail':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'SPI tx':>10}{'SPI B':>10}{'bus ms':>10}{'sleep ms':>10}")
+    for (operation, r) in results["operations"].items():
+        latency = r["latency_ms"]
+        print(f"{operation:<12}{r['samples']:>6}{r['failures']:>6}{latency['p50']:>10.3f}{latency['p95']:>10.3f}"
+              f"{latency['p99']:>10.3f}{r['spi_transactions']:>10.1f}{r['spi_bytes']:>10.1f}{r['bus_ms']:>10.3f}"
+              f"{r['sleep_ms']:>10.3f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m rpi_rc522.bench",
+                                     description="Latency and SPI traffic benchmark of the RC522 operations.")
+    parser.add_argument("--backend", choices=("sim", "spi"), default="sim",
+                        help="simulated reader and tag (default) or real reader, with a MIFARE Classic tag on it")
+    parser.add_argument("--device", default="/dev/spidev0.0", help="SPI device of the real reader")
+    parser.add_argument("--speed", type=int, default=1000000, help="SPI clock in Hz")
+    parser.add_argument("--instant", action="store_true", help="simulator only: no timing model, logic only")
+    parser.add_argument("-n", "--iterations", type=int, default=100, help="samples per operation")
+    parser.add_argument("--ops", default=",".join(OPERATIONS), help="comma separated operations to run")
+    parser.add_argument("--block", type=int, default=4, help="block used by auth, read and write")
+    parser.add_argument("--sectors", type=int, default=16, help="sectors read by dump")
+    parser.add_argument("--wait-strategy", default="hybrid",
+                        help=f"how the reader waits for the chip: {', '.join(WAIT_STRATEGIES)}, a comma separated "
+                             f"list or all, to compare them")
+    parser.add_argument("--pin-irq", type=int, default=24, help="BCM pin of the IRQ of the real reader, for irq")
+    parser.add_argument("--label", default="", help="label stored in the results, e.g. the commit")
+    parser.add_argument("-o", "--output", help="save the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against a JSON baseline, exit with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative increase considered a regression")
+    args = parser.parse_args(argv)
+
+    operations = [operation.strip() for operation in args.ops.split(",") if operation.strip()]
+    for operation in operations:
+        if operation not in OPERATIONS:
+            parser.error(f"unknown operation {operation}, choose from {', '.join(OPERATIONS)}")
+
+    if args.wait_strategy == "all":
+        args.wait_strategies = list(WAIT_STRATEGIES)
+    else:
+        args.wait_strategies = [strategy.strip() for strategy in args.wait_strategy.split(",") if strategy.strip()]
+    if not args.wait_strategies:
+        parser.error(f"no wait strategy, choose from {', '.join(WAIT_STRATEGIES)} or all")
+    for strategy in args.wait_strategies:
+        if strategy not in WAIT_STRATEGIES:
+            parser.error(f"unknown wait strategy {strategy}, choose from {', '.join(WAIT_STRATEGIES)} or all")
+    if len(args.wait_strategies) > 1 and (args.output or args.baseline):
+        parser.error("a baseline is saved or compared for a single wait strategy")
+
+    transport = build_transport(args)
+    for strategy in args.wait_strategies:
+        benchmark = Benchmark(transport, block_number=args.block, sectors_number=args.sectors, wait_strategy=strategy)
+        results = benchmark.run(operations, iterations=args.iterations, label=args.label or args.backend)
+        if len(args.wait_strategies) > 1:
+            print(f"wait strategy: {strategy}")
+        print_results(results)
+
+    if args.output:
+        save_baseline(results, args.output)
+
+    if args.baseline:
+        regressions = compare(load_baseline(args.baseline), results, threshold=args.threshold)
+        for regression in regressions:
+            print(f"[e] regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+import json
+import platform
+import time
+from typing import Callable
+
+from ..rc522 import RC522
+from ..rc522manager import RC522Manager
+from ..transport import Transport, MeteredTransport
+
+OPERATIONS = ("scan", "select", "scan_select", "auth", "read", "write", "dump", "presence")
+WAIT_STRATEGIES = {
+    "sleep": RC522.WAIT_SLEEP,
+    "spin": RC522.WAIT_SPIN,
+    "hybrid": RC522.WAIT_HYBRID,
+    "irq": RC522.WAIT_IRQ,
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile.
+    :param sorted_values: values, sorted in ascending order
+    :param p: percentile, from 0 to 100
+    :return: the percentile, 0 if there are no values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+class Benchmark:
+    """
+    Runs the RC522Manager operations N times and collects their latency, SPI traffic and sleeping time.
+
+    Every sample runs the setup the operation needs (e.g. scan and select before auth), then measures only the
+    operation itself:
+        - scan: scan(scan_once=True)
+        - select: select_tag()
+        - scan_select: scan(scan_once=True) and select_tag(), with the tag selected by the previous sample
+        - auth: auth(force=True) of the benchmark block
+        - read: a single READ of the benchmark block, already authenticated (RC522.read_block(), without the sector
+          load of the tag image of RC522Manager.read_block())
+        - write: write_block() of the benchmark block with 16 bytes, already authenticated
+        - dump: dump() of the whole tag
+        - presence: presence_scan() with the tag already parked, i.e. a poll of watch() with the tag in the field
+    """
+
+    def __init__(self, transport: Transport, block_number: int = 4, sectors_number: int = 16, debug: bool = False,
+                 wait_strategy: str = "hybrid"):
+        """
+        :param transport: transport of the reader, wrapped in a MeteredTransport
+        :param block_number: block used by auth, read and write
+        :param sectors_number: sectors read by dump
+        :param debug: True to print debug messages
+        :param wait_strategy: how the reader waits for the chip, one of WAIT_STRATEGIES ("irq" needs a transport
+                              with the IRQ pin)
+        """
+        self.transport = MeteredTransport(transport)
+        self.wait_strategy = wait_strategy
+        self.manager = RC522Manager(transport=self.transport, debug=debug,
+                                    wait_strategy=WAIT_STRATEGIES[wait_strategy])
+        self.block_number = block_number
+        self.sectors_number = sectors_number
+
+    # --- Setup steps ---
+
+    def __scan(self) -> bytes:
+        (status, uid_data) = self.manager.scan(scan_once=True)
+        if status != RC522Manager.STATUS_OK:
+            raise RuntimeError("no tag found")
+        return uid_data
+
+    def __select(self):
+        if self.manager.select_tag(self.__scan()) != RC522Manager.STATUS_OK:
+            raise RuntimeError("tag selection failed")
+        self.manager.set_auth()
+
+    def __authenticate(self):
+        self.__select()
+        if self.manager.auth(self.block_number, force=True) != RC522Manager.STATUS_OK:
+            raise RuntimeError("authentication failed")
+
+    def __scan_select(self) -> int:
+        (status, uid_data) = self.manager.scan(scan_once=True)
+        if status != RC522Manager.STATUS_OK:
+            return status
+        return self.manager.select_tag(uid_data)
+
+    def __prepare(self, operation: str) -> Callable[[], int]:
+        """
+        Runs the setup of an operation.
+        :return: function that runs the operation and returns its status
+        """
+        manager = self.manager
+        if operation == "scan":
+            return lambda: manager.scan(scan_once=True)[0]
+        if operation == "select":
+            uid_data = self.__scan()
+            return lambda: manager.select_tag(uid_data)
+        if operation == "scan_select":
+            self.__select()
+            return self.__scan_select
+        if operation == "auth":
+            self.__select()
+            return lambda: manager.auth(self.block_number, force=True)
+        if operation == "read":
+            self.__authenticate()
+            return lambda: manager.reader.read_block(self.block_number)[0]
+        if operation == "write":
+            self.__authenticate()
+            data = [(self.block_number + i) & 0xFF for i in range(16)]
+            return lambda: manager.write_block(self.block_number, data)
+        if operation == "dump":
+            self.__select()
+            return lambda: manager.dump(self.sectors_number)[0]
+        if operation == "presence":
+            if manager.presence_scan()[0] != RC522Manager.STATUS_OK:
+                raise RuntimeError("no tag found")
+            return lambda: manager.presence_scan()[0]
+        raise ValueError(f"unknown operation {operation}")
+
+    # --- Runs ---
+
+    def run_operation(self, operation: str, iterations: int) -> dict:
+        """
+        Runs an operation N times.
+        :param operation: one of OPERATIONS
+        :param iterations: number of samples
+        :return: results of the operation, as stored in the baseline
+        """
+        latencies = []
+        transactions = 0
+        spi_bytes = 0
+        bus_s = 0.0
+        sleep_s = 0.0
+        failures = 0
+
+        for _ in range(iterations):
+            try:
+                run = self.__prepare(operation)
+            except RuntimeError:
+                failures += 1
+                continue
+
+            self.transport.reset_counters()
+            sleep_start = self.manager.reader.sleep_s
+            start = time.perf_counter()
+            status = run()
+            latencies.append(time.perf_counter() - start)
+
+            transactions += self.transport.transactions
+            spi_bytes += self.transport.bytes
+            bus_s += self.transport.bus_s
+            sleep_s += self.manager.reader.sleep_s - sleep_start
+            if status != RC522Manager.STATUS_OK:
+                failures += 1
+
+        samples = len(latencies)
+        latencies.sort()
+        return {
+            "samples": samples,
+            "failures": failures,
+            "latency_ms": {
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+                "mean": sum(latencies) / samples * 1000 if samples else 0.0,
+                "min": latencies[0] * 1000 if samples else 0.0,
+                "max": latencies[-1] * 1000 if samples else 0.0,
+            },
+            "spi_transactions": transactions / samples if samples else 0.0,
+            "spi_bytes": spi_bytes / samples if samples else 0.0,
+            "bus_ms": bus_s / samples * 1000 if samples else 0.0,
+            "sleep_ms": sleep_s / samples * 1000 if samples else 0.0,
+        }
+
+    def run(self, operations=OPERATIONS, iterations: int = 100, label: str = "") -> dict:
+        """
+        Runs the given operations N times each.
+        :param operations: names of the operations, from OPERATIONS
+        :param iterations: number of samples per operation
+        :param label: free text stored in the results, e.g. the commit or the backend
+        :return: results, in the baseline format
+        """
+        return {
+            "meta": {
+                "label": label,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "iterations": iterations,
+                "transport": type(self.transport.transport).__name__,
+                "wait_strategy": self.wait_strategy,
+            },
+            "operations": {operation: self.run_operation(operation, iterations) for operation in operations},
+        }
+
+
+def save_baseline(results: dict, path: str):
+    """
+    Saves benchmark results as a JSON baseline.
+    """
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> dict:
+    """
+    Loads a JSON baseline saved by save_baseline().
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, results: dict, threshold: float = 0.10) -> list[str]:
+    """
+    Compares benchmark results against a baseline.
+    :param baseline: results of the reference run
+    :param results: results of the current run
+    :param threshold: relative increase considered a regression (0.10 = +10 %)
+    :return: descriptions of the regressions, empty if there are none
+    """
+    regressions = []
+    for operation, current in results["operations"].items():
+        reference = baseline.get("operations", {}).get(operation)
+        if reference is None:
+            continue
+        metrics = [(f"latency {p}", reference["latency_ms"][p], current["latency_ms"][p]) for p in ("p50", "p95")]
+        metrics.append(("SPI transactions", reference["spi_transactions"], current["spi_transactions"]))
+        metrics.append(("SPI bytes", reference["spi_bytes"], current["spi_bytes"]))
+        for (name, old, new) in metrics:
+            if old > 0 and (new - old) / old > threshold:
+                regressions.append(f"{operation}: {name} {old:.2f} -> {new:.2f} (+{(new - old) / old:.0%})")
+    return regressions
@@ -0,0 +1,3 @@
+from .server import ReaderDaemon
+from .client import ReaderClient
+from .protocol import DEFAULT_SOCKET_PATH
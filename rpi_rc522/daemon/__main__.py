@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import signal
+import sys
+
+from .protocol import DEFAULT_SOCKET_PATH
+from .server import ReaderDaemon
+from ..rc522 import RC522
+from ..rc522manager import RC522Manager
+
+
+def build_manager(args) -> RC522Manager:
+    if args.backend == "spi":
+        return RC522Manager(device=args.device, speed=args.speed, debug=args.debug, pin_rst=args.pin_rst,
+                            auto_speed=args.auto_speed)
+
+    from ..simulator import MFRC522Simulator, MifareClassicTag
+    return RC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag()]), debug=args.debug)
+
+
+async def serve(daemon: ReaderDaemon):
+    async with daemon:
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, task.cancel)
+        try:
+            await daemon.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m rpi_rc522.daemon",
+                                     description="Reader daemon: owns the RC522 and serves the tag events and the "
+                                                 "read/write requests of the local processes on a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="path of the Unix socket")
+    parser.add_argument("--mode", type=lambda value: int(value, 8), default=ReaderDaemon.DEFAULT_MODE,
+                        help="permissions of the socket, in octal")
+    parser.add_argument("--backend", choices=("spi", "sim"), default="spi",
+                        help="real reader (default) or simulated reader with a MIFARE Classic tag on it")
+    parser.add_argument("--device", default=RC522Manager.DEFAULT_DEV, help="SPI device of the reader")
+    parser.add_argument("--speed", type=int, default=RC522Manager.DEFAULT_SPEED, help="SPI clock in Hz")
+    parser.add_argument("--auto-speed", action="store_true", help="raise the SPI clock to the highest reliable rate")
+    parser.add_argument("--pin-rst", type=int, default=RC522.PIN_RST_BCM, help="BCM pin of the reset of the reader")
+    parser.add_argument("--scan-interval", type=float, default=ReaderDaemon.DEFAULT_SCAN_INTERVAL,
+                        help="seconds between two scans")
+    parser.add_argument("--departure-misses", type=int, default=ReaderDaemon.DEFAULT_DEPARTURE_MISSES,
+                        help="consecutive scans without the tag before its departure")
+    parser.add_argument("--max-pending", type=int, default=ReaderDaemon.DEFAULT_MAX_PENDING,
+                        help="queued requests per client")
+    parser.add_argument("--max-events", type=int, default=ReaderDaemon.DEFAULT_MAX_EVENTS,
+                        help="unsent events per client, the next ones are dropped")
+    parser.add_argument("--debug", action="store_true", help="print debug messages")
+    args = parser.parse_args(argv)
+
+    daemon = ReaderDaemon(build_manager(args), path=args.socket, scan_interval=args.scan_interval,
+                          departure_misses=args.departure_misses, max_pending=args.max_pending,
+                          max_events=args.max_events, mode=args.mode)
+    asyncio.run(serve(daemon))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
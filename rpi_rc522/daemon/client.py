@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+import itertools
+import json
+import socket
+from collections import deque
+from typing import Iterator
+
+from . import protocol
+from ..events import TagEvent
+from ..rc522manager import RC522Manager
+
+
+class ReaderClient:
+    """
+    Blocking client of a ReaderDaemon.
+
+    The requests wait for their response; the events received meanwhile are kept and returned by events().
+    A key can be passed to the requests of the MIFARE Classic tags, otherwise the daemon uses its own keys; a uid makes
+    the request fail with STATUS_NO_TAG_ERR if another tag is in the field.
+
+    Example:
+        with ReaderClient() as client:
+            client.subscribe()
+            for event in client.events():
+                if event.kind == TagEvent.ARRIVED:
+                    (status, data) = client.read_block(4, uid=event.uid)
+    """
+
+    STATUS_OK = RC522Manager.STATUS_OK
+    STATUS_NO_TAG_ERR = RC522Manager.STATUS_NO_TAG_ERR
+    STATUS_ERR = RC522Manager.STATUS_ERR
+
+    def __init__(self, path: str = protocol.DEFAULT_SOCKET_PATH, timeout: float | None = None):
+        """
+        :param path: path of the socket of the daemon
+        :param timeout: seconds to wait for a response or an event, None to wait forever
+        """
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        self.__socket.connect(path)
+        self.__file = self.__socket.makefile("rb")
+        self.__ids = itertools.count(1)
+        self.__events: deque[dict] = deque()
+        self.dropped = 0  # events dropped by the daemon because this client did not keep up
+
+    def __enter__(self) -> "ReaderClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.__file.close()
+        self.__socket.close()
+
+    def __receive(self) -> dict:
+        line = self.__file.readline(protocol.MAX_LINE)
+        if not line:
+            raise ConnectionError("connection closed by the daemon")
+        return json.loads(line)
+
+    def request(self, op: str, **params) -> dict:
+        """
+        Sends a request and waits for its response.
+        :param op: operation, see protocol
+        :param params: parameters of the operation, bytes are sent as hex
+        :return: the response
+        """
+        request_id = next(self.__ids)
+        request = {"id": request_id, "op": op}
+        for (name, value) in params.items():
+            if value is not None:
+                request[name] = value.hex() if isinstance(value, (bytes, bytearray)) else value
+        self.__socket.sendall(protocol.encode(request))
+
+        while True:
+            message = self.__receive()
+            if "event" in message:
+                self.__events.append(message)
+            elif message.get("id") == request_id:
+                return message
+
+    def subscribe(self) -> bytes | None:
+        """
+        Subscribes to the arrival and departure of the tags.
+        :return: UID of the tag in the field, None if there is none
+        """
+        uid = self.request(protocol.SUBSCRIBE)["uid"]
+        return bytes.fromhex(uid) if uid is not None else None
+
+    def unsubscribe(self):
+        self.request(protocol.UNSUBSCRIBE)
+
+    def events(self) -> Iterator[TagEvent]:
+        """
+        :return: iterator of the TagEvents, see subscribe()
+        """
+        while True:
+            message = self.__events.popleft() if self.__events else self.__receive()
+            if "event" in message:
+                self.dropped += message.get("dropped", 0)
+                yield protocol.parse_event(message)
+
+    def read_block(self, block_number: int, key: bytes | None = None, key_type: str = "A",
+                   uid: bytes | None = None) -> (int, bytes):
+        response = self.request(protocol.READ_BLOCK, block=block_number, key=key, key_type=key_type, uid=uid)
+        return response["status"], bytes.fromhex(response.get("data", ""))
+
+    def write_block(self, block_number: int, data: bytes, key: bytes | None = None, key_type: str = "A",
+                    uid: bytes | None = None) -> int:
+        return self.request(protocol.WRITE_BLOCK, block=block_number, data=bytes(data), key=key, key_type=key_type,
+                            uid=uid)["status"]
+
+    def read_value(self, block_number: int, key: bytes | None = None, key_type: str = "A",
+                   uid: bytes | None = None) -> (int, int | None):
+        response = self.request(protocol.READ_VALUE, block=block_number, key=key, key_type=key_type, uid=uid)
+        return response["status"], response.get("value")
+
+    def increment(self, block_number: int, delta: int, transfer_block: int | None = None, key: bytes | None = None,
+                  key_type: str = "A", uid: bytes | None = None) -> int:
+        return self.request(protocol.INCREMENT, block=block_number, delta=delta, transfer_block=transfer_block,
+                            key=key, key_type=key_type, uid=uid)["status"]
+
+    def decrement(self, block_number: int, delta: int, transfer_block: int | None = None, key: bytes | None = None,
+                  key_type: str = "A", uid: bytes | None = None) -> int:
+        return self.request(protocol.DECREMENT, block=block_number, delta=delta, transfer_block=transfer_block,
+                            key=key, key_type=key_type, uid=uid)["status"]
+
+    def dump(self, sectors_number: int = RC522Manager.DEFAULT_SECTORS_NUMBER, key: bytes | None = None,
+             key_type: str = "A", uid: bytes | None = None) -> (int, bytes):
+        response = self.request(protocol.DUMP, sectors=sectors_number, key=key, key_type=key_type, uid=uid)
+        return response["status"], bytes.fromhex(response.get("data", ""))
+
+    def read_pages(self, start_page: int, count: int, uid: bytes | None = None) -> (int, bytes):
+        response = self.request(protocol.READ_PAGES, page=start_page, count=count, uid=uid)
+        return response["status"], bytes.fromhex(response.get("data", ""))
+
+    def write_pages(self, start_page: int, data: bytes, uid: bytes | None = None) -> int:
+        return self.request(protocol.WRITE_PAGES, page=start_page, data=bytes(data), uid=uid)["status"]
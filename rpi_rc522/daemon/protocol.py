@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Protocol between ReaderDaemon and its clients: one JSON object per line, UTF-8, on a Unix stream socket.
+
+Requests (client -> daemon):
+    {"id": 1, "op": "read_block", "block": 4, "key": "ffffffffffff", "key_type": "A", "uid": "12345678"}
+    "id" is copied in the response, "uid" (optional) makes the request fail with status 1 if another tag is in the
+    field, "key" and "key_type" (optional) override the keys of the daemon for this request only.
+Responses (daemon -> client):
+    {"id": 1, "status": 0, "data": "000102..."}
+    "status" is the RC522 status (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR), "error" explains the invalid requests.
+Events (daemon -> subscribed clients):
+    {"event": "arrived", "uid": "12345678", "timestamp": 1700000000.0, "dropped": 3}
+    "dropped" (only when non-zero) counts the events lost before this one because the client did not keep up.
+Bytes are hex strings.
+"""
+import json
+
+from ..events import TagEvent
+
+DEFAULT_SOCKET_PATH = "/run/rc522.sock"
+MAX_LINE = 64 * 1024  # longest message, a 4K dump is 8 KiB of hex
+
+# Operations answered by the daemon without the reader
+SUBSCRIBE = "subscribe"
+UNSUBSCRIBE = "unsubscribe"
+STATUS = "status"
+
+# Operations run on the tag in the field, one at a time
+READ_BLOCK = "read_block"
+WRITE_BLOCK = "write_block"
+READ_VALUE = "read_value"
+INCREMENT = "increment"
+DECREMENT = "decrement"
+DUMP = "dump"
+READ_PAGES = "read_pages"
+WRITE_PAGES = "write_pages"
+
+
+def encode(message: dict) -> bytes:
+    """
+    :param message: request, response or event
+    :return: the line sent on the socket
+    """
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def event_message(event: TagEvent, dropped: int = 0) -> dict:
+    """
+    :param event: arrival or departure of a tag
+    :param dropped: events lost before this one
+    :return: the event message
+    """
+    message = {"event": event.kind, "uid": event.uid.hex(), "timestamp": event.timestamp}
+    if dropped:
+        message["dropped"] = dropped
+    return message
+
+
+def parse_event(message: dict) -> TagEvent:
+    """
+    :param message: event message
+    :return: the TagEvent
+    """
+    return TagEvent(message["event"], bytes.fromhex(message["uid"]), message["timestamp"])
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import os
+import stat
+from collections import deque
+
+from . import protocol
+from ..async_manager import AsyncRC522Manager
+from ..events import PresenceTracker, TagEvent
+from ..rc522 import RC522
+from ..rc522manager import RC522Manager
+from ..ultralight import UltralightReader
+
+
+class _Client:
+    """
+    Connection of a client: its queue of requests and its outbox of responses and events.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, max_pending: int, max_events: int):
+        self.writer = writer
+        self.requests: asyncio.Queue = asyncio.Queue(max_pending)
+        self.subscribed = False
+        self.max_events = max_events
+        self.dropped = 0  # events dropped since the last one sent
+        self.__outbox: deque[tuple[bool, dict]] = deque()
+        self.__events = 0  # events in the outbox
+        self.__ready = asyncio.Event()
+        self.__closing = False
+
+    def send(self, message: dict):
+        """
+        Queues a response, never dropped: there are at most max_pending + 1 of them.
+        """
+        self.__outbox.append((False, message))
+        self.__ready.set()
+
+    def publish(self, event: TagEvent):
+        """
+        Queues an event if the client is subscribed, dropping it if max_events are already waiting.
+        """
+        if not self.subscribed:
+            return
+        if self.__events >= self.max_events:
+            self.dropped += 1
+            return
+        self.__outbox.append((True, protocol.event_message(event, self.dropped)))
+        self.__events += 1
+        self.dropped = 0
+        self.__ready.set()
+
+    def close(self):
+        """
+        Makes flush() return once the outbox is empty.
+        """
+        self.__closing = True
+        self.__ready.set()
+
+    async def flush(self):
+        """
+        Writes the outbox to the socket, waiting for the client to read it, until close().
+        """
+        try:
+            while not self.__closing or self.__outbox:
+                await self.__ready.wait()
+                self.__ready.clear()
+                while self.__outbox:
+                    (is_event, message) = self.__outbox.popleft()
+                    if is_event:
+                        self.__events -= 1
+                    self.writer.write(protocol.encode(message))
+                    await self.writer.drain()
+        except ConnectionError:
+            pass
+
+
+class ReaderDaemon:
+    """
+    Owns a reader and shares it with the local processes through a Unix domain socket (see protocol).
+
+    The scan loop polls the field with RC522Manager.presence_scan() every scan_interval and publishes the arrival
+    and departure of the tags to the subscribed clients. Between two scans it runs the requests of the clients on
+    the selected tag, one at a time and one client after the other, in the single reader thread of an
+    AsyncRC522Manager: the clients never contend for the SPI bus and the reader is initialized once.
+    A scan that raises (e.g. the reader is unplugged) is counted as a "scan" error of the Metrics of the reader, and
+    the next ones back off, up to SCAN_BACKOFF_MAX_S between two scans, until one succeeds.
+
+    Backpressure:
+        - each client has at most max_pending queued requests: when they are full the daemon stops reading its
+          socket, so its writes block;
+        - each client has at most max_events unsent events: a client that does not read its socket loses the next
+          ones, the following event reports how many were dropped.
+
+    Example:
+        async with ReaderDaemon(RC522Manager(), path="/run/rc522.sock") as daemon:
+            await daemon.serve_forever()
+    """
+
+    DEFAULT_SOCKET_PATH = protocol.DEFAULT_SOCKET_PATH
+    DEFAULT_SCAN_INTERVAL = RC522Manager.DEFAULT_SCAN_INTERVAL
+    DEFAULT_DEPARTURE_MISSES = PresenceTracker.DEFAULT_DEPARTURE_MISSES
+    DEFAULT_MAX_PENDING = 16
+    DEFAULT_MAX_EVENTS = 256
+    DEFAULT_MODE = 0o660
+    SCAN_BACKOFF_MAX_S = 5.0    # longest wait between two scans, while they keep failing
+
+    STATUS_OK = RC522Manager.STATUS_OK
+    STATUS_NO_TAG_ERR = RC522Manager.STATUS_NO_TAG_ERR
+    STATUS_ERR = RC522Manager.STATUS_ERR
+
+    def __init__(self, manager: RC522Manager | None = None, path: str = DEFAULT_SOCKET_PATH,
+                 scan_interval: float = DEFAULT_SCAN_INTERVAL, departure_misses: int = DEFAULT_DEPARTURE_MISSES,
+                 max_pending: int = DEFAULT_MAX_PENDING, max_events: int = DEFAULT_MAX_EVENTS,
+                 mode: int = DEFAULT_MODE, **kwargs):
+        """
+        :param manager: manager of the reader, None to create one with kwargs (device, speed, debug, transport).
+                        Its auth info or key ring are used by the requests without a key
+        :param path: path of the Unix socket, replaced if it already exists
+        :param scan_interval: seconds between the start of two scans
+        :param departure_misses: consecutive scans without the tag before its departure
+        :param max_pending: queued requests per client
+        :param max_events: unsent events per client
+        :param mode: permissions of the socket
+        """
+        self.reader = AsyncRC522Manager(manager, **kwargs)
+        self.manager: RC522Manager = self.reader.manager
+        self.ultralight = UltralightReader(self.manager)
+        self.tracker = PresenceTracker(departure_misses)
+        self.path = path
+        self.scan_interval = scan_interval
+        self.max_pending = max_pending
+        self.max_events = max_events
+        self.mode = mode
+        self.debug: bool = self.manager.debug
+        # Consecutive scans failed with an exception, the interval doubles with each of them up to SCAN_BACKOFF_MAX_S
+        self.scan_failures = 0
+
+        self.__operations = {
+            protocol.READ_BLOCK: self.__read_block,
+            protocol.WRITE_BLOCK: self.__write_block,
+            protocol.READ_VALUE: self.__read_value,
+            protocol.INCREMENT: self.__increment,
+            protocol.DECREMENT: self.__decrement,
+            protocol.DUMP: self.__dump,
+            protocol.READ_PAGES: self.__read_pages,
+            protocol.WRITE_PAGES: self.__write_pages,
+        }
+        self.__clients: list[_Client] = []
+        self.__server: asyncio.AbstractServer | None = None
+        self.__scan_task: asyncio.Task | None = None
+        self.__requests_ready = asyncio.Event()
+
+    async def __aenter__(self) -> "ReaderDaemon":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        """
+        Listens on the socket and starts the scan loop.
+        """
+        if os.path.exists(self.path) and stat.S_ISSOCK(os.stat(self.path).st_mode):
+            os.unlink(self.path)  # left by a daemon that did not close
+        self.__server = await asyncio.start_unix_server(self.__handle_client, self.path, limit=protocol.MAX_LINE)
+        os.chmod(self.path, self.mode)
+        self.__scan_task = asyncio.create_task(self.__scan_loop())
+
+        if self.debug:
+            print(f"[d] ReaderDaemon.start() >>> listening on {self.path}")
+
+    async def serve_forever(self):
+        """
+        Runs until close(). The errors of the reader fail the scan or the request in progress, not the daemon.
+        """
+        if self.__scan_task is None:
+            await self.start()
+        await self.__scan_task
+
+    async def close(self):
+        """
+        Stops the scan loop, disconnects the clients and removes the socket.
+        """
+        if self.__scan_task is not None:
+            self.__scan_task.cancel()
+            try:
+                await self.__scan_task
+            except asyncio.CancelledError:
+                pass
+        if self.__server is not None:
+            self.__server.close()
+            for client in self.__clients:
+                client.writer.close()
+            await self.__server.wait_closed()
+            self.__server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        await self.reader.close()
+        if self.manager.key_ring is not None:
+            self.manager.key_ring.flush()
+
+    @property
+    def clients_number(self) -> int:
+        return len(self.__clients)
+
+    async def __scan_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            start = loop.time()
+
+            try:
+                (status, uid) = await self.reader.run(self.manager.presence_scan)
+            except Exception as e:
+                # e.g. an OSError of the transport: the scan fails, the daemon keeps running
+                self.scan_failures += 1
+                if self.manager.reader.metrics is not None:
+                    self.manager.reader.metrics.count_error("scan", "exception")
+                if self.scan_failures == 1 or self.debug:
+                    print(f"[e] ReaderDaemon: scan failed: {e!r}")
+                (status, uid) = (self.STATUS_ERR, b"")
+            else:
+                if self.scan_failures and self.debug:
+                    print(f"[d] ReaderDaemon: scan recovered after {self.scan_failures} failures")
+                self.scan_failures = 0
+            for event in self.tracker.update(uid if status == self.STATUS_OK else None):
+                if self.debug:
+                    print(f"[d] ReaderDaemon: {event.kind} {event.uid.hex()}")
+                for client in self.__clients:
+                    client.publish(event)
+
+            # Serve the requests until the next scan, backing off while the scans fail
+            interval = self.scan_interval
+            if self.scan_failures:
+                interval = min(interval * 2 ** min(self.scan_failures, 16), max(interval, self.SCAN_BACKOFF_MAX_S))
+            while True:
+                served = await self.__serve_requests()
+                remaining = start + interval - loop.time()
+                if remaining <= 0:
+                    break
+                if served:
+                    continue
+                self.__requests_ready.clear()
+                try:
+                    await asyncio.wait_for(self.__requests_ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+    async def __serve_requests(self) -> bool:
+        """
+        Runs the first queued request of each client.
+        :return: True if a request was served
+        """
+        served = False
+        for client in list(self.__clients):
+            if client.requests.empty():
+                continue
+            request = client.requests.get_nowait()
+            client.send(await self.__execute(request))
+            client.requests.task_done()
+            served = True
+        return served
+
+    async def __execute(self, request: dict) -> dict:
+        """
+        Runs a request on the tag in the field.
+        :return: the response
+        """
+        response = {"id": request.get("id")}
+        try:
+            uid = bytes.fromhex(request["uid"]) if request.get("uid") is not None else None
+            if self.tracker.uid is None or (uid is not None and uid != self.tracker.uid):
+                response["status"] = self.STATUS_NO_TAG_ERR
+            else:
+                response.update(await self.reader.run(self.__run_operation, request))
+        except (KeyError, ValueError, TypeError) as e:
+            response["status"] = self.STATUS_ERR
+            response["error"] = f"invalid request: {e!r}"
+        except Exception as e:
+            # e.g. an OSError of the transport: only this request fails
+            response["status"] = self.STATUS_ERR
+            response["error"] = f"operation failed: {e!r}"
+
+        if self.debug:
+            print(f"[d] ReaderDaemon: {request.get('op')} >>> status={response['status']}")
+
+        return response
+
+    def __run_operation(self, request: dict) -> dict:
+        """
+        Runs an operation in the reader thread, with the key of the request if it has one.
+        """
+        operation = self.__operations[request["op"]]
+        if request.get("key") is None:
+            return operation(request)
+
+        key_types = {"A": RC522.ACT_AUTH_A, "B": RC522.ACT_AUTH_B}
+        (auth_method, key) = (self.manager.auth_method, self.manager.key)
+        self.manager.set_auth(key_types[request.get("key_type", "A")], bytes.fromhex(request["key"]))
+        # The tag image does not know the key that read a block: nothing is shared across the keys of the clients
+        self.__invalidate_image()
+        try:
+            return operation(request)
+        finally:
+            self.__invalidate_image()
+            if key is None:
+                self.manager.reset_auth()
+            else:
+                self.manager.set_auth(auth_method, key)
+
+    def __invalidate_image(self):
+        if self.manager.image is not None:
+            self.manager.image.invalidate()
+
+    def __read_block(self, request: dict) -> dict:
+        (status, data) = self.manager.read_block(int(request["block"]))
+        return {"status": status, "data": bytes(data).hex()}
+
+    def __write_block(self, request: dict) -> dict:
+        return {"status": self.manager.write_block(int(request["block"]), bytes.fromhex(request["data"]))}
+
+    def __read_value(self, request: dict) -> dict:
+        (status, value) = self.manager.read_value(int(request["block"]))
+        return {"status": status, "value": value}
+
+    def __increment(self, request: dict) -> dict:
+        return {"status": self.manager.increment(int(request["block"]), int(request["delta"]),
+                                                 request.get("transfer_block"))}
+
+    def __decrement(self, request: dict) -> dict:
+        return {"status": self.manager.decrement(int(request["block"]), int(request["delta"]),
+                                                 request.get("transfer_block"))}
+
+    def __dump(self, request: dict) -> dict:
+        (status, data) = self.manager.dump(int(request.get("sectors", RC522Manager.DEFAULT_SECTORS_NUMBER)))
+        return {"status": status, "data": bytes(data).hex()}
+
+    def __read_pages(self, request: dict) -> dict:
+        (status, data) = self.ultralight.read_pages(int(request["page"]), int(request["count"]))
+        return {"status": status, "data": data.hex()}
+
+    def __write_pages(self, request: dict) -> dict:
+        return {"status": self.ultralight.write_pages(int(request["page"]), bytes.fromhex(request["data"]))}
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = _Client(writer, self.max_pending, self.max_events)
+        self.__clients.append(client)
+        flush_task = asyncio.create_task(client.flush())
+
+        if self.debug:
+            print(f"[d] ReaderDaemon: client connected, {len(self.__clients)} clients")
+
+        connected = True
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("not an object")
+                except ValueError:
+                    client.send({"id": None, "status": self.STATUS_ERR, "error": "invalid JSON request"})
+                    continue
+
+                op = request.get("op")
+                if op in (protocol.SUBSCRIBE, protocol.UNSUBSCRIBE, protocol.STATUS):
+                    client.subscribed = (op == protocol.SUBSCRIBE) or (client.subscribed and op == protocol.STATUS)
+                    uid = self.tracker.uid
+                    client.send({"id": request.get("id"), "status": self.STATUS_OK,
+                                 "uid": uid.hex() if uid is not None else None})
+                elif op in self.__operations:
+                    # Waits while the queue is full: the socket is not read meanwhile
+                    await client.requests.put(request)
+                    self.__requests_ready.set()
+                else:
+                    client.send({"id": request.get("id"), "status": self.STATUS_ERR,
+                                 "error": f"unknown operation {op}"})
+        except (ConnectionError, ValueError):
+            connected = False  # disconnected, or a line longer than MAX_LINE
+        finally:
+            if connected and not self.__scan_task.done():
+                # The client closed its side: answer its queued requests before closing, unless the daemon stops
+                join_task = asyncio.create_task(client.requests.join())
+                await asyncio.wait((join_task, self.__scan_task), return_when=asyncio.FIRST_COMPLETED)
+                join_task.cancel()
+                client.close()
+                await flush_task
+            self.__clients.remove(client)
+            flush_task.cancel()
+            writer.close()
+
+            if self.debug:
+                print(f"[d] ReaderDaemon: client disconnected, {len(self.__clients)} clients")
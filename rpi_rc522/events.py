@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import time
+from typing import NamedTuple
+
+
+class TagEvent(NamedTuple):
+    """
+    Arrival or departure of a tag in the field of a reader.
+    """
+    ARRIVED = "arrived"
+    DEPARTED = "departed"
+
+    kind: str               # ARRIVED or DEPARTED
+    uid: bytes              # UID of the tag
+    timestamp: float        # time.time() of the detection
+    reader: str | None = None   # name of the reader, when several readers are polled together
+
+
+class PresenceTracker:
+    """
+    Turns the results of the consecutive scans of a reader into TagEvents.
+    A tag departs only after departure_misses consecutive scans without it, so a single missed answer (e.g. a tag
+    at the edge of the field) does not generate a departure and a new arrival.
+    """
+
+    DEFAULT_DEPARTURE_MISSES = 2
+
+    def __init__(self, departure_misses: int = DEFAULT_DEPARTURE_MISSES, reader: str | None = None):
+        """
+        :param departure_misses: consecutive scans without the tag before its departure
+        :param reader: name of the reader, copied in the events
+        """
+        self.departure_misses = departure_misses
+        self.reader = reader
+        self.uid: bytes | None = None  # UID of the tag in the field, None if there is none
+        self.__misses = 0
+
+    def update(self, uid: bytes | None) -> list[TagEvent]:
+        """
+        Updates the presence with the result of a scan.
+        :param uid: UID of the tag found by the scan, None if no tag answered
+        :return: events generated by the scan, in order (a departure can precede an arrival)
+        """
+        events = []
+
+        if uid is not None:
+            uid = bytes(uid)
+            self.__misses = 0
+            if uid != self.uid:
+                if self.uid is not None:
+                    events.append(TagEvent(TagEvent.DEPARTED, self.uid, time.time(), self.reader))
+                self.uid = uid
+                events.append(TagEvent(TagEvent.ARRIVED, uid, time.time(), self.reader))
+        elif self.uid is not None:
+            self.__misses += 1
+            if self.__misses >= self.departure_misses:
+                events.append(TagEvent(TagEvent.DEPARTED, self.uid, time.time(), self.reader))
+                self.uid = None
+
+        return events
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Iterable, Sequence
+
+from .rc522 import RC522
+
+
+class KeyHintCache:
+    """
+    LRU map (UID, sector) -> (auth method, index in the KeyRing) of the keys that authenticated a sector, optionally
+    persisted as a JSON file so that the hints survive a restart.
+    The file holds no key material, only the positions of the keys among the candidates of the KeyRing: it must be
+    used with the same candidates, in the same order (a stale hint only costs a failed attempt).
+    New hints are kept in memory until flush(), so that the file is not rewritten in the middle of an authentication.
+    """
+
+    DEFAULT_CAPACITY = 4096
+
+    def __init__(self, path: str | None = None, capacity: int = DEFAULT_CAPACITY):
+        """
+        :param path: JSON file of the hints, loaded if it exists; None to keep them in memory only. put() and
+                     discard() only mark the hints as changed, flush() writes the file (RC522Manager calls it when
+                     the field is empty) and so does close()
+        :param capacity: maximum number of hints, the least recently used ones are evicted
+        """
+        self.path = path
+        self.capacity = capacity
+        self.__hints: OrderedDict[str, tuple[int, int]] = OrderedDict()
+        self.__dirty = False  # hints changed since the last save
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.__hints)
+
+    @staticmethod
+    def __entry(uid: Sequence[int], sector: int) -> str:
+        return f"{bytes(uid).hex()}/{sector}"
+
+    def get(self, uid: Sequence[int], sector: int) -> tuple[int, int] | None:
+        """
+        :param uid: UID of the tag
+        :param sector: sector number
+        :return: (auth method, index of the key in the KeyRing) of the hint, None if unknown
+        """
+        entry = self.__entry(uid, sector)
+        hint = self.__hints.get(entry)
+        if hint is not None:
+            self.__hints.move_to_end(entry)
+        return hint
+
+    def put(self, uid: Sequence[int], sector: int, auth_method: int, index: int):
+        """
+        Records the key that authenticated a sector, marking the hints to be saved if the hint is new or changed.
+        :param uid: UID of the tag
+        :param sector: sector number
+        :param auth_method: KEY_A (0x60) or KEY_B (0x61)
+        :param index: index of the key in the KeyRing
+        """
+        entry = self.__entry(uid, sector)
+        hint = (auth_method, index)
+        if self.__hints.get(entry) != hint:
+            self.__dirty = True
+        self.__hints[entry] = hint
+        self.__hints.move_to_end(entry)
+        while len(self.__hints) > self.capacity:
+            self.__hints.popitem(last=False)
+
+    def discard(self, uid: Sequence[int], sector: int):
+        """
+        Forgets the hint of a sector, e.g. when its key no longer works.
+        """
+        if self.__hints.pop(self.__entry(uid, sector), None) is not None:
+            self.__dirty = True
+
+    def flush(self):
+        """
+        Saves the file if the hints changed since the last save.
+        """
+        if self.__dirty and self.path is not None:
+            self.save()
+
+    def close(self):
+        self.flush()
+
+    def load(self):
+        """
+        Loads the hints from the file, replacing the ones in memory.
+        """
+        with open(self.path) as f:
+            hints = json.load(f)
+        # Entries of other formats (e.g. the key fingerprints of the previous versions) are dropped
+        self.__hints = OrderedDict((entry, (method, index)) for (entry, method, index) in hints
+                                   if isinstance(index, int))
+        while len(self.__hints) > self.capacity:
+            self.__hints.popitem(last=False)
+        self.__dirty = False
+
+    def save(self):
+        """
+        Writes the hints to the file, from the least to the most recently used, replacing it atomically.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix=".keyhints")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump([[entry, method, index] for (entry, (method, index)) in self.__hints.items()], f)
+            os.replace(tmp_path, self.path)
+            self.__dirty = False
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class KeyRing:
+    """
+    Candidate keys of the MIFARE Classic tags, tried in order by RC522Manager.auth() until one authenticates the
+    sector (see RC522Manager.set_key_ring()).
+    The key that worked is remembered per UID and sector in a KeyHintCache, so it is tried first on the next taps.
+    """
+
+    def __init__(self, candidates: Iterable[tuple[int, Sequence[int]]] = ((RC522.ACT_AUTH_A, (0xFF,) * 6),),
+                 hints: KeyHintCache | None = None):
+        """
+        :param candidates: (auth method, key) pairs, in order of preference
+        :param hints: cache of the keys that worked, a new in-memory one if None
+        """
+        self.candidates: list[tuple[int, tuple[int, ...]]] = []
+        self.hints = hints if hints is not None else KeyHintCache()
+        for (auth_method, key) in candidates:
+            self.add(auth_method, key)
+
+    def add(self, auth_method: int, key: Sequence[int]):
+        """
+        Appends a candidate.
+        :param auth_method: KEY_A (0x60) or KEY_B (0x61)
+        :param key: 6 bytes key
+        """
+        if len(key) != 6:
+            raise ValueError("a MIFARE Classic key is 6 bytes long")
+        candidate = (auth_method, tuple(key))
+        if candidate not in self.candidates:
+            self.candidates.append(candidate)
+
+    def candidates_for(self, uid: Sequence[int], sector: int) -> list[tuple[int, tuple[int, ...]]]:
+        """
+        :param uid: UID of the tag
+        :param sector: sector number
+        :return: the candidates, starting with the one of the hint (if any)
+        """
+        hint = self.hints.get(uid, sector)
+        if hint is None:
+            return list(self.candidates)
+        (hint_method, hint_index) = hint
+        if not 0 <= hint_index < len(self.candidates) or self.candidates[hint_index][0] != hint_method:
+            return list(self.candidates)  # hint of a different key ring
+        first = self.candidates[hint_index]
+        return [first] + [c for c in self.candidates if c != first]
+
+    def remember(self, uid: Sequence[int], sector: int, auth_method: int, key: Sequence[int]):
+        """
+        Records the candidate that authenticated a sector.
+        """
+        candidate = (auth_method, tuple(key))
+        if candidate in self.candidates:
+            self.hints.put(uid, sector, auth_method, self.candidates.index(candidate))
+
+    def forget(self, uid: Sequence[int], sector: int):
+        """
+        Forgets the hint of a sector, when none of the candidates authenticates it.
+        """
+        self.hints.discard(uid, sector)
+
+    def flush(self):
+        """
+        Saves the hints changed since the last save, see KeyHintCache.flush().
+        """
+        self.hints.flush()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Iterable
+
+# (operation, status, duration_s, cause), cause is None for successful operations
+Hook = Callable[[str, int, float, str | None], None]
+
+
+class Metrics:
+    """
+    Counters and latency histograms of the operations of a reader, plus its SPI traffic.
+    Pass an instance to RC522 (or RC522Manager) to enable the instrumentation: without it (the default) each
+    instrumented operation costs a single attribute check.
+
+    Operations:
+        - reqa: REQA/WUPA (request_tag(), or start_request_tag() + poll_request_tag())
+        - anticollision: one cascade level of the anti-collision loop
+        - select: one cascade level of the selection
+        - halt: HLTA
+        - auth, read, write: MIFARE Classic authentication, block read and block write (also the READ and
+          COMPATIBILITY_WRITE of MIFARE Ultralight / NTAG)
+        - write_page: WRITE of a MIFARE Ultralight / NTAG page
+        - increment, decrement, restore, transfer: MIFARE Classic value block operations
+        - get_version, fast_read, read_cnt: GET_VERSION, FAST_READ and READ_CNT of MIFARE Ultralight EV1 / NTAG21x
+        - crc: CRC computed by the MFRC522 coprocessor (CRC_MODE_CHIP and CRC_MODE_VERIFY only)
+        - scan: a scan of ReaderDaemon, errors only
+
+    Causes of the failed operations:
+        - no_tag: nothing answered before the chip timer expired
+        - timeout: the host deadline expired before the chip completed the command
+        - collision, parity, protocol, buffer_overflow: bits of ErrorReg
+        - crc_mismatch: host and chip CRC differ (CRC_MODE_VERIFY)
+        - invalid_response: the tag answered with an unexpected length or content
+        - exception: the operation raised an exception (e.g. from the transport)
+    """
+
+    # Upper bounds of the latency histogram buckets, in seconds
+    LATENCY_BUCKETS_S = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+    ERROR_CAUSES = ((0x10, "buffer_overflow"), (0x08, "collision"), (0x02, "parity"), (0x01, "protocol"))
+
+    def __init__(self, labels: dict[str, str] | None = None):
+        """
+        :param labels: constant labels of the Prometheus samples, e.g. {"reader": "door"} for a fleet of readers
+        """
+        self.labels = dict(labels or {})
+        self.__lock = threading.Lock()
+        self.__hooks: list[Hook] = []
+        self.reset()
+
+    def reset(self):
+        """
+        Resets all the counters to 0.
+        """
+        with self.__lock:
+            self.__operations: dict[str, int] = {}
+            self.__errors: dict[tuple[str, str], int] = {}
+            self.__buckets: dict[str, list[int]] = {}
+            self.__latency_sum: dict[str, float] = {}
+            self.spi_transactions = 0
+            self.spi_bytes = 0
+
+    def add_hook(self, hook: Hook):
+        """
+        Calls hook after each instrumented operation, e.g. to trace the slow ones.
+        :param hook: function(operation, status, duration_s, cause), called in the thread of the reader
+        """
+        self.__hooks.append(hook)
+
+    def remove_hook(self, hook: Hook):
+        """
+        Removes a hook added by add_hook().
+        """
+        self.__hooks.remove(hook)
+
+    def observe(self, operation: str, status: int, duration_s: float, cause: str | None = None):
+        """
+        Records the completion of an operation.
+        :param operation: name of the operation
+        :param status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        :param duration_s: latency of the operation, in seconds
+        :param cause: cause of the failure, None if the operation succeeded
+        """
+        with self.__lock:
+            self.__operations[operation] = self.__operations.get(operation, 0) + 1
+            buckets = self.__buckets.get(operation)
+            if buckets is None:
+                buckets = self.__buckets[operation] = [0] * (len(self.LATENCY_BUCKETS_S) + 1)
+            buckets[bisect.bisect_left(self.LATENCY_BUCKETS_S, duration_s)] += 1
+            self.__latency_sum[operation] = self.__latency_sum.get(operation, 0.0) + duration_s
+            if cause is not None:
+                self.__errors[(operation, cause)] = self.__errors.get((operation, cause), 0) + 1
+
+        for hook in self.__hooks:
+            hook(operation, status, duration_s, cause)
+
+    def count_error(self, operation: str, cause: str):
+        """
+        Records a failure that is not the result of an operation, e.g. a CRC mismatch.
+        :param operation: name of the operation
+        :param cause: cause of the failure
+        """
+        with self.__lock:
+            self.__errors[(operation, cause)] = self.__errors.get((operation, cause), 0) + 1
+
+    def count_spi(self, n_bytes: int):
+        """
+        Records an SPI transaction (a batch of frames counts once).
+        :param n_bytes: bytes exchanged
+        """
+        # Plain increments, the GIL keeps them consistent enough for monitoring
+        self.spi_transactions += 1
+        self.spi_bytes += n_bytes
+
+    @classmethod
+    def error_cause(cls, status: int, last_error: int, timed_out: bool) -> str | None:
+        """
+        :param status: status of the operation
+        :param last_error: ErrorReg & 0x1B of the last command
+        :param timed_out: True if the last command hit the host deadline
+        :return: cause of the failure, None if the operation succeeded
+        """
+        if status == 0:
+            return None
+        if timed_out:
+            return "timeout"
+        if status == 1:
+            return "no_tag"
+        for (bit, cause) in cls.ERROR_CAUSES:
+            if last_error & bit:
+                return cause
+        return "invalid_response"
+
+    def snapshot(self) -> dict:
+        """
+        :return: copy of the counters, as a dict:
+            {
+                "labels": {...},
+                "operations": {operation: {"count": n, "errors": {cause: n}, "latency_sum_s": s,
+                                           "latency_buckets": {upper_bound_s: n, ..., "+Inf": n}}},
+                "spi": {"transactions": n, "bytes": n},
+            }
+            The buckets are cumulative, as in Prometheus.
+        """
+        with self.__lock:
+            operations = {}
+            for operation in set(self.__operations) | {operation for (operation, _) in self.__errors}:
+                cumulative = {}
+                total = 0
+                for (bound, count) in zip(self.LATENCY_BUCKETS_S + ("+Inf",),
+                                          self.__buckets.get(operation, [0] * (len(self.LATENCY_BUCKETS_S) + 1))):
+                    total += count
+                    cumulative[bound] = total
+                operations[operation] = {
+                    "count": self.__operations.get(operation, 0),
+                    "errors": {cause: n for ((op, cause), n) in self.__errors.items() if op == operation},
+                    "latency_sum_s": self.__latency_sum.get(operation, 0.0),
+                    "latency_buckets": cumulative,
+                }
+            return {
+                "labels": dict(self.labels),
+                "operations": operations,
+                "spi": {"transactions": self.spi_transactions, "bytes": self.spi_bytes},
+            }
+
+    def prometheus(self, prefix: str = "rc522") -> str:
+        """
+        :param prefix: prefix of the metric names
+        :return: counters in the Prometheus text exposition format
+        """
+        return prometheus_text([self], prefix=prefix)
+
+
+def prometheus_text(metrics: Iterable[Metrics], prefix: str = "rc522") -> str:
+    """
+    Renders the counters of several readers in the Prometheus text exposition format, each reader identified by the
+    labels of its Metrics.
+    :param metrics: Metrics of the readers
+    :param prefix: prefix of the metric names
+    :return: text to be served on the /metrics endpoint
+    """
+    snapshots = [m.snapshot() for m in metrics]
+    families = {
+        "operations_total": ("counter", "Operations performed by the reader."),
+        "errors_total": ("counter", "Failed operations, by cause."),
+        "operation_duration_seconds": ("histogram", "Latency of the operations."),
+        "spi_transactions_total": ("counter", "SPI transactions (driver calls)."),
+        "spi_bytes_total": ("counter", "Bytes exchanged on the SPI bus."),
+    }
+    samples: dict[str, list[str]] = {name: [] for name in families}
+
+    for snapshot in snapshots:
+        labels = snapshot["labels"]
+        for (operation, values) in sorted(snapshot["operations"].items()):
+            op_labels = dict(labels, operation=operation)
+            samples["operations_total"].append(_sample(f"{prefix}_operations_total", op_labels, values["count"]))
+            for (cause, n) in sorted(values["errors"].items()):
+                samples["errors_total"].append(_sample(f"{prefix}_errors_total", dict(op_labels, cause=cause), n))
+            name = f"{prefix}_operation_duration_seconds"
+            for (bound, n) in values["latency_buckets"].items():
+                samples["operation_duration_seconds"].append(
+                    _sample(f"{name}_bucket", dict(op_labels, le=str(bound)), n))
+            samples["operation_duration_seconds"].append(_sample(f"{name}_sum", op_labels, values["latency_sum_s"]))
+            samples["operation_duration_seconds"].append(_sample(f"{name}_count", op_labels, values["count"]))
+        samples["spi_transactions_total"].append(
+            _sample(f"{prefix}_spi_transactions_total", labels, snapshot["spi"]["transactions"]))
+        samples["spi_bytes_total"].append(_sample(f"{prefix}_spi_bytes_total", labels, snapshot["spi"]["bytes"]))
+
+    lines = []
+    for (name, (kind, help_text)) in families.items():
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.extend(samples[name])
+    return "\n".join(lines) + "\n"
+
+
+def _sample(name: str, labels: dict[str, str], value) -> str:
+    """
+    :return: a sample line of the Prometheus text format
+    """
+    if labels:
+        escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in labels.values())
+        name += "{" + ",".join(f'{k}="{v}"' for (k, v) in zip(labels, escaped)) + "}"
+    return f"{name} {value}"
+
+
+def instrumented(operation: str):
+    """
+    Decorator of the RC522 operations: when the reader has a Metrics instance, it records the status, the latency
+    and the cause of the failure of each call. The operation must return a status, or a tuple starting with it.
+    :param operation: name of the operation
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return func(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception:
+                metrics.observe(operation, 2, time.perf_counter() - start, "exception")
+                raise
+            status = result[0] if isinstance(result, tuple) else result
+            metrics.observe(operation, status, time.perf_counter() - start,
+                            Metrics.error_cause(status, self.last_error, self.last_timed_out))
+            return result
+        return wrapper
+    return decorator
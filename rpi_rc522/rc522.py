@@ -1,13 +1,80 @@
 #!/usr/bin/env python
+import math
+import threading
 import time
-import RPi.GPIO as GPIO
-import spi
+
+from .metrics import Metrics, instrumented
+from .transport import Transport, SpiTransport
+from .utils import crc_a
 
 # TODO
 #  - add type linting
 #  - extract constants in a separate class?
 
 
+class RegisterScript:
+    """
+    Sequence of register accesses to the MFRC522 chip, executed as one batch (Transport.transfer_frames): each access
+    is a chip-select frame of the same SPI message, so the whole sequence costs a single call to the driver.
+    The values read are returned all together by RC522, in the order of the reads.
+    """
+
+    def __init__(self):
+        self.frames: list[bytes] = []
+        self.writes: list[tuple[int, int]] = []  # (register, value), for the shadow cache
+        self.__reads: list[tuple[int, int]] = []  # (offset, count) of the values read in the received bytes
+        self.__length = 0
+
+    def write(self, register, value):
+        """
+        Appends the write of a register.
+        :param register: register address
+        :param value: value to be written
+        """
+        value &= 0xFF
+        self.__append(bytes(((register << 1) & 0x7E, value)))
+        self.writes.append((register, value))
+
+    def write_burst(self, register, values):
+        """
+        Appends the write of several values on the same register (e.g. the FIFO).
+        :param register: register address
+        :param values: values to be written
+        """
+        self.__append(bytes(((register << 1) & 0x7E,)) + bytes(values))
+
+    def read(self, register):
+        """
+        Appends the read of a register, its value is one of the results.
+        :param register: register address
+        """
+        self.read_burst(register, 1)
+
+    def read_burst(self, register, count):
+        """
+        Appends count reads of the same register (e.g. the FIFO), count results.
+        :param register: register address
+        :param count: number of bytes to read
+        """
+        if count > 0:
+            self.__reads.append((self.__length + 1, count))
+            self.__append(bytes(((((register << 1) & 0x7E) | 0x80),)) * count + b"\x00")
+
+    def results(self, rx) -> list[int]:
+        """
+        :param rx: bytes received by the frames
+        :return: values read, in the order of the reads
+        """
+        values = []
+        for (offset, count) in self.__reads:
+            values.extend(rx[offset:offset + count])
+        return values
+
+    def __append(self, frame: bytes):
+        self.frames.append(frame)
+        self.__length += len(frame)
+
+
 class RC522:
     """
     Low level class that manages a RC522 module, connected via SPI to a Raspberry Pi.
@@ -15,6 +82,8 @@ class RC522:
 
     Note:
         - uses GPIO in BCM mode.
+        - talks to the chip through a Transport: SpiTransport by default, or any other one passed to the constructor
+            (e.g. rpi_rc522.simulator.MFRC522Simulator, to run off the Raspberry Pi).
         - based on the Arduino's .cpp RFID library.
             Look here for further code explanation:
             https://github.com/miguelbalboa/rfid  (MFRC522.h and MFRC522.cpp)
@@ -25,11 +94,17 @@ class RC522:
         - SCK  to GPIO11 (SPI_CLK)
         - SDA  to GPIO08 (SPI_CE0_N)
         - RST  to GPIO25
+        - IRQ  to GPIO24 (optional, needed only by WAIT_IRQ)
         - 3.3v and Ground
+        A second reader shares MOSI, MISO and SCK, with SDA to GPIO07 (SPI_CE1_N, device /dev/spidev0.1) and its own
+        RST pin (pin_rst), see rpi_rc522.scheduler.PollScheduler.
     """
 
     PIN_RST_BCM = 25  # BOARD 22
+    PIN_IRQ_BCM = 24  # BOARD 18
     MAX_LEN = 16
+    CMD_TIMEOUT_MS = 25         # host side timeout for a command, just above the 24.5 ms of the longest timer profile
+    FIELD_ON_DELAY_S = 0.005    # ISO/IEC 14443-3: a tag is ready for a command within 5 ms from the field on
 
     # Commands word
     CMD_IDLE = 0x00             # no action, cancel the current command
@@ -48,6 +123,8 @@ class RC522:
     ACT_REQ_ALL = 0x52          # find all the tags in the antenna area
     ACT_ANTI_COLL = 0x93        # anti-collision
     ACT_SELECT_TAG = 0x93       # tag selection
+    ACT_SEL_CL = (0x93, 0x95, 0x97)  # anti-collision and selection of the cascade levels 1, 2 and 3
+    CASCADE_TAG = 0x88          # first byte of the UID part of an incomplete cascade level
     ACT_AUTH_A = 0x60           # authentication key A
     ACT_AUTH_B = 0x61           # authentication key B
     ACT_READ = 0x30             # read bock
@@ -57,6 +134,15 @@ class RC522:
     ACT_RESTORE = 0xC2          # transfer block data to the buffer
     ACT_TRANSFER = 0xB0         # save data in the buffer
     ACT_HALT = 0x50             # sleep
+    ACT_GET_VERSION = 0x60      # product version (MIFARE Ultralight EV1, NTAG21x)
+    ACT_FAST_READ = 0x3A        # read a range of pages (MIFARE Ultralight EV1, NTAG21x)
+    ACT_READ_CNT = 0x39         # read a one-way counter (MIFARE Ultralight EV1, NTAG21x)
+    ACT_WRITE_PAGE = 0xA2       # write a page (MIFARE Ultralight, NTAG)
+    ACT_COMPAT_WRITE = 0xA0     # COMPATIBILITY_WRITE: the write of MIFARE Classic, only the first page is written
+
+    # MIFARE Ultralight / NTAG memory
+    PAGE_SIZE = 4               # bytes of a page
+    FAST_READ_MAX_PAGES = 15    # pages of a FAST_READ answer that fit in the FIFO, with the CRC_A (60 + 2 bytes)
 
     # Register addresses
     # Page0: command and status
@@ -128,20 +214,91 @@ class RC522:
     RESERVED_33 = 0x3E
     RESERVED_34 = 0x3F
 
+    # Registers changed only by the host, kept in a write-through shadow cache (invalidated by a soft reset).
+    # The others (command, IRQ, error, status, FIFO, collision, CRC result, timer counter, ...) are volatile.
+    HOST_OWNED_REGISTERS = frozenset((
+        REG_COMM_I_EN, REG_DIVL_EN, REG_WATER_LEVEL, REG_BIT_FRAMING,
+        REG_MODE, REG_TX_MODE, REG_RX_MODE, REG_TX_CONTROL, REG_TX_AUTO, REG_TX_SEL, REG_RX_SEL,
+        REG_RX_THRESHOLD, REG_DEMOD, REG_MIFARE, REG_SERIAL_SPEED,
+        REG_MOD_WIDTH, REG_RFC_FG, REG_GS_N, REG_CW_GS_P, REG_MOD_GS_P,
+        REG_TIMER_MODE, REG_TIMER_PRESCALER, REG_TIMER_RELOAD_H, REG_TIMER_RELOAD_L,
+    ))
+    FIFO_SIZE = 64              # bytes, the longest burst access
+
+    # Timeout profiles: period of the chip timer for each class of commands, in ms.
+    # The timer starts at the end of the transmission and stops when the answer starts, so it bounds the frame delay
+    # time of the tag, not the length of its answer. The host deadline is the period + TIMEOUT_HOST_MARGIN_MS.
+    TIMEOUT_REQUEST = "request"         # REQA/WUPA: tags answer after ~0.1 ms, so an empty field fails fast
+    TIMEOUT_TRANSCEIVE = "transceive"   # anti-collision, select, auth, read, first phase of a write
+    TIMEOUT_WRITE = "write"             # second phase of a write: the tag programs its EEPROM before the ACK
+    TIMEOUT_VALUE = "value"             # operand of increment/decrement/restore: the tag answers only with a NAK
+    TIMEOUT_PROFILES_MS = {TIMEOUT_REQUEST: 1.0, TIMEOUT_TRANSCEIVE: 10.0, TIMEOUT_WRITE: 24.5, TIMEOUT_VALUE: 5.0}
+    TIMEOUT_HOST_MARGIN_MS = 1
+    TIMER_PRESCALER = 0xD3E     # TModeReg[3..0] + TPrescalerReg: f(Timer) = 13.56 MHz / (2 * 0xD3E + 1) = 2 kHz
+    CHIP_CLOCK = 13560000
+
     # Status
     STATUS_OK = 0               # everything is OK
     STATUS_NO_TAG_ERR = 1       # no tag error
     STATUS_ERR = 2              # general error
 
-    def __init__(self, device="/dev/spidev0.0", speed=1000000, debug=False):
+    # CRC modes
+    CRC_MODE_HOST = 0           # table-driven CRC_A computed on the host, no SPI traffic
+    CRC_MODE_CHIP = 1           # CRC computed by the MFRC522 coprocessor
+    CRC_MODE_VERIFY = 2         # both, reporting any mismatch (the chip result is used)
+
+    # SPI clock negotiation (negotiate_speed()): the MFRC522 supports up to 10 MHz, but long wires or level shifters
+    # often limit the reliable rate
+    SPI_SPEED_STEPS = (1000000, 2000000, 4000000, 5000000, 8000000, 10000000)
+    SPI_TEST_PATTERNS = (0x55, 0xAA, 0x00, 0xFF, 0x5A, 0xA5)  # written and read back on REG_TIMER_RELOAD_L
+    SPI_TEST_ROUNDS = 20
+    SELF_TEST_SIZE = 64         # bytes returned by the digital self test
+
+    # Wait strategies, used to wait for the completion of a command
+    WAIT_SLEEP = 0              # poll the IRQ register every POLL_INTERVAL_S until the deadline
+    WAIT_SPIN = 1               # poll the IRQ register continuously until the deadline
+    WAIT_HYBRID = 2             # spin for HYBRID_SPIN_NS, then poll every POLL_INTERVAL_S
+    WAIT_IRQ = 3                # sleep until a falling edge on the IRQ pin, needs the IRQ pin wired
+    POLL_INTERVAL_S = 0.001
+    HYBRID_SPIN_NS = 2000000    # 2 ms, enough for REQA, anti-collision, select and read
+
+    def __init__(self, device="/dev/spidev0.0", speed=1000000, debug=False, crc_mode=CRC_MODE_HOST,
+                 wait_strategy=WAIT_HYBRID, pin_rst=PIN_RST_BCM, pin_irq=None, transport: Transport | None = None,
+                 metrics: Metrics | None = None, timeout_profiles: dict[str, float] | None = None):
 
         self.debug = debug
-
-        spi.openSPI(device=device, speed=speed)
-        GPIO.setwarnings(self.debug)
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.PIN_RST_BCM, GPIO.OUT)
-        GPIO.output(self.PIN_RST_BCM, 1)
+        self.crc_mode = crc_mode
+        self.wait_strategy = wait_strategy
+        self.__irq_event = threading.Event()
+        self.__reg_cache: dict[int, int] = {}
+        self.sleep_s = 0.0  # total time spent sleeping, waiting for the chip or for a tag
+        self.sak: int | None = None  # SAK of the selected tag, e.g. 0x08 = MIFARE Classic 1K, 0x18 = 4K
+        self.uid: bytes | None = None  # UID of the selected tag, 4, 7 or 10 bytes
+        self.last_error = 0  # ErrorReg of the last command (BufferOvfl CollErr ParityErr ProtocolErr), 0x08 = collision
+        self.last_timed_out = False  # True if the last command hit the host deadline
+        self.spi_clock_hz: float | None = None  # SPI clock measured by negotiate_speed(), None if not measured
+        self.metrics: Metrics | None = metrics  # instrumentation, disabled if None
+        # Chip timer period of each timeout profile in ms, the defaults overridden by timeout_profiles
+        self.timeout_profiles: dict[str, float] = {**self.TIMEOUT_PROFILES_MS, **(timeout_profiles or {})}
+        # (wait_irq, deadline, start) of start_request_tag()
+        self.__pending_request: tuple[int, int, float] | None = None
+        # SPI frames of the register accesses, preallocated: address byte + a full FIFO
+        self.__tx = bytearray(self.FIFO_SIZE + 1)
+        self.__rx = bytearray(self.FIFO_SIZE + 1)
+        self.__tx_view = memoryview(self.__tx)
+        self.__rx_view = memoryview(self.__rx)
+        # Frames sent to the tags, built in place: a command never exceeds the FIFO
+        self.__cmd = bytearray(self.FIFO_SIZE)
+        self.__cmd_view = memoryview(self.__cmd)
+
+        if transport is None:
+            transport = SpiTransport(device=device, speed=speed, pin_rst=pin_rst, pin_irq=pin_irq,
+                                     debug=debug)
+        self.transport: Transport = transport
+
+        if self.wait_strategy == self.WAIT_IRQ:
+            # The MFRC522 pulls the IRQ pin low (IRqInv=1) when an enabled interrupt is pending
+            self.transport.enable_irq(self.__irq_event.set)
 
         self.__init()
 
@@ -151,49 +308,107 @@ class RC522:
         It performs a soft reset, resets the timer and enables the antenna.
         """
         # High output on the reset pin
-        GPIO.output(self.PIN_RST_BCM, 1)
+        self.transport.set_reset(1)
 
         # Soft reset
         self.__soft_reset()
-        # Timer: TPrescaler*TreloadVal/6.78MHz = 24ms, f(Timer) = 6.78MHz/TPreScale
+        # Timer: (2*TPrescaler+1)*(TReloadVal+1)/13.56MHz, f(Timer) = 13.56MHz/(2*TPrescaler+1) = 2 kHz
         # Tauto=1, timer starts automatically at the end of the transmission in all communication modes at all speeds
-        self.__dev_write(self.REG_TIMER_MODE, 0x8D)
+        self.__dev_write(self.REG_TIMER_MODE, 0x80 | (self.TIMER_PRESCALER >> 8))
         # TModeReg[3..0] + TPrescalerReg
-        self.__dev_write(self.REG_TIMER_PRESCALER, 0x3E)
-        # Reload timer with 0x0030,  i.e. 48ms before timeout
-        self.__dev_write(self.REG_TIMER_RELOAD_H, 0x00)
-        self.__dev_write(self.REG_TIMER_RELOAD_L, 0x30)
+        self.__dev_write(self.REG_TIMER_PRESCALER, self.TIMER_PRESCALER & 0xFF)
+        # Reload value of the default profile, changed by the commands only when their profile differs
+        reload = self.__timer_reload(self.TIMEOUT_TRANSCEIVE)
+        self.__dev_write(self.REG_TIMER_RELOAD_H, reload >> 8)
+        self.__dev_write(self.REG_TIMER_RELOAD_L, reload & 0xFF)
         # REG_TX_AUTO is 0x00 by default. Force a 100 % ASK modulation independent of the ModGsPReg register setting
         self.__dev_write(self.REG_TX_AUTO, 0x40)
         # REG_MODE is 0x3F by default. Set the preset value for the CRC coprocessor to 0x6363 (ISO 14443-3 part 6.2.4)
         self.__dev_write(self.REG_MODE, 0x3D)
+        if self.wait_strategy == self.WAIT_IRQ:
+            # IRQPushPull=1, drive the IRQ pin as a standard CMOS output
+            self.__dev_write(self.REG_DIVL_EN, 0x80)
         # Re-enable the antenna driver pins, disabled by __soft_reset()
         self.__set_antenna_on()
 
     def __soft_reset(self):
         """
         Commands a soft reset to the MFRC522 chip.
+        All the registers go back to their reset value, so the shadow cache is invalidated.
         """
         self.__dev_write(self.REG_COMMAND, self.CMD_SOFT_RESET)
+        self.__reg_cache.clear()
 
-    @staticmethod
-    def __dev_write(register, value):
+    def __dev_write(self, register, value):
         """
         Writes a certain value on the desired register of the MFRC522 chip.
+        Host owned registers are also written to the shadow cache.
         :param register: register address
         :param value: value to be written
         """
-        spi.transfer(((register << 1) & 0x7E, value))
-
-    @staticmethod
-    def __dev_read(register):
+        value &= 0xFF
+        tx = self.__tx_view[:2]
+        tx[0] = (register << 1) & 0x7E
+        tx[1] = value
+        self.transport.transfer_into(tx, self.__rx_view[:2])
+        if self.metrics is not None:
+            self.metrics.count_spi(2)
+        if register in self.HOST_OWNED_REGISTERS:
+            self.__reg_cache[register] = value
+
+    def __dev_read(self, register):
         """
         Reads the given register of the MFRC522 chip.
+        Host owned registers are served by the shadow cache, once known.
         :param register: register address
         :return: rad value
         """
-        val = spi.transfer((((register << 1) & 0x7E) | 0x80, 0))
-        return val[1]
+        value = self.__reg_cache.get(register)
+        if value is None:
+            tx = self.__tx_view[:2]
+            tx[0] = ((register << 1) & 0x7E) | 0x80
+            tx[1] = 0
+            self.transport.transfer_into(tx, self.__rx_view[:2])
+            if self.metrics is not None:
+                self.metrics.count_spi(2)
+            value = self.__rx[1]
+            if register in self.HOST_OWNED_REGISTERS:
+                self.__reg_cache[register] = value
+        return value
+
+    def __dev_read_burst(self, register, count) -> bytes:
+        """
+        Reads the given register of the MFRC522 chip several times, in a single SPI transaction.
+        The address is repeated for every byte and followed by a 0 byte, so this is used to drain the FIFO.
+        :param register: register address
+        :param count: number of bytes to read, at most FIFO_SIZE
+        :return: read values
+        """
+        if count <= 0:
+            return b""
+        address = ((register << 1) & 0x7E) | 0x80
+        tx = self.__tx_view[:count + 1]
+        tx[:count] = bytes((address,)) * count
+        tx[count] = 0
+        self.transport.transfer_into(tx, self.__rx_view[:count + 1])
+        if self.metrics is not None:
+            self.metrics.count_spi(count + 1)
+        return bytes(self.__rx_view[1:count + 1])
+
+    def __run_script(self, script: RegisterScript) -> list[int]:
+        """
+        Executes a sequence of register accesses in a single batched SPI call.
+        Host owned registers written by the script are also written to the shadow cache.
+        :param script: register accesses to be executed
+        :return: values read by the script, in the order of the reads
+        """
+        rx = self.transport.transfer_frames(script.frames)
+        if self.metrics is not None:
+            self.metrics.count_spi(len(rx))
+        for (register, value) in script.writes:
+            if register in self.HOST_OWNED_REGISTERS:
+                self.__reg_cache[register] = value
+        return script.results(rx)
 
     def __set_bitmask(self, register, mask):
         """
@@ -217,10 +432,12 @@ class RC522:
         """
         Turns the antenna on by enabling pins TX1 and TX2.
         After a __soft_reset() these pins are disabled.
+        Turning the field on, it waits FIELD_ON_DELAY_S for the tags to power up.
         """
         temp = self.__dev_read(self.REG_TX_CONTROL)
-        if ~(temp & 0x03):
+        if (temp & 0x03) != 0x03:
             self.__set_bitmask(self.REG_TX_CONTROL, 0x03)
+            self.__sleep(self.FIELD_ON_DELAY_S)
 
     def __set_antenna_off(self):
         """
@@ -234,21 +451,101 @@ class RC522:
         """
         self.__clear_bitmask(self.REG_STATUS_2, 0x08)
 
-    def __send_cmd(self, command, command_data) -> (int, list[int] | None, int):
+    def __wait_irq(self, register, wait_irq, timeout_ms, use_pin=True) -> (int, bool):
+        """
+        Waits until one of the wait_irq bits is set in an IRQ register, according to the wait strategy.
+        The timeout is a real deadline measured with time.monotonic_ns(), regardless of the strategy.
+        :param register: IRQ register to check (REG_COMM_IRQ or REG_DIV_IRQ)
+        :param wait_irq: bitmask of the IRQ bits that end the wait
+        :param timeout_ms: maximum wait time in milliseconds
+        :param use_pin: False to poll even with WAIT_IRQ (when the interrupt is not routed to the pin)
+        :return n: last value read from the register
+                timed_out: True if the deadline expired before any of the wait_irq bits was set
+        """
+        start = time.monotonic_ns()
+        deadline = start + timeout_ms * 1000000
+        strategy = self.wait_strategy
+        if strategy == self.WAIT_IRQ and not use_pin:
+            strategy = self.WAIT_HYBRID
+
+        while True:
+            if strategy == self.WAIT_IRQ:
+                remaining_ns = deadline - time.monotonic_ns()
+                if remaining_ns > 0:
+                    sleep_start = time.perf_counter()
+                    self.__irq_event.wait(remaining_ns / 1e9)
+                    self.sleep_s += time.perf_counter() - sleep_start
+                self.__irq_event.clear()
+
+            # The clock is sampled before the read: if the host is descheduled past the deadline, the command is
+            # still seen as completed when the chip completed it in the meantime
+            now = time.monotonic_ns()
+            n = self.__dev_read(register)
+            if n & wait_irq:
+                return n, False
+
+            if now >= deadline:
+                return n, True
+
+            if strategy == self.WAIT_SLEEP or (strategy == self.WAIT_HYBRID and now - start >= self.HYBRID_SPIN_NS):
+                self.__sleep(self.POLL_INTERVAL_S)
+
+    def __sleep(self, seconds: float):
+        """
+        Sleeps, accounting the time in sleep_s.
+        :param seconds: time to sleep
+        """
+        start = time.perf_counter()
+        time.sleep(seconds)
+        self.sleep_s += time.perf_counter() - start
+
+    def __timer_reload(self, timeout_profile: str) -> int:
+        """
+        :param timeout_profile: name of the timeout profile
+        :return: TReloadVal of the profile: the shortest timer period not below the one of the profile
+        """
+        ticks = math.ceil(self.timeout_profiles[timeout_profile] / 1000 * self.CHIP_CLOCK /
+                          (2 * self.TIMER_PRESCALER + 1))
+        return min(max(ticks - 1, 0), 0xFFFF)
+
+    def __host_timeout_ms(self, timeout_profile: str) -> int:
+        """
+        :param timeout_profile: name of the timeout profile
+        :return: host deadline of a command with the profile, in ms
+        """
+        return math.ceil(self.timeout_profiles[timeout_profile]) + self.TIMEOUT_HOST_MARGIN_MS
+
+    def __send_cmd(self, command, command_data, timeout_profile=TIMEOUT_TRANSCEIVE,
+                   max_len=MAX_LEN) -> (int, bytes, int):
         """
         Sends a command to a tag.
         :param command: command to the MFRC522 chip, needed to send a command to the tag
         :param command_data: data that is needed to complete the command
+        :param timeout_profile: timeout profile of the command (TIMEOUT_REQUEST, TIMEOUT_TRANSCEIVE, TIMEOUT_WRITE,
+                                TIMEOUT_VALUE)
+        :param max_len: maximum number of bytes read from the FIFO, at most FIFO_SIZE
         :return status: status of the calculation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
                 back_data: data returned by the tag
                 bits_len: number of valid bits in the back_data
         """
-        back_data = []
-        bits_len = 0
-        status = self.STATUS_ERR
+        wait_irq = self.__start_cmd(command, command_data, timeout_profile)
+
+        # Waiting for the command to complete (or the chip timer to expire), until the host deadline
+        # CommIRqReg[7..0] = [Set1 TxIRq RxIRq IdleIRq HiAlerIRq LoAlertIRq ErrIRq TimerIRq]
+        (n, timed_out) = self.__wait_irq(self.REG_COMM_IRQ, wait_irq | 0x01, self.__host_timeout_ms(timeout_profile))
+
+        return self.__finish_cmd(command, wait_irq, n, timed_out, max_len)
+
+    def __start_cmd(self, command, command_data, timeout_profile=TIMEOUT_TRANSCEIVE) -> int:
+        """
+        Loads the FIFO and starts a command, without waiting for its completion.
+        :param command: command to the MFRC522 chip, needed to send a command to the tag
+        :param command_data: data that is needed to complete the command
+        :param timeout_profile: timeout profile of the command, the timer is reprogrammed only if it changes
+        :return wait_irq: bitmask of the CommIRqReg bits that signal the completion of the command
+        """
         irq_en = 0x00
         wait_irq = 0x00
-        n = 0
 
         if command == self.CMD_AUTHENTICATE:
             irq_en = 0x12
@@ -256,91 +553,165 @@ class RC522:
         if command == self.CMD_TRANSCEIVE:
             irq_en = 0x77
             wait_irq = 0x30
+        if command == self.CMD_TRANSMIT:
+            irq_en = 0x43
+            wait_irq = 0x40
 
-        self.__dev_write(self.REG_COMM_I_EN, irq_en | 0x80)     # interrupt request
-        self.__clear_bitmask(self.REG_COMM_IRQ, 0x80)           # clear all interrupt requests bits
-        self.__set_bitmask(self.REG_FIFO_LEVEL, 0x80)           # FlushBuffer=1, FIFO initialization
+        # Interrupts, FIFO and command in a single batched SPI call
+        script = RegisterScript()
+        if self.wait_strategy == self.WAIT_IRQ:
+            # Route to the IRQ pin only the interrupts that end the wait (and the timer), IRqInv=1
+            script.write(self.REG_COMM_I_EN, wait_irq | 0x01 | 0x80)
+        else:
+            script.write(self.REG_COMM_I_EN, irq_en | 0x80)     # interrupt request
+        script.write(self.REG_COMM_IRQ, 0x7F)                   # Set1=0, clear all interrupt requests bits
+        script.write(self.REG_FIFO_LEVEL, 0x80)                 # FlushBuffer=1, FIFO initialization
 
-        self.__dev_write(self.REG_COMMAND, self.CMD_IDLE)       # no action, cancel the current command
+        script.write(self.REG_COMMAND, self.CMD_IDLE)           # no action, cancel the current command
 
-        for i in range(len(command_data)):
-            self.__dev_write(self.REG_FIFO_DATA, command_data[i])   # write command_data in the tag's register
+        # Timer period of the profile, the reload registers are served by the shadow cache
+        reload = self.__timer_reload(timeout_profile)
+        if self.__dev_read(self.REG_TIMER_RELOAD_H) != reload >> 8:
+            script.write(self.REG_TIMER_RELOAD_H, reload >> 8)
+        if self.__dev_read(self.REG_TIMER_RELOAD_L) != reload & 0xFF:
+            script.write(self.REG_TIMER_RELOAD_L, reload & 0xFF)
 
-        self.__dev_write(self.REG_COMMAND, command)                 # write the command in the tag's register
+        script.write_burst(self.REG_FIFO_DATA, command_data)    # write command_data in the FIFO
+
+        script.write(self.REG_COMMAND, command)                 # write the command in the tag's register
 
         if command == self.CMD_TRANSCEIVE:
-            self.__set_bitmask(self.REG_BIT_FRAMING, 0x80)          # StartSend=1, transmission of data starts
-
-        # Waiting for the command to complete, setting a 25 ms max timeout
-        timeout_ms = 25
-        stop = False
-        while not stop:
-            n = self.__dev_read(self.REG_COMM_IRQ)
-            # CommIRqReg[7..0] = [Set1 TxIRq RxIRq IdleIRq HiAlerIRq LoAlertIRq ErrIRq TimerIRq]
-            timeout_ms -= 1
-            if ~((timeout_ms != 0) and ~(n & 0x01) and ~(n & wait_irq)):
-                stop = True
-            time.sleep(0.001)  # wait 1 ms
-
-        self.__clear_bitmask(self.REG_BIT_FRAMING, 0x80)            # StartSend=0
-
-        if timeout_ms != 0:  # request did not time out
-            if (self.__dev_read(self.REG_ERROR) & 0x1B) == 0x00:    # BufferOvfl Collerr CRCErr ProtocolErr
+            # StartSend=1, transmission of data starts (BitFramingReg is served by the shadow cache)
+            script.write(self.REG_BIT_FRAMING, self.__dev_read(self.REG_BIT_FRAMING) | 0x80)
+
+        # No edge of the IRQ pin is due before the command starts
+        self.__irq_event.clear()
+        self.__run_script(script)
+
+        return wait_irq
+
+    def __finish_cmd(self, command, wait_irq, n, timed_out, max_len=MAX_LEN) -> (int, bytes, int):
+        """
+        Completes a command started by __start_cmd(), reading the errors and the data received from the tag.
+        :param command: command started
+        :param wait_irq: bitmask returned by __start_cmd()
+        :param n: last value read from REG_COMM_IRQ
+        :param timed_out: True if the host deadline expired before the completion of the command
+        :param max_len: maximum number of bytes read from the FIFO
+        :return status: status of the calculation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+                back_data: data returned by the tag
+                bits_len: number of valid bits in the back_data
+        """
+        back_data = b""
+        bits_len = 0
+        status = self.STATUS_ERR
+        self.last_error = 0
+        self.last_timed_out = timed_out
+
+        # StartSend=0 and the result registers in a single batched SPI call
+        script = RegisterScript()
+        script.write(self.REG_BIT_FRAMING, self.__dev_read(self.REG_BIT_FRAMING) & ~0x80)
+        script.read(self.REG_ERROR)
+        script.read(self.REG_FIFO_LEVEL)
+        script.read(self.REG_CONTROL)
+        (error, fifo_level, control) = self.__run_script(script)
+
+        if not timed_out:  # request did not time out
+            self.last_error = error & 0x1B  # BufferOvfl CollErr ParityErr ProtocolErr
+            if self.last_error == 0x00:
                 status = self.STATUS_OK
 
-                if n & irq_en & 0x01:
+                if not (n & wait_irq):  # only the chip timer expired, nothing answered
                     status = self.STATUS_NO_TAG_ERR
-
-                if command == self.CMD_TRANSCEIVE:
-                    n = self.__dev_read(self.REG_FIFO_LEVEL)
-                    last_bits = self.__dev_read(self.REG_CONTROL) & 0x07
-                    if last_bits != 0:
-                        bits_len = (n - 1) * 8 + last_bits
-                    else:
-                        bits_len = n * 8
-
-                    if n == 0:
-                        n = 1
-                    if n > self.MAX_LEN:
-                        n = self.MAX_LEN
-
-                    # Reading the received data from FIFO
-                    for i in range(n):
-                        back_data.append(self.__dev_read(self.REG_FIFO_DATA))
             else:
                 status = self.STATUS_ERR
 
+            # After a bit collision (only), the bits received before it are valid: the anti-collision needs them
+            if command == self.CMD_TRANSCEIVE and (status == self.STATUS_OK or self.last_error == 0x08):
+                n = fifo_level
+                last_bits = control & 0x07
+                if last_bits != 0:
+                    bits_len = (n - 1) * 8 + last_bits
+                else:
+                    bits_len = n * 8
+
+                if n == 0:
+                    n = 1
+                if n > max_len:
+                    n = max_len
+
+                # Reading the received data from FIFO
+                back_data = self.__dev_read_burst(self.REG_FIFO_DATA, n)
+
         return status, back_data, bits_len
 
-    def __calculate_crc(self, data) -> list[int]:
+    def __command(self, length, crc=True) -> memoryview:
+        """
+        Completes a frame built in the command buffer, appending its CRC_A.
+        :param length: length of the frame, CRC_A excluded
+        :param crc: False for the frames sent without CRC_A
+        :return: view of the frame in the command buffer, valid until the next command
+        """
+        if crc:
+            result = self.__calculate_crc(self.__cmd_view[:length])
+            self.__cmd[length] = result & 0xFF
+            self.__cmd[length + 1] = result >> 8
+            length += 2
+        return self.__cmd_view[:length]
+
+    def __calculate_crc(self, data) -> int:
         """
-        Calculates the CRC value for some data that should be sent to a tag.
+        Calculates the CRC value for some data that should be sent to a tag, according to the CRC mode.
         :param data: data to calculate the CRC for
-        :return: result: result of the CRC calculation
+        :return: result: result of the CRC calculation, 16 bits
         """
-        self.__clear_bitmask(self.REG_DIV_IRQ, 0x04)            # CRCIrq = 0
-        self.__set_bitmask(self.REG_FIFO_LEVEL, 0x80)           # clear the FIFO pointer
+        if self.crc_mode == self.CRC_MODE_HOST:
+            return crc_a(data)
 
-        for i in range(len(data)):
-            self.__dev_write(self.REG_FIFO_DATA, data[i])
+        result = self.__calculate_crc_chip(data)
+
+        if self.crc_mode == self.CRC_MODE_VERIFY:
+            host_result = crc_a(data)
+            if host_result != result:
+                if self.metrics is not None:
+                    self.metrics.count_error("crc", "crc_mismatch")
+                if self.debug:
+                    print(f"[d] RC522: CRC mismatch for data={bytes(data).hex()} - "
+                          f"host={host_result:04X}, chip={result:04X}")
+
+        return result
 
-        self.__dev_write(self.REG_COMMAND, self.CMD_CALC_CRC)
+    def __calculate_crc_chip(self, data) -> int:
+        """
+        Calculates the CRC value for some data using the CRC coprocessor of the MFRC522 chip.
+        :param data: data to calculate the CRC for
+        :return: result: result of the CRC calculation, 16 bits
+        """
+        start = time.perf_counter()
+        script = RegisterScript()
+        script.write(self.REG_DIV_IRQ, 0x04)                    # Set2=0, CRCIrq = 0
+        script.write(self.REG_FIFO_LEVEL, 0x80)                 # clear the FIFO pointer
+        script.write_burst(self.REG_FIFO_DATA, data)
+        script.write(self.REG_COMMAND, self.CMD_CALC_CRC)
+        self.__run_script(script)
 
-        # Wait for the CRC calculation to complete, setting a 25 ms max timeout
-        timeout_ms = 25
-        stop = False
-        while not stop:
-            n = self.__dev_read(self.REG_DIV_IRQ)
-            timeout_ms -= 1
-            if not ((timeout_ms != 0) and not (n & 0x04)):  # CRCIrq = 1
-                stop = True
-            time.sleep(0.001)  # wait 1 ms
+        # Wait for the CRC calculation to complete (CRCIrq = 1), the IRQ pin is not used here
+        (n, timed_out) = self.__wait_irq(self.REG_DIV_IRQ, 0x04, self.CMD_TIMEOUT_MS, use_pin=False)
 
         # Read the result from the CRC calculation
-        result = [self.__dev_read(self.REG_CRC_RESULT_L), self.__dev_read(self.REG_CRC_RESULT_M)]
+        script = RegisterScript()
+        script.read(self.REG_CRC_RESULT_L)
+        script.read(self.REG_CRC_RESULT_M)
+        (crc_l, crc_m) = self.__run_script(script)
+        result = (crc_m << 8) | crc_l
+
+        if self.metrics is not None:
+            self.metrics.observe("crc", self.STATUS_ERR if timed_out else self.STATUS_OK,
+                                 time.perf_counter() - start, "timeout" if timed_out else None)
         return result
 
-    def request_tag(self, req_mode=0x26) -> (int, list[int] | None):
+    @instrumented("reqa")
+    def request_tag(self, req_mode=0x26) -> (int, bytes):
         """
         Checks (once) to see if there is a tag in the vicinity.
         :param req_mode: mode of the request
@@ -354,10 +725,60 @@ class RC522:
         """
         self.__dev_write(self.REG_BIT_FRAMING, 0x07)        # TxLastBists = BitFramingReg[2..0]
 
-        cmd_data = [req_mode]
-        (status, tag_type, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
+        self.__cmd[0] = req_mode
+        (status, tag_type, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(1, crc=False),
+                                                       self.TIMEOUT_REQUEST)
+
+        return self.__request_result(status, tag_type, bits_len)
 
-        if (status != self.STATUS_OK) | (bits_len != 0x10):  # tag_type has to be 0x10 = 16 bits (2 bytes) length
+    def start_request_tag(self, req_mode=0x26, timeout_ms=CMD_TIMEOUT_MS):
+        """
+        Starts a tag request without waiting for the answer, that is collected by poll_request_tag().
+        While the chip waits for the tag (up to the timer period when the field is empty) the host is free, e.g. to
+        drive other readers.
+        :param req_mode: mode of the request
+        :param timeout_ms: host deadline of the request, in milliseconds
+        """
+        self.__dev_write(self.REG_BIT_FRAMING, 0x07)        # TxLastBists = BitFramingReg[2..0]
+
+        start = time.perf_counter()
+        self.__cmd[0] = req_mode
+        wait_irq = self.__start_cmd(self.CMD_TRANSCEIVE, self.__command(1, crc=False), self.TIMEOUT_REQUEST)
+        self.__pending_request = (wait_irq, time.monotonic_ns() + timeout_ms * 1000000, start)
+
+    def poll_request_tag(self) -> (int | None, bytes | None):
+        """
+        Checks, with a single register read, the tag request started by start_request_tag().
+        :return status: None while the request is in progress, then as request_tag()
+                tag_type: None while the request is in progress, then as request_tag()
+        """
+        if self.__pending_request is None:
+            return self.STATUS_ERR, b""
+        (wait_irq, deadline, start) = self.__pending_request
+
+        n = self.__dev_read(self.REG_COMM_IRQ)
+        timed_out = not (n & (wait_irq | 0x01)) and time.monotonic_ns() >= deadline
+        if not (n & (wait_irq | 0x01)) and not timed_out:
+            return None, None
+
+        self.__pending_request = None
+        (status, tag_type, bits_len) = self.__finish_cmd(self.CMD_TRANSCEIVE, wait_irq, n, timed_out)
+
+        (status, tag_type) = self.__request_result(status, tag_type, bits_len)
+        if self.metrics is not None:
+            self.metrics.observe("reqa", status, time.perf_counter() - start,
+                                 Metrics.error_cause(status, self.last_error, self.last_timed_out))
+        return status, tag_type
+
+    def __request_result(self, status, tag_type, bits_len) -> (int, bytes):
+        """
+        Checks the answer to a tag request.
+        :return status: status of the request (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+                tag_type: type of the tag, if one is found
+        """
+        if status == self.STATUS_ERR and self.last_error == 0x08:  # several tags answered, with different ATQA
+            status = self.STATUS_OK
+        if (status == self.STATUS_OK) and (bits_len != 0x10):  # tag_type has to be 0x10 = 16 bits (2 bytes) length
             status = self.STATUS_ERR
 
         if self.debug:
@@ -365,10 +786,36 @@ class RC522:
 
         return status, tag_type
 
-    def wait_for_tag(self, scan_interval: float) -> (int, list[int] | None):
+    @instrumented("halt")
+    def halt_tag(self) -> int:
+        """
+        Sends HLTA to the selected tag, then stops Crypto1.
+        A halted tag ignores REQA and answers only WUPA (ACT_REQ_ALL), so it can be parked in the field while polling.
+        The HLTA is encrypted by the chip if a Crypto1 session is active, as an authenticated tag expects.
+        :return status: status of the transmission (0 = OK, 2 = ERROR), the tag does not answer to HLTA
+        """
+        self.__dev_write(self.REG_BIT_FRAMING, 0x00)           # TxLastBits = BitFramingReg[2..0]
+
+        self.__cmd[0:2] = bytes((self.ACT_HALT, 0x00))
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSMIT, self.__command(2))
+
+        # No answer is expected: stop the timer started by the transmission (TAuto), instead of letting it expire
+        # later, while another command is waiting
+        self.__dev_write(self.REG_CONTROL, 0x80)                # TStopNow=1
+        self.__stop_crypto()
+        self.sak = None
+        self.uid = None
+
+        if self.debug:
+            print(f"[d] RC522.halt_tag() >>> status={status}")
+
+        return status
+
+    def wait_for_tag(self, scan_interval: float, req_mode=ACT_REQ_IDL) -> (int, bytes):
         """
         Performs tag requests until a new one is discovered.
         :param scan_interval: seconds between two requests.
+        :param req_mode: mode of the requests
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
                 tag_type: type of the found tag
                         0x4400 = Mifare_UltraLight
@@ -378,106 +825,253 @@ class RC522:
                         0x4403 = Mifare_DESFire
         """
         status = self.STATUS_ERR
-        tag_type = 0
+        tag_type = b""
 
         while status != self.STATUS_OK:
-            (status, tag_type) = self.request_tag()
-            time.sleep(scan_interval)
+            (status, tag_type) = self.request_tag(req_mode)
+            self.__sleep(scan_interval)
 
         if self.debug:
             print(f"[d] RC522.wait_for_tag() >>> status={status}, tag_type={bytes(tag_type).hex()}")
 
         return status, tag_type
 
-    def anti_collision(self) -> (int, list[int] | None):
+    def anti_collision(self) -> (int, bytes):
         """
         Performs the collision detection to avoid collisions that might occur if there are multiple tags available.
+        Bit collisions are resolved, so with several tags in the field one of them is found.
+        Note: it covers cascade level 1 only, for 7 and 10 bytes UIDs select_tag() completes the other levels.
         :return status: status of the collision detection (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
                 uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+                          (cascade tag 0x88 and the first 3 bytes of the UID, for longer UIDs)
         """
-        uid_checksum = 0
-        self.__dev_write(self.REG_BIT_FRAMING, 0x00)           # TxLastBits = BitFramingReg[2..0]
+        (status, uid_data) = self.__anti_collision_level(0)
 
-        cmd_data = [self.ACT_ANTI_COLL, 0x20]
-        (status, uid_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
+        if self.debug:
+            print(f"[d] RC522.anti_collision() >>> status={status}, uid_data={bytes(uid_data).hex()}")
 
-        # uid_data = UID (4 bytes) | checksum (1 byte) -> 5 bytes total
-        # checksum = XOR (^) of the 4 bytes of the UID
+        return status, uid_data
 
-        if status == self.STATUS_OK:
-            if len(uid_data) == 5:  # the uid_data has the correct size (5 bytes)
-                # Compute the checksum of the received UID
-                for i in range(4):
-                    uid_checksum = uid_checksum ^ uid_data[i]
-                # The checksum should be the same as the one provided from the tag (uid_data[4]).
-                if uid_checksum != uid_data[4]:
+    @instrumented("anticollision")
+    def __anti_collision_level(self, level) -> (int, bytes):
+        """
+        Bitwise anti-collision loop of a cascade level (ISO/IEC 14443-3, 6.5.3).
+        The known bits of the UID are sent, and the tags matching them answer with the rest: at a collision the
+        known bits are extended up to the collided one, choosing 1, and the loop is repeated until one tag answers
+        alone.
+        :param level: cascade level, from 0
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                uid_cl: UID part of the cascade level (4 bytes) and its checksum (1 byte), 5 bytes total
+        """
+        uid_cl = bytearray(5)
+        known_bits = 0
+        status = self.STATUS_ERR
+
+        while known_bits < 32:
+            tx_last_bits = known_bits % 8
+            known_bytes = known_bits // 8
+            nvb = ((2 + known_bytes) << 4) | tx_last_bits           # NVB: number of valid bits, header included
+            sent_bytes = known_bytes + (1 if tx_last_bits else 0)
+            self.__cmd[0] = self.ACT_SEL_CL[level]
+            self.__cmd[1] = nvb
+            self.__cmd[2:2 + sent_bytes] = uid_cl[0:sent_bytes]
+
+            # RxAlign = TxLastBits: the first received bit completes the last sent byte
+            self.__dev_write(self.REG_BIT_FRAMING, (tx_last_bits << 4) | tx_last_bits)
+            (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE,
+                                                            self.__command(2 + sent_bytes, crc=False))
+
+            if back_data:
+                # The answer starts at the byte of the first unknown bit: merge it with the known bits
+                mask = (0xFF << tx_last_bits) & 0xFF
+                uid_cl[known_bytes] = (uid_cl[known_bytes] & ~mask) | (back_data[0] & mask)
+                for i, value in enumerate(back_data[1:5 - known_bytes], known_bytes + 1):
+                    uid_cl[i] = value
+
+            if status == self.STATUS_OK:
+                known_bits = 40
+            elif status == self.STATUS_ERR and self.last_error == 0x08:  # bit collision
+                coll = self.__dev_read(self.REG_COLLISION)
+                if coll & 0x20:  # CollPosNotValid, out of the range of CollPos
+                    break
+                # CollPos counts from the first bit of the received data, i.e. of the byte of the first unknown bit
+                coll_pos = known_bytes * 8 + ((coll & 0x1F) or 32)
+                if coll_pos <= known_bits or coll_pos > 32:
+                    break
+                # Keep the bits before the collision, then choose the tags with 1 in the collided bit
+                known_bits = coll_pos
+                bit = known_bits - 1
+                uid_cl[bit // 8] = (uid_cl[bit // 8] & ((1 << (bit % 8)) - 1)) | (1 << (bit % 8))
+                for i in range(bit // 8 + 1, 5):
+                    uid_cl[i] = 0
+                if known_bits == 32:
+                    # Collision at the last bit: the chosen UID is complete, only its checksum is missing
+                    uid_cl[4] = uid_cl[0] ^ uid_cl[1] ^ uid_cl[2] ^ uid_cl[3]
+                    status = self.STATUS_OK
+                else:
                     status = self.STATUS_ERR
             else:
-                status = self.STATUS_ERR
+                break
 
-        if self.debug:
-            print(f"[d] RC522.anti_collision() >>> status={status}, uid_data={bytes(uid_data).hex()}")
+        self.__dev_write(self.REG_BIT_FRAMING, 0x00)
 
-        return status, uid_data
+        if status == self.STATUS_OK and (uid_cl[0] ^ uid_cl[1] ^ uid_cl[2] ^ uid_cl[3]) != uid_cl[4]:
+            status = self.STATUS_ERR  # the checksum does not match the UID
+
+        return status, bytes(uid_cl)
+
+    @instrumented("select")
+    def __select_level(self, level, uid_cl) -> (int, int | None):
+        """
+        Selects the tag with a given UID part in a cascade level.
+        :param level: cascade level, from 0
+        :param uid_cl: UID part of the cascade level (4 bytes) and its checksum (1 byte), 5 bytes total
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                sak: SAK answered by the tag, bit 0x04 set if the UID is not complete
+        """
+        self.__cmd[0] = self.ACT_SEL_CL[level]
+        self.__cmd[1] = 0x70
+        self.__cmd[2:7] = uid_cl[0:5]
+
+        self.__dev_write(self.REG_BIT_FRAMING, 0x00)
+        (status, result_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(7))
+
+        if status != self.STATUS_OK or bits_len != 0x18:  # 0x18 = 24 bits, SAK (1 byte) | CRC (2 bytes)
+            return (status if status == self.STATUS_NO_TAG_ERR else self.STATUS_ERR), None
+        return status, result_data[0]
 
     def select_tag(self, uid_data) -> int:
         """
-        Selects a given tag.
-        :param uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+        Selects a given tag, through all its cascade levels.
+        :param uid_data: UID of the tag, one of:
+                         - UID (4 bytes) concatenated with checksum (1 byte), 5 bytes total, as from anti_collision();
+                           if it starts with the cascade tag 0x88, the other levels are resolved with anti-collision
+                         - complete UID of 4, 7 or 10 bytes
         :return status: status of the tag selection (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
         """
+        uid_data = bytes(uid_data)
+        if len(uid_data) == 5:
+            parts = [uid_data]
+        elif len(uid_data) in (4, 7, 10):
+            parts = []
+            for level in range(len(uid_data) // 3):
+                if level < len(uid_data) // 3 - 1:
+                    part = bytes((self.CASCADE_TAG,)) + uid_data[level * 3:level * 3 + 3]
+                else:
+                    part = uid_data[level * 3:level * 3 + 4]
+                parts.append(part + bytes((part[0] ^ part[1] ^ part[2] ^ part[3],)))
+        else:
+            raise ValueError("uid_data must be 4, 5, 7 or 10 bytes long")
+
+        uid = b""
+        sak = None
+        status = self.STATUS_OK
+        for level in range(len(self.ACT_SEL_CL)):
+            if level < len(parts):
+                uid_cl = parts[level]
+            else:
+                (status, uid_cl) = self.__anti_collision_level(level)
+                if status != self.STATUS_OK:
+                    break
+            (status, sak) = self.__select_level(level, uid_cl)
+            if status != self.STATUS_OK:
+                break
+            if not sak & 0x04:  # UID complete
+                uid += uid_cl[0:4]
+                break
+            uid += uid_cl[1:4]  # skip the cascade tag
+            if level == len(self.ACT_SEL_CL) - 1:
+                status = self.STATUS_ERR  # the UID cannot be longer than 10 bytes
 
-        cmd_data = [self.ACT_SELECT_TAG, 0x70]
+        if status == self.STATUS_OK:
+            self.sak = sak
+            self.uid = uid
+        else:
+            status = self.STATUS_ERR
+            self.sak = None
+            self.uid = None
 
-        for i in range(5):
-            cmd_data.append(uid_data[i])
+        if self.debug:
+            print(f"[d] RC522.select_tag(uid_data={bytes(uid_data).hex()}) >>> status={status}, sak={self.sak}")
 
-        crc = self.__calculate_crc(cmd_data)
-        cmd_data.append(crc[0])
-        cmd_data.append(crc[1])
+        return status
 
-        (status, result_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
+    def select_any_tag(self) -> (int, bytes):
+        """
+        Performs the anti-collision loop through all the cascade levels and selects one of the tags in the field.
+        The tags must have answered a request (request_tag()) before.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                uid: complete UID of the selected tag, 4, 7 or 10 bytes
+        """
+        (status, uid_cl) = self.__anti_collision_level(0)
+        if status == self.STATUS_OK:
+            status = self.select_tag(uid_cl)
 
-        if status != self.STATUS_OK or bits_len != 0x18:  # 0x18 = 24 bits
-            status = self.STATUS_ERR
+        return status, (self.uid if status == self.STATUS_OK else b"")
+
+    def inventory(self, max_tags: int = 32) -> (int, list[tuple[bytes, int]]):
+        """
+        Enumerates every tag in the field in one pass: each one is found with the anti-collision, selected and halted,
+        so that it does not answer the following requests.
+        The first request is a WUPA, so tags halted before are counted too. All the tags are halted at the end:
+        a WUPA (request_tag(ACT_REQ_ALL)) wakes them up again.
+        :param max_tags: maximum number of tags to enumerate
+        :return status: 0 = OK, 1 = NO_TAG_ERROR (no tags in the field), 2 = ERROR (the enumeration stopped early)
+                tags: (UID, SAK) of each tag found
+        """
+        tags = []
+        req_mode = self.ACT_REQ_ALL
+        status = self.STATUS_OK
+
+        while len(tags) < max_tags:
+            (status, tag_type) = self.request_tag(req_mode)
+            if status != self.STATUS_OK:
+                break
+            (status, uid) = self.select_any_tag()
+            if status != self.STATUS_OK:
+                break
+            tags.append((uid, self.sak))
+            self.halt_tag()
+            req_mode = self.ACT_REQ_IDL  # from now on, only the tags not halted yet
+
+        if status == self.STATUS_NO_TAG_ERR and tags:
+            status = self.STATUS_OK
 
         if self.debug:
-            print(f"[d] RC522.select_tag(uid_data={bytes(uid_data).hex()}) >>> status={status}")
+            print(f"[d] RC522.inventory() >>> status={status}, uids={[bytes(uid).hex() for (uid, sak) in tags]}")
 
-        return status
+        return status, tags
 
+    @instrumented("auth")
     def auth(self, auth_method, block_number, key, uid) -> int:
         """
         Performs the authentication for a given block.
         :param auth_method: 0x60 (AUTH_A) or 0x61 (AUTH_B)
         :param block_number: number of the block (from 0 to SECTORS_NUMBER * 4 - 1)
         :param key: key for the authentication
-        :param uid: UID of the tag, truncated if > 4 bytes
+        :param uid: UID of the tag, only the last 4 bytes are used if longer
         :return status: status of the authentication (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
         """
         # cmd_data = auth_method (1 byte) | block_number | key (6 bytes) | UID (4 bytes)
-        cmd_data = [auth_method, block_number]
-
-        for i in range(len(key)):
-            cmd_data.append(key[i])
-
-        for i in range(4):
-            cmd_data.append(uid[i])
+        key_len = len(key)
+        self.__cmd[0] = auth_method
+        self.__cmd[1] = block_number
+        self.__cmd[2:2 + key_len] = key
+        # Tags with a 7 bytes UID authenticate with its last 4 bytes
+        self.__cmd[2 + key_len:6 + key_len] = uid[len(uid) - 4:]
 
         # Start the authentication itself
-        (status, result, bits_len) = self.__send_cmd(self.CMD_AUTHENTICATE, cmd_data)
-
-        if not (status == self.STATUS_OK):
-            print("[e] Authentication error")
-        if not (self.__dev_read(self.REG_STATUS_2) & 0x08) != 0:
-            print("   (status2reg & 0x08) != 0")
+        (status, result, bits_len) = self.__send_cmd(self.CMD_AUTHENTICATE, self.__command(6 + key_len, crc=False))
 
         if self.debug:
-            print(f"[d] RC522.auth(block_number={block_number}) >>> status={status}")
+            # MFCrypto1On = Status2Reg[3], set by a successful authentication
+            crypto_on = (self.__dev_read(self.REG_STATUS_2) & 0x08) != 0
+            print(f"[d] RC522.auth(block_number={block_number}) >>> status={status}, crypto1={crypto_on}")
 
         return status
 
-    def read_block(self, block_number) -> (int, list[int] | None):
+    @instrumented("read")
+    def read_block(self, block_number) -> (int, bytes):
         """
         Reads a desired block.
         Note: it does not manage authentication.
@@ -485,21 +1079,17 @@ class RC522:
         :return status: status of the read operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
                 read_data: read data
         """
-        cmd_data = [self.ACT_READ, block_number]
-        crc = self.__calculate_crc(cmd_data)
-        cmd_data.append(crc[0])
-        cmd_data.append(crc[1])
+        self.__cmd[0] = self.ACT_READ
+        self.__cmd[1] = block_number
 
-        (status, read_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
-
-        if not (status == self.STATUS_OK):
-            print("[e] RC522.read_block() >>> Error while reading")
+        (status, read_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2))
 
         if self.debug:
             print(f"[d] RC522.read_block(block_number={block_number}) >>> status={status}, read_data={bytes(read_data).hex()}")
 
         return status, read_data
 
+    @instrumented("write")
     def write_block(self, block_number, data) -> int:
         """
         Writes data to a desired block.
@@ -508,43 +1098,376 @@ class RC522:
         :param data: data to be written
         :return status: status of the write operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
         """
-        cmd_data = [self.ACT_WRITE, block_number]
-        crc = self.__calculate_crc(cmd_data)
-        cmd_data.append(crc[0])
-        cmd_data.append(crc[1])
+        if len(data) < 16:
+            raise ValueError("a block is 16 bytes long")
+        self.__cmd[0] = self.ACT_WRITE
+        self.__cmd[1] = block_number
 
-        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2))
 
         if not (status == self.STATUS_OK) or not (bits_len == 4) or not ((back_data[0] & 0x0F) == 0x0A):
             status = self.STATUS_ERR
 
         if status == self.STATUS_OK:
-            cmd_data = []
-            for i in range(16):
-                cmd_data.append(data[i])
-
-            crc = self.__calculate_crc(cmd_data)
-            cmd_data.append(crc[0])
-            cmd_data.append(crc[1])
+            self.__cmd[0:16] = data[0:16]
 
-            (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, cmd_data)
+            (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(16),
+                                                            self.TIMEOUT_WRITE)
 
             if not (status == self.STATUS_OK) or not (bits_len == 4) or not ((back_data[0] & 0x0F) == 0x0A):
                 status = self.STATUS_ERR
-                print("[e] Error while writing")
 
             if self.debug:
                 print(f"[d] RC522.write_block(block_number={block_number}) >>> status={status}")
 
         return status
 
-    def restart_crypto(self):
+    def __check_answer(self, status, back_data, bits_len, length) -> (int, bytes | None):
         """
-        Restarts Crypto1 and re-initializes the reader (with a soft reset) for a new communication.
+        Checks the answer of a tag to a command that returns data followed by its CRC_A.
+        :param status: status of __send_cmd()
+        :param back_data: data returned by the tag
+        :param bits_len: number of valid bits in the back_data
+        :param length: expected number of data bytes, CRC_A excluded
+        :return status: STATUS_ERR if the answer is short (e.g. a NAK) or its CRC_A is wrong
+                data: data without the CRC_A, None on errors
+        """
+        if status != self.STATUS_OK:
+            return status, None
+        if bits_len != (length + 2) * 8:
+            return self.STATUS_ERR, None
+        if crc_a(back_data[:length]) != back_data[length] | (back_data[length + 1] << 8):
+            return self.STATUS_ERR, None
+        return status, back_data[:length]
+
+    def __value_cmd(self, action, block_number, operand) -> int:
+        """
+        Runs the two phases of a value operation: the command (acknowledged by the tag) and its operand, which the tag
+        does not acknowledge, answering only with a NAK on errors. The result goes to the transfer buffer of the tag.
+        :param action: ACT_INCREMENT, ACT_DECREMENT or ACT_RESTORE
+        :param block_number: number of the value block
+        :param operand: 4 bytes operand
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        self.__cmd[0] = action
+        self.__cmd[1] = block_number
+
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2))
+
+        if not (status == self.STATUS_OK) or not (bits_len == 4) or not ((back_data[0] & 0x0F) == 0x0A):
+            status = self.STATUS_ERR
+
+        if status == self.STATUS_OK:
+            self.__cmd[0:4] = operand
+
+            (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(4),
+                                                            self.TIMEOUT_VALUE)
+
+            # Success is the expiry of the chip timer, without any answer
+            if status == self.STATUS_NO_TAG_ERR and not self.last_timed_out:
+                status = self.STATUS_OK
+            else:
+                status = self.STATUS_ERR
+
+        if self.debug:
+            print(f"[d] RC522.__value_cmd(action=0x{action:02X}, block_number={block_number}) >>> status={status}")
+
+        return status
+
+    @instrumented("increment")
+    def increment(self, block_number, delta) -> int:
+        """
+        Adds delta to a value block, storing the result in the transfer buffer of the tag (see transfer()).
+        Note: it does not manage authentication.
+        :param block_number: number of the value block
+        :param delta: amount to add, from 0 to 2^31 - 1
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        if not 0 <= delta <= 0x7FFFFFFF:
+            raise ValueError("delta must be from 0 to 2^31 - 1")
+        return self.__value_cmd(self.ACT_INCREMENT, block_number, delta.to_bytes(4, "little"))
+
+    @instrumented("decrement")
+    def decrement(self, block_number, delta) -> int:
+        """
+        Subtracts delta from a value block, storing the result in the transfer buffer of the tag (see transfer()).
+        Note: it does not manage authentication.
+        :param block_number: number of the value block
+        :param delta: amount to subtract, from 0 to 2^31 - 1
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        if not 0 <= delta <= 0x7FFFFFFF:
+            raise ValueError("delta must be from 0 to 2^31 - 1")
+        return self.__value_cmd(self.ACT_DECREMENT, block_number, delta.to_bytes(4, "little"))
+
+    @instrumented("restore")
+    def restore(self, block_number) -> int:
+        """
+        Copies a value block to the transfer buffer of the tag (see transfer()), e.g. to back it up.
+        Note: it does not manage authentication.
+        :param block_number: number of the value block
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        return self.__value_cmd(self.ACT_RESTORE, block_number, bytes(4))
+
+    @instrumented("transfer")
+    def transfer(self, block_number) -> int:
+        """
+        Writes the transfer buffer of the tag, the result of the last increment(), decrement() or restore(), to a
+        block of the same sector. The block is written in a single, tear-proof operation.
+        Note: it does not manage authentication.
+        :param block_number: number of the destination block
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        self.__cmd[0] = self.ACT_TRANSFER
+        self.__cmd[1] = block_number
+
+        # The tag answers with the ACK once the EEPROM is written
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2), self.TIMEOUT_WRITE)
+
+        if not (status == self.STATUS_OK) or not (bits_len == 4) or not ((back_data[0] & 0x0F) == 0x0A):
+            status = self.STATUS_ERR
+
+        if self.debug:
+            print(f"[d] RC522.transfer(block_number={block_number}) >>> status={status}")
+
+        return status
+
+    @instrumented("get_version")
+    def get_version(self) -> (int, bytes | None):
+        """
+        Reads the version of a MIFARE Ultralight EV1 or NTAG21x tag (GET_VERSION).
+        Older tags (MIFARE Ultralight, Ultralight C) answer with a NAK or do not answer, and go back to the IDLE state:
+        the tag must be selected again.
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+                version: 8 bytes (header, vendor, product type, subtype, major, minor, storage size, protocol)
+        """
+        self.__cmd[0] = self.ACT_GET_VERSION
+
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(1))
+        (status, version) = self.__check_answer(status, back_data, bits_len, 8)
+
+        if self.debug:
+            print(f"[d] RC522.get_version() >>> status={status}, version={(version or b'').hex()}")
+
+        return status, version
+
+    @instrumented("fast_read")
+    def fast_read(self, start_page, end_page) -> (int, bytes | None):
+        """
+        Reads a range of pages of a MIFARE Ultralight EV1 or NTAG21x tag in a single command (FAST_READ).
+        The answer must fit in the FIFO: at most FAST_READ_MAX_PAGES pages.
+        :param start_page: first page
+        :param end_page: last page, included
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+                read_data: PAGE_SIZE bytes for each page
+        """
+        length = (end_page - start_page + 1) * self.PAGE_SIZE
+        if not 0 < length <= self.FAST_READ_MAX_PAGES * self.PAGE_SIZE:
+            raise ValueError(f"FAST_READ reads from 1 to {self.FAST_READ_MAX_PAGES} pages")
+        self.__cmd[0:3] = bytes((self.ACT_FAST_READ, start_page, end_page))
+
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(3),
+                                                        max_len=self.FIFO_SIZE)
+        (status, read_data) = self.__check_answer(status, back_data, bits_len, length)
+
+        if self.debug:
+            print(f"[d] RC522.fast_read(start_page={start_page}, end_page={end_page}) >>> status={status}")
+
+        return status, read_data
+
+    @instrumented("read_cnt")
+    def read_counter(self, counter) -> (int, int | None):
+        """
+        Reads a 24 bits one-way counter of a MIFARE Ultralight EV1 (0 to 2) or NTAG21x (2, the NFC counter) tag.
+        The NTAG21x answers with a NAK if the counter is not enabled (NFC_CNT_EN).
+        :param counter: address of the counter
+        :return status: status of the operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+                value: value of the counter
+        """
+        self.__cmd[0] = self.ACT_READ_CNT
+        self.__cmd[1] = counter
+
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2))
+        (status, counter_data) = self.__check_answer(status, back_data, bits_len, 3)
+        value = int.from_bytes(counter_data, "little") if counter_data is not None else None
+
+        if self.debug:
+            print(f"[d] RC522.read_counter(counter={counter}) >>> status={status}, value={value}")
+
+        return status, value
+
+    @instrumented("write_page")
+    def write_page(self, page, data) -> int:
+        """
+        Writes a page of a MIFARE Ultralight or NTAG tag (WRITE).
+        The MIFARE Classic write of write_block() is the COMPATIBILITY_WRITE of these tags.
+        :param page: number of the page
+        :param data: PAGE_SIZE bytes to be written
+        :return status: status of the write operation (0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR)
+        """
+        if len(data) < self.PAGE_SIZE:
+            raise ValueError(f"a page is {self.PAGE_SIZE} bytes long")
+        self.__cmd[0] = self.ACT_WRITE_PAGE
+        self.__cmd[1] = page
+        self.__cmd[2:2 + self.PAGE_SIZE] = data[0:self.PAGE_SIZE]
+
+        # The tag answers with the ACK once the EEPROM is written
+        (status, back_data, bits_len) = self.__send_cmd(self.CMD_TRANSCEIVE, self.__command(2 + self.PAGE_SIZE),
+                                                        self.TIMEOUT_WRITE)
+
+        if not (status == self.STATUS_OK) or not (bits_len == 4) or not ((back_data[0] & 0x0F) == 0x0A):
+            status = self.STATUS_ERR
+
+        if self.debug:
+            print(f"[d] RC522.write_page(page={page}) >>> status={status}")
+
+        return status
+
+    def restart_crypto(self, soft_reset: bool = False):
+        """
+        Ends the session with the selected tag, for a new communication.
+        By default it sends HLTA to the current tag, stops Crypto1 and resets the bit framing, keeping the chip
+        configured and the RF field on: a halted tag answers only WUPA (ACT_REQ_ALL) afterwards.
+        With soft_reset=True it re-initializes the whole reader, e.g. to recover from an error.
         Note: restart_crypto() is necessary before requesting a new tag, after another one has been selected.
+        :param soft_reset: True to re-initialize the reader with a soft reset, turning the RF field off and on
         """
-        self.__stop_crypto()
+        if soft_reset:
+            self.__stop_crypto()
+            self.__init()
+            self.sak = None
+            self.uid = None
+        else:
+            # Also sent without a selected tag: a tag left in READY (e.g. after anti-collision) goes back to IDLE,
+            # otherwise it would drop the next request
+            self.halt_tag()
+            self.__dev_write(self.REG_BIT_FRAMING, 0x00)
+
+        if self.debug:
+            print(f"[d] RC522.restart_crypto(soft_reset={soft_reset}) >>> Restart Crypto1" +
+                  (", re-init the reader (soft reset)" if soft_reset else ""))
+
+    def negotiate_speed(self, max_speed: int = SPI_SPEED_STEPS[-1], steps=SPI_SPEED_STEPS,
+                        rounds: int = SPI_TEST_ROUNDS, self_test: bool = False, margin_steps: int = 1) -> int:
+        """
+        Steps the SPI clock up from the current one and settles on the highest reliable rate, minus a safety margin.
+        Each step is verified by reading VersionReg and by writing and reading back test patterns on
+        REG_TIMER_RELOAD_L, rounds times, and optionally by running the digital self test of the chip: the results
+        must match the ones at the initial (trusted) clock.
+        The reader is re-initialized at the end, so call it before selecting a tag.
+        :param max_speed: highest clock to try, in Hz
+        :param steps: clocks to try, in Hz, in ascending order
+        :param rounds: verifications of each step
+        :param self_test: True to also compare the result of the digital self test
+        :param margin_steps: steps to go back from the highest rate that passed, when a higher one failed
+        :return: the negotiated clock in Hz, as set on the transport
+        """
+        initial = self.transport.speed
+        if initial is None:
+            raise ValueError(f"{type(self.transport).__name__} has no adjustable SPI clock")
+        script = RegisterScript()
+        script.read(self.REG_VERSION)
+        (version,) = self.__run_script(script)
+        if version in (0x00, 0xFF):
+            # Nothing (or a stuck line) on MISO even at the initial clock, the wiring must be checked first
+            if self.debug:
+                print(f"[d] RC522.negotiate_speed() >>> no answer from the chip (version 0x{version:02X})")
+            return initial
+        reference = self.__self_test() if self_test else None
+
+        passed = [initial]
+        failed = False
+        for speed in steps:
+            if speed <= initial or speed > max_speed:
+                continue
+            self.transport.set_speed(speed)
+            ok = self.__verify_spi(version, rounds) and (reference is None or self.__self_test() == reference)
+            if self.debug:
+                print(f"[d] RC522.negotiate_speed() >>> {speed} Hz {'OK' if ok else 'FAILED'}")
+            if not ok:
+                failed = True
+                break
+            passed.append(speed)
+
+        speed = passed[max(0, len(passed) - 1 - margin_steps)] if failed else passed[-1]
+        speed = self.transport.set_speed(speed)
+        # The failed steps may have written garbage to any register
         self.__init()
+        self.spi_clock_hz = self.measure_spi_clock()
 
         if self.debug:
-            print("[d] RC522.restart_crypto() >>> Restart Crypto1, re-init the reader (soft reset)")
+            print(f"[d] RC522.negotiate_speed() >>> speed={speed} Hz, measured clock={self.spi_clock_hz} Hz")
+
+        return speed
+
+    def __verify_spi(self, version: int, rounds: int) -> bool:
+        """
+        Checks the SPI link at the current clock: VersionReg and a write/read-back of the test patterns.
+        :param version: VersionReg read at a trusted clock
+        :param rounds: verifications, each in a single batch
+        :return: True if every value matches
+        """
+        script = RegisterScript()
+        script.read(self.REG_VERSION)
+        for pattern in self.SPI_TEST_PATTERNS:
+            script.write(self.REG_TIMER_RELOAD_L, pattern)
+            script.read(self.REG_TIMER_RELOAD_L)
+        expected = [version, *self.SPI_TEST_PATTERNS]
+        for _ in range(rounds):
+            if self.__run_script(script) != expected:
+                return False
+        return True
+
+    def __self_test(self) -> bytes | None:
+        """
+        Runs the digital self test of the MFRC522 (datasheet, section 16.1.1), which leaves the chip reset.
+        :return: the SELF_TEST_SIZE bytes of the result (fixed for a chip version), None if the test did not complete
+        """
+        self.__soft_reset()
+        # Clear the internal buffer: 25 bytes 0x00 stored by the Mem command
+        script = RegisterScript()
+        script.write(self.REG_FIFO_LEVEL, 0x80)
+        script.write_burst(self.REG_FIFO_DATA, bytes(25))
+        script.write(self.REG_COMMAND, self.CMD_MEM)
+        # Enable the self test and start it with a CalcCRC of 0x00
+        script.write(self.REG_AUTO_TEST, 0x09)
+        script.write(self.REG_FIFO_DATA, 0x00)
+        script.write(self.REG_COMMAND, self.CMD_CALC_CRC)
+        self.__run_script(script)
+
+        deadline = time.perf_counter() + self.CMD_TIMEOUT_MS / 1000
+        while self.__dev_read(self.REG_FIFO_LEVEL) < self.SELF_TEST_SIZE:
+            if time.perf_counter() > deadline:
+                self.__dev_write(self.REG_COMMAND, self.CMD_IDLE)
+                return None
+        self.__dev_write(self.REG_COMMAND, self.CMD_IDLE)
+        result = self.__dev_read_burst(self.REG_FIFO_DATA, self.SELF_TEST_SIZE)
+        self.__dev_write(self.REG_AUTO_TEST, 0x00)
+        return result
+
+    def measure_spi_clock(self, samples: int = 20) -> float | None:
+        """
+        Measures the effective SPI clock, which may differ from the requested one (spidev rounds it down to a divider
+        of the core clock): the time of a 65 bytes read minus the one of a 2 bytes read is the time of 504 bits.
+        The best of several samples is taken, the measure includes the per-byte overhead of the driver.
+        :param samples: reads of each length
+        :return: the clock in Hz, None if it cannot be measured
+        """
+        short = bytes((((self.REG_VERSION << 1) & 0x7E) | 0x80, 0))
+        long = bytes((short[0],)) * self.FIFO_SIZE + b"\x00"
+        (t_short, t_long) = (math.inf, math.inf)
+        for _ in range(samples):
+            start = time.perf_counter()
+            self.transport.transfer_into(short, self.__rx_view[:len(short)])
+            t_short = min(t_short, time.perf_counter() - start)
+            start = time.perf_counter()
+            self.transport.transfer_into(long, self.__rx_view[:len(long)])
+            t_long = min(t_long, time.perf_counter() - start)
+        if self.metrics is not None:
+            for _ in range(samples):
+                self.metrics.count_spi(len(short))
+                self.metrics.count_spi(len(long))
+        if t_long <= t_short:
+            return None
+        return (len(long) - len(short)) * 8 / (t_long - t_short)
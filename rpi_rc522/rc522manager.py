@@ -1,13 +1,49 @@
 #!/usr/bin/env python
-from typing import Optional
+import functools
+import time
+from typing import Iterator, Optional
 
+from .events import PresenceTracker, TagEvent
+from .keyring import KeyRing
+from .metrics import Metrics
 from .rc522 import RC522
-from .utils import get_block_number, get_block_repr
+from .tag_image import TagImage
+from .transport import Transport
+from .utils import get_block_repr, get_sector_number, get_trailer_block_number, get_blocks_number, get_value_block, \
+    parse_value_block
+
+
+def list_compat(block_size: int | None = None):
+    """
+    Decorator of the RC522Manager methods returning (status, data): when the manager has list_compat=True, the
+    bytes-like data (or the list of them) is returned as list[int], as in the previous versions of the library.
+    :param block_size: split the data in lists of block_size bytes, for the flat dump buffer
+    """
+    def as_lists(data):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            if block_size is not None:
+                return [list(data[i:i + block_size]) for i in range(0, len(data), block_size)]
+            return list(data)
+        if isinstance(data, list):
+            return [as_lists(item) for item in data]
+        return data
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            result = func(self, *args, **kwargs)
+            if not self.list_compat:
+                return result
+            return result[0], as_lists(result[1])
+        return wrapper
+    return decorator
 
 
 class RC522Manager:
     """
     High level class that manages an RC522 RFID Reader connected to a Raspberry Pi.
+    UIDs and data are returned as bytes (dump() as a single flat bytearray), list_compat=True returns them as lists of
+    ints instead, for the code written for the previous versions. Data can be passed as any sequence of ints.
     """
     DEFAULT_DEV = "/dev/spidev0.0"
     DEFAULT_SPEED = 1000000
@@ -22,21 +58,40 @@ class RC522Manager:
     STATUS_NO_TAG_ERR = RC522.STATUS_NO_TAG_ERR
     STATUS_ERR = RC522.STATUS_ERR
 
-    def __init__(self, device=DEFAULT_DEV, speed=DEFAULT_SPEED, debug=False):
+    def __init__(self, device=DEFAULT_DEV, speed=DEFAULT_SPEED, debug=False, pin_rst=RC522.PIN_RST_BCM,
+                 transport: Transport | None = None, metrics: Metrics | None = None, auto_speed: bool = False,
+                 list_compat: bool = False, wait_strategy: int = RC522.WAIT_HYBRID, pin_irq: int | None = None):
 
-        self.reader: RC522 = RC522(device=device, speed=speed, debug=debug)
+        self.reader: RC522 = RC522(device=device, speed=speed, debug=debug, pin_rst=pin_rst, transport=transport,
+                                   metrics=metrics, wait_strategy=wait_strategy, pin_irq=pin_irq)
+        if auto_speed:
+            # Raise the SPI clock from speed to the highest reliable rate
+            self.reader.negotiate_speed()
 
-        self.uid: list[int] | None = None
+        self.uid: bytes | None = None
         self.key: list[int] | None = None
         self.auth_method: int | None = None
-        self.last_auth_data: tuple[int, int, list[int], list[int]] | None = None
-        
+        # Crypto1 session: (sector_number, auth_method, key, uid) of the last successful auth, None if not authenticated
+        self.last_auth_data: tuple[int, int, list[int], bytes] | None = None
+        # Candidate keys tried by auth() when no key is set, and the (auth_method, key) found per sector of the tag
+        self.key_ring: KeyRing | None = None
+        self.__sector_keys: dict[int, tuple[int, tuple[int, ...]]] = {}
+        # Lazy image of the selected tag, valid for the lifetime of the selection
+        self.image: TagImage | None = None
+        # True while a tag selected by select_tag() is active, i.e. it has not been halted or reset
+        self.__selected = False
+
         self.debug: bool = debug
+        # Return the data as lists of ints (see list_compat()), the UID attribute excluded
+        self.list_compat: bool = list_compat
 
-    def scan(self, scan_interval: float = DEFAULT_SCAN_INTERVAL, scan_once: bool = False) -> (int, list[int]):
+    @list_compat()
+    def scan(self, scan_interval: float = DEFAULT_SCAN_INTERVAL, scan_once: bool = False) -> (int, bytes):
         """
         Scans for a tag once or until a tag appears.
-        It restarts Crypto1 and performs anti-collision.
+        It ends the previous session (restart_crypto(), halting the selected tag), wakes up the tags with WUPA, so the
+        halted one is found again while it stays in the field, and performs anti-collision.
+        The reader is re-initialized with a soft reset only after an error.
         :param scan_interval: seconds between two requests.
         :param scan_once: True to scan one time, False to scan until a tag appears
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
@@ -46,38 +101,196 @@ class RC522Manager:
             print(f"[d] RC522Manager.scan(scan_once={scan_once}) ...")
 
         self.reader.restart_crypto()
-        uid_data = []
+        self.last_auth_data = None  # the Crypto1 session ended with restart_crypto()
+        self.image = None
+        self.__selected = False
+        uid_data = b""
 
         if scan_once:
             # Request tag once
-            (status, tag_type) = self.reader.request_tag()
+            (status, tag_type) = self.reader.request_tag(RC522.ACT_REQ_ALL)
+            if status == self.STATUS_NO_TAG_ERR:
+                self.__flush_key_hints()
         else:
             # Wait for the tag
-            (status, tag_type) = self.reader.wait_for_tag(scan_interval=scan_interval)
+            self.__flush_key_hints()
+            (status, tag_type) = self.reader.wait_for_tag(scan_interval=scan_interval, req_mode=RC522.ACT_REQ_ALL)
 
         if status == self.STATUS_OK:  # there is a tag
             # Perform anti-collision
             (status, uid_data) = self.reader.anti_collision()
 
+        if status == self.STATUS_ERR:
+            self.reader.restart_crypto(soft_reset=True)
+
         return status, uid_data
 
-    def select_tag(self, uid_data: list[int]) -> int:
+    def start_scan(self, timeout_ms: int = RC522.CMD_TIMEOUT_MS):
+        """
+        Starts a single scan without waiting for the tag answer, see poll_scan().
+        It ends the previous session, as scan(), and sends the tag request (WUPA).
+        :param timeout_ms: time given to the tag to answer, in milliseconds
+        """
+        self.reader.restart_crypto()
+        self.last_auth_data = None  # the Crypto1 session ended with restart_crypto()
+        self.image = None
+        self.__selected = False
+        self.reader.start_request_tag(RC522.ACT_REQ_ALL, timeout_ms=timeout_ms)
+
+    @list_compat()
+    def poll_scan(self) -> (int | None, bytes):
+        """
+        Checks the scan started by start_scan(), performing the anti-collision once a tag answered.
+        :return status: None while the request is in progress, then 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+        """
+        uid_data = b""
+
+        (status, tag_type) = self.reader.poll_request_tag()
+        if status == self.STATUS_OK:  # there is a tag
+            (status, uid_data) = self.reader.anti_collision()
+        elif status == self.STATUS_NO_TAG_ERR:
+            self.__flush_key_hints()
+
+        if status == self.STATUS_ERR:
+            self.reader.restart_crypto(soft_reset=True)
+
+        return status, uid_data
+
+    @list_compat()
+    def presence_scan(self) -> (int, bytes):
+        """
+        Checks the tag in the field without re-initializing the reader, as done by watch().
+        The tag selected by the previous call is parked with HLTA, then a WUPA wakes up both the parked and the new
+        tags. The parked tag is selected again directly, without anti-collision; if it left, the answering tag is
+        selected. The selected tag can be authenticated, read and written until the next call, and its image is kept
+        while it stays in the field.
+        Only an error (e.g. a corrupted frame) re-initializes the reader, with a soft reset.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                uid: complete UID of the selected tag, 4, 7 or 10 bytes
+        """
+        uid = b""
+        parked_uid = self.uid if self.__selected else None
+
+        if self.__selected:
+            self.reader.halt_tag()
+            self.__selected = False
+        self.last_auth_data = None  # the Crypto1 session ended with halt_tag()
+
+        (status, tag_type) = self.reader.request_tag(RC522.ACT_REQ_ALL)
+
+        if status == self.STATUS_OK and parked_uid is not None:
+            if self.select_tag(parked_uid) == self.STATUS_OK:
+                return self.STATUS_OK, self.uid
+            # The parked tag left: the other tags went back to IDLE with the SELECT, wake them up again
+            (status, tag_type) = self.reader.request_tag(RC522.ACT_REQ_ALL)
+
+        if status == self.STATUS_OK:
+            (status, uid_data) = self.reader.anti_collision()
+            if status == self.STATUS_OK:
+                status = self.select_tag(uid_data)
+            if status == self.STATUS_OK:
+                uid = self.uid
+
+        if status != self.STATUS_OK:
+            self.image = None
+        if status == self.STATUS_NO_TAG_ERR:
+            self.__flush_key_hints()
+        if status == self.STATUS_ERR:
+            if self.debug:
+                print("[d] RC522Manager.presence_scan() >>> error, re-init the reader")
+            self.reader.restart_crypto(soft_reset=True)
+
+        return status, uid
+
+    @list_compat()
+    def inventory(self, max_tags: int = 32) -> (int, list[bytes]):
+        """
+        Enumerates every tag in the field in one pass, with RC522.inventory().
+        It ends the previous session, and leaves all the tags halted: select_uid() wakes up and selects one of them.
+        :param max_tags: maximum number of tags to enumerate
+        :return status: 0 = OK, 1 = NO_TAG_ERROR (no tags in the field), 2 = ERROR (the enumeration stopped early)
+                uids: complete UID (4, 7 or 10 bytes) of each tag found, also when the enumeration stopped early
+        """
+        if self.debug:
+            print(f"[d] RC522Manager.inventory(max_tags={max_tags}) ...")
+
+        self.reader.restart_crypto()
+        self.last_auth_data = None
+        self.image = None
+        self.__selected = False
+
+        (status, tags) = self.reader.inventory(max_tags)
+
+        if status == self.STATUS_ERR:
+            self.reader.restart_crypto(soft_reset=True)
+
+        return status, [uid for (uid, sak) in tags]
+
+    def select_uid(self, uid) -> int:
+        """
+        Wakes up (WUPA) and selects the tag with a known UID, also if halted, e.g. after inventory().
+        The other tags in the field go back to IDLE.
+        :param uid: complete UID of the tag, 4, 7 or 10 bytes
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        self.reader.restart_crypto()
+        self.__selected = False
+
+        (status, tag_type) = self.reader.request_tag(RC522.ACT_REQ_ALL)
+        if status == self.STATUS_OK:
+            status = self.select_tag(uid)
+
+        return status
+
+    def watch(self, scan_interval: float = DEFAULT_SCAN_INTERVAL,
+              departure_misses: int = PresenceTracker.DEFAULT_DEPARTURE_MISSES) -> Iterator[TagEvent]:
+        """
+        Polls continuously with presence_scan(), yielding the arrival and departure of the tags.
+        The chip stays configured and the RF field stays on between the polls.
+        When an ARRIVED event is yielded the tag is selected: the consumer can authenticate, read and write it
+        before asking for the next event.
+        :param scan_interval: seconds between the start of two polls
+        :param departure_misses: consecutive polls without the tag before its departure
+        :return: iterator of TagEvent
+        """
+        tracker = PresenceTracker(departure_misses)
+        self.reader.restart_crypto()
+        self.last_auth_data = None
+        self.image = None
+        self.__selected = False
+
+        while True:
+            start = time.monotonic()
+
+            (status, uid) = self.presence_scan()
+            yield from tracker.update(uid if status == self.STATUS_OK else None)
+
+            remaining = scan_interval - (time.monotonic() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def select_tag(self, uid_data) -> int:
         """
         Selects a tag.
         Resets the auth if the another UID is already set.
-        :param uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+        :param uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total, as returned by
+                         scan(), or the complete UID (4, 7 or 10 bytes)
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
         """
         if self.debug:
             print(f"[d] RC522Manager.select_tag(uid_data={bytes(uid_data).hex()}) ...")
 
-        uid = uid_data[0:4]
-        if self.uid != uid:
-            self.reset_auth()
+        self.last_auth_data = None  # a new selection starts without Crypto1 session
 
         status = self.reader.select_tag(uid_data)
+        self.__selected = status == self.STATUS_OK
         if status == self.STATUS_OK:
-            self.uid = uid_data[0:4]
+            if self.uid != self.reader.uid:
+                self.reset_auth()
+            self.uid = self.reader.uid
+            if self.image is None or self.image.uid != self.uid:
+                self.image = TagImage(self.uid, self.__get_sectors_number(self.reader.sak), loader=self.__read_block)
             if self.debug:
                 print(f"[d] RC522Manager: Selected UID {bytes(self.uid).hex()}")
 
@@ -96,6 +309,25 @@ class RC522Manager:
             print(f"[d] RC522Manager.set_auth() >>> Set key {bytes(self.key).hex()}, "
                   f"method {'A' if auth_method == self.reader.ACT_AUTH_A else 'B'}")
 
+    def set_key_ring(self, key_ring: KeyRing | None):
+        """
+        Sets the candidate keys of the tags, used by auth() when no key is set with set_auth(): the sectors are
+        authenticated with the first candidate that works, starting from the one that worked last time for the same
+        UID and sector, and the tag is selected again after each failed attempt.
+        :param key_ring: candidate keys, None to disable the discovery
+        """
+        self.__flush_key_hints()
+        self.key_ring = key_ring
+        self.__sector_keys = {}
+        self.last_auth_data = None
+
+    def __flush_key_hints(self):
+        """
+        Saves the key hints learnt on the previous tags, when the field is empty: never during an authentication.
+        """
+        if self.key_ring is not None:
+            self.key_ring.flush()
+
     def reset_auth(self):
         """
         Resets the authentication info.
@@ -103,19 +335,23 @@ class RC522Manager:
         self.auth_method = None
         self.key = None
         self.last_auth_data = None
+        self.__sector_keys = {}
 
         if self.debug:
             print("[d] RC522Manager.reset_auth() >>> Reset auth info")
 
     def is_auth_set(self) -> bool:
         """
-        :return: True if the authentication info are set.
+        :return: True if the authentication info are set, or a key ring is.
         """
-        return (self.uid is not None) and (self.key is not None) and (self.auth_method is not None)
+        return (self.uid is not None) and \
+            (((self.key is not None) and (self.auth_method is not None)) or (self.key_ring is not None))
 
     def auth(self, block_number: int, force: bool = False) -> int:
         """
-        Authenticates a certain block using the saved auth info, only if needed.
+        Authenticates the sector of a certain block using the saved auth info, only if needed.
+        MIFARE Classic authentication covers the whole sector, so blocks of an already authenticated sector
+        (with the same auth info) do not need another auth.
         :param block_number: number of the block (from 0 to SECTORS_NUMBER * 4 - 1)
         :param force: True to force the auth even it is already authenticated
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
@@ -123,23 +359,86 @@ class RC522Manager:
         if self.debug:
             print(f"[d] RC522Manager.auth(block_number={block_number}, force={force}) ...")
 
-        auth_data = (block_number, self.auth_method, self.key, self.uid)
+        if self.key is None and self.key_ring is not None:
+            return self.__auth_key_ring(block_number, force)
+
+        auth_data = (get_sector_number(block_number), self.auth_method, self.key, self.uid)
         status = self.STATUS_OK
 
         if (self.last_auth_data != auth_data) or force:
             if self.debug:
                 print(f"[d] RC522Manager: calling reader.auth() on UID {bytes(self.uid).hex()}")
-            self.last_auth_data = auth_data
             status = self.reader.auth(self.auth_method, block_number, self.key, self.uid)
+            # A failed auth halts the tag and ends the session
+            self.last_auth_data = auth_data if status == self.STATUS_OK else None
         else:
             if self.debug:
                 print("[d] RC522Manager: not calling reader.auth() - already authenticated")
 
         return status
 
-    def read_block(self, block_number: int) -> (int, list[int]):
+    def __auth_key_ring(self, block_number: int, force: bool) -> int:
+        """
+        Authenticates the sector of a block with the candidates of the key ring.
+        A failed authentication drops the tag to IDLE, so it is woken up and selected again before the next
+        candidate (and after the last one, so that the other sectors can still be accessed).
+        :param block_number: number of the block
+        :param force: True to force the auth even it is already authenticated
+        :return status: 0 = OK, 1 = NO_TAG_ERROR (the tag left during the recovery), 2 = ERROR (no candidate works)
+        """
+        sector = get_sector_number(block_number)
+        known = self.__sector_keys.get(sector)
+        if known is not None and not force and self.last_auth_data == (sector, known[0], known[1], self.uid):
+            if self.debug:
+                print("[d] RC522Manager: not calling reader.auth() - already authenticated")
+            return self.STATUS_OK
+
+        candidates = [known] if known is not None else []
+        candidates += [c for c in self.key_ring.candidates_for(self.uid, sector) if c != known]
+
+        for (auth_method, key) in candidates:
+            status = self.reader.auth(auth_method, block_number, key, self.uid)
+            if status == self.STATUS_OK:
+                self.__sector_keys[sector] = (auth_method, key)
+                self.last_auth_data = (sector, auth_method, key, self.uid)
+                self.key_ring.remember(self.uid, sector, auth_method, key)
+                if self.debug:
+                    print(f"[d] RC522Manager: sector {sector} authenticated with key {bytes(key).hex()}, "
+                          f"method {'A' if auth_method == self.reader.ACT_AUTH_A else 'B'}")
+                return status
+
+            self.last_auth_data = None
+            self.__sector_keys.pop(sector, None)
+            # The tag went back to IDLE: wake it up and select it again, keeping the image and the keys found
+            recovered = self.select_uid(self.uid)
+            if recovered != self.STATUS_OK:
+                return recovered
+
+        self.key_ring.forget(self.uid, sector)
+        if self.debug:
+            print(f"[d] RC522Manager: no key of the key ring authenticates sector {sector}")
+        # The tag is still there (it was selected again): a failed auth is seen by the chip as a timeout
+        return self.STATUS_ERR
+
+    @staticmethod
+    def __get_sectors_number(sak: int | None) -> int:
+        """
+        :param sak: SAK of the selected tag
+        :return: number of sectors of the tag: 40 for MIFARE Classic 4K, 5 for Mini, 16 otherwise (1K)
+        """
+        if sak is not None and sak & 0x10:
+            return 40
+        if sak == 0x09:
+            return 5
+        return RC522Manager.DEFAULT_SECTORS_NUMBER
+
+    @list_compat()
+    def read_block(self, block_number: int) -> (int, bytes):
         """
         Reads a specific block.
+        Blocks already read or written during the current selection are served by the tag image, without reading
+        the tag again. A block missing from the image is loaded with the rest of its sector, under the same
+        authentication, so the next reads of the sector cost no SPI traffic.
         Note: Tag and auth must be set, since it does auth.
         :param block_number: number of the block (from 0 to SECTORS_NUMBER * 4 - 1)
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
@@ -148,24 +447,45 @@ class RC522Manager:
         if self.debug:
             print(f"[d] RC522Manager.read_block(block_number={block_number}) ...")
 
-        status = self.STATUS_ERR
-        read_data = []
-
         if not self.is_auth_set():
-            return status, read_data
+            return self.STATUS_ERR, b""
+
+        if self.image is not None and block_number < self.image.blocks_number:
+            if not self.image.has_block(block_number):
+                # A block of the sector may fail (e.g. its access bits): the requested one is read again only if it
+                # was not loaded, and not at all if the tag is gone
+                status = self.image.load_sector(get_sector_number(block_number))
+                if status == self.STATUS_NO_TAG_ERR:
+                    return status, b""
+            (status, block_data) = self.image.read_block(block_number)
+            return status, bytes(block_data) if block_data is not None else b""
+
+        return self.__read_block(block_number)
+
+    def __read_block(self, block_number: int) -> (int, bytes):
+        """
+        Authenticates (if needed) and reads a block from the tag.
+        :param block_number: number of the block
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                read_data: read data
+        """
+        read_data = b""
 
         # Do authentication
         status = self.auth(block_number)
         if status == self.STATUS_OK:
             (status, read_data) = self.reader.read_block(block_number)
-        else:
-            print(f"[e] Error reading {get_block_repr(block_number)}")
+            if status != self.STATUS_OK:
+                self.last_auth_data = None  # the tag drops the session on errors
+        elif self.debug:
+            print(f"[d] RC522Manager.read_block() >>> authentication failed for {get_block_repr(block_number)}")
 
         return status, read_data
 
-    def write_block(self, block_number: int, new_bytes: list[int]) -> int:
+    def write_block(self, block_number: int, new_bytes) -> int:
         """
         Writes bytes to a specific block, keeping the old ones if None is passed.
+        The block is read before writing only if some bytes are kept, i.e. not all 16 bytes are given.
         Note: Tag and auth must be set, since it does auth.
 
         Example:
@@ -173,7 +493,7 @@ class RC522Manager:
             will write the second and the fourth byte of the second block, leaving the other 14 bytes unaltered.
 
         :param block_number: number of the block (from 0 to SECTORS_NUMBER * 4 - 1)
-        :param new_bytes: list of bytes to be written
+        :param new_bytes: bytes to be written, a list if some of them are None
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
         """
         if self.debug:
@@ -182,25 +502,109 @@ class RC522Manager:
         if not self.is_auth_set():
             return self.STATUS_ERR
 
+        (status, block_data) = self.__write_block(block_number, new_bytes)
+        return status
+
+    def write_blocks(self, blocks: dict[int, bytes | list[int | None]],
+                     image: bytearray | list[list[int]] | None = None) -> int:
+        """
+        Writes several blocks, keeping the old bytes where None is passed (as write_block()).
+        Blocks are written in ascending order, so each sector is authenticated once.
+        Note: Tag and auth must be set, since it does auth.
+
+        Example:
+            (status, image) = dump()
+            write_blocks({4: new_data_4, 5: new_data_5, 8: [None, 0x1a]}, image=image)
+            will write only the blocks whose content differs from the image, without reading them first.
+
+        :param blocks: dict {block_number: new_bytes}
+        :param image: known content of the tag, as returned by dump(): a flat bytearray (or, with list_compat, a list of
+                      blocks indexed by block number). Blocks equal to the image are not written, None placeholders
+                      are filled from the image instead of reading the tag. The image is updated with the written
+                      blocks.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR, of the first failed block (the next ones are not written)
+        """
+        if self.debug:
+            print(f"[d] RC522Manager.write_blocks(blocks={sorted(blocks)}) ...")
+
+        if not self.is_auth_set():
+            return self.STATUS_ERR
+
+        # A flat image holds 16 bytes per block, a list image a list of 16 bytes per block
+        flat = isinstance(image, (bytes, bytearray, memoryview))
+        status = self.STATUS_OK
+        for block_number in sorted(blocks):
+            old_data = None
+            if flat and (block_number + 1) * 16 <= len(image):
+                old_data = image[block_number * 16:(block_number + 1) * 16]
+            elif image is not None and not flat and block_number < len(image) and len(image[block_number]) == 16:
+                old_data = bytes(image[block_number])
+            elif image is None and self.image is not None:
+                old_data = self.image.get_block(block_number)
+
+            (status, block_data) = self.__write_block(block_number, blocks[block_number], old_data)
+            if status != self.STATUS_OK:
+                break
+            if flat and old_data is not None:
+                image[block_number * 16:(block_number + 1) * 16] = block_data
+            elif image is not None and old_data is not None:
+                image[block_number] = list(block_data)
+
+        return status
+
+    def __write_block(self, block_number: int, new_bytes, old_data=None) -> (int, bytes):
+        """
+        Authenticates (if needed) and writes a block, merging the new bytes with the old ones.
+        :param block_number: number of the block
+        :param new_bytes: bytes to be written, None to keep the old byte
+        :param old_data: known content of the block, None if unknown. If given, the block is not read before writing
+                         and it is not written at all if the content does not change.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                block_data: the 16 bytes of the block after the write
+        """
+        complete = len(new_bytes) >= 16 and (isinstance(new_bytes, (bytes, bytearray, memoryview)) or
+                                             all(byte is not None for byte in new_bytes[:16]))
+
+        if complete:
+            block_data = bytes(new_bytes[:16])
+            if old_data is not None and bytes(old_data) == block_data:
+                if self.debug:
+                    print(f"[d] {get_block_repr(block_number)} unchanged, not written")
+                return self.STATUS_OK, block_data
+
         # Do authentication
         status = self.auth(block_number)
-        if status == self.STATUS_OK:
-            # Read previous block
-            (status, block_data) = self.reader.read_block(block_number)
-            if status == self.STATUS_OK:
-                for i in range(len(new_bytes)):
-                    # Overwrite block_data if the new_byte is not None
-                    if new_bytes[i] is not None:
-                        if self.debug:
-                            print(f"[d] Changing byte {i} - from {block_data[i]} to {new_bytes[i]}")
-                        block_data[i] = new_bytes[i]
-
-                # Write the new block with changed bytes (block_data)
-                status = self.reader.write_block(block_number, block_data)
-                if self.debug:
-                    print(f"[d] Writing {bytes(block_data).hex()} to {get_block_repr(block_number)}")
+        if status != self.STATUS_OK:
+            return status, b""
+
+        if not complete:
+            if old_data is None:
+                # Read previous block
+                (status, old_data) = self.reader.read_block(block_number)
+                if status != self.STATUS_OK:
+                    self.last_auth_data = None  # the tag drops the session on errors
+                    return status, b""
+            changed = bytearray(old_data)
+            for i in range(len(new_bytes)):
+                # Overwrite block_data if the new_byte is not None
+                if new_bytes[i] is not None:
+                    if self.debug:
+                        print(f"[d] Changing byte {i} - from {changed[i]} to {new_bytes[i]}")
+                    changed[i] = new_bytes[i]
+            block_data = bytes(changed)
+
+        # Write the new block with changed bytes (block_data)
+        if self.debug:
+            print(f"[d] Writing {bytes(block_data).hex()} to {get_block_repr(block_number)}")
+        status = self.reader.write_block(block_number, block_data)
+        if status != self.STATUS_OK:
+            self.last_auth_data = None  # the tag drops the session on errors
+            if self.image is not None:
+                self.image.invalidate(block_number)  # the write may have been partial
+        elif self.image is not None:
+            self.image.set_block(block_number, block_data)
 
-        return status
+        return status, block_data
 
     def write_trailer(self, sector_number: int,
                       key_a: list[int] = DEFAULT_KEY,
@@ -217,24 +621,146 @@ class RC522Manager:
         :param user_data: eventual user data to append after the access bits
         :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
         """
-        block_number = get_block_number(sector_number, relative_block_num=3)
-        trailer = key_a[:6] + access_bits[:3] + [user_data] + key_b[:6]
+        block_number = get_trailer_block_number(sector_number)
+        trailer = list(key_a[:6]) + list(access_bits[:3]) + [user_data] + list(key_b[:6])
         return self.write_block(block_number, trailer)
 
-    def dump(self, sectors_number: int = DEFAULT_SECTORS_NUMBER) -> (int, list[list[int]]):
+    def read_value(self, block_number: int) -> (int, int | None):
+        """
+        Reads a value block, served by the tag image if already loaded.
+        Note: Tag and auth must be set, since it does auth.
+        :param block_number: number of the value block
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR, also if the block is not in the value block format
+                value: the value, None on errors
+        """
+        value = None
+        (status, block_data) = self.read_block(block_number)
+        if status == self.STATUS_OK:
+            value_block = parse_value_block(block_data)
+            if value_block is None:
+                status = self.STATUS_ERR
+            else:
+                (value, address) = value_block
+
+        if self.debug:
+            print(f"[d] RC522Manager.read_value(block_number={block_number}) >>> status={status}, value={value}")
+
+        return status, value
+
+    def write_value(self, block_number: int, value: int, address: int | None = None) -> int:
+        """
+        Formats a value block with an initial value.
+        The access bits of the sector must allow the value operations on the block, as the default ones do.
+        Note: Tag and auth must be set, since it does auth.
+        :param block_number: number of the block
+        :param value: initial value, from -2^31 to 2^31 - 1
+        :param address: address byte stored with the value, the block number if None
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        if address is None:
+            address = block_number
+        return self.write_block(block_number, get_value_block(value, address))
+
+    def increment(self, block_number: int, delta: int, transfer_block: int | None = None) -> int:
+        """
+        Adds delta to a value block on the tag (INCREMENT and TRANSFER), without reading and writing the block:
+        the result is written in a single, tear-proof operation.
+        Note: Tag and auth must be set, since it does auth.
+        :param block_number: number of the value block
+        :param delta: amount to add, from 0 to 2^31 - 1
+        :param transfer_block: block of the same sector receiving the result, the value block itself if None
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        return self.__value_operation(RC522.ACT_INCREMENT, block_number, delta, transfer_block)
+
+    def decrement(self, block_number: int, delta: int, transfer_block: int | None = None) -> int:
+        """
+        Subtracts delta from a value block on the tag (DECREMENT and TRANSFER), as increment().
+        Note: Tag and auth must be set, since it does auth.
+        :param block_number: number of the value block
+        :param delta: amount to subtract, from 0 to 2^31 - 1
+        :param transfer_block: block of the same sector receiving the result, the value block itself if None
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        return self.__value_operation(RC522.ACT_DECREMENT, block_number, -delta, transfer_block)
+
+    def restore(self, block_number: int, transfer_block: int) -> int:
+        """
+        Copies a value block to another block of the same sector (RESTORE and TRANSFER), e.g. to back it up or to
+        roll back to the backup.
+        Note: Tag and auth must be set, since it does auth.
+        :param block_number: number of the value block
+        :param transfer_block: block of the same sector receiving the value
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        return self.__value_operation(RC522.ACT_RESTORE, block_number, 0, transfer_block)
+
+    def __value_operation(self, action: int, block_number: int, delta: int, transfer_block: int | None) -> int:
+        """
+        Authenticates (if needed) and runs a value operation followed by the TRANSFER of its result, keeping the
+        tag image consistent.
+        :param action: RC522.ACT_INCREMENT, RC522.ACT_DECREMENT or RC522.ACT_RESTORE
+        :param block_number: number of the value block
+        :param delta: change of the value, negative for a decrement, 0 for a restore
+        :param transfer_block: block receiving the result, the value block itself if None
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        if transfer_block is None:
+            transfer_block = block_number
+
+        if self.debug:
+            print(f"[d] RC522Manager: value operation 0x{action:02X} on {get_block_repr(block_number)}, "
+                  f"delta={delta}, transfer to {get_block_repr(transfer_block)} ...")
+
+        if get_sector_number(transfer_block) != get_sector_number(block_number):
+            raise ValueError("the transfer block must be in the sector of the value block")
+        if not self.is_auth_set():
+            return self.STATUS_ERR
+
+        # Do authentication
+        status = self.auth(block_number)
+        if status == self.STATUS_OK:
+            if action == RC522.ACT_INCREMENT:
+                status = self.reader.increment(block_number, delta)
+            elif action == RC522.ACT_DECREMENT:
+                status = self.reader.decrement(block_number, -delta)
+            else:
+                status = self.reader.restore(block_number)
+            if status == self.STATUS_OK:
+                status = self.reader.transfer(transfer_block)
+            if status != self.STATUS_OK:
+                self.last_auth_data = None  # the tag drops the session on errors
+
+        if self.image is not None:
+            # The result is known if the value block is in the image, otherwise it is read again on the next access
+            source = self.image.get_block(block_number)
+            value_block = parse_value_block(source) if source is not None else None
+            if status == self.STATUS_OK and value_block is not None:
+                (value, address) = value_block
+                self.image.set_block(transfer_block, get_value_block(value + delta, address))
+            else:
+                self.image.invalidate(transfer_block)
+
+        return status
+
+    @list_compat(block_size=16)
+    def dump(self, sectors_number: int = DEFAULT_SECTORS_NUMBER) -> (int, bytearray):
         """
         Dumps the entire tag.
-        :param sectors_number: number of sectors
+        Blocks already in the tag image are not read again.
+        :param sectors_number: number of sectors (16 for MIFARE Classic 1K, 40 for 4K)
         :return: status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
-                 dump_data: dump data
+                 dump_data: 16 bytes per block in a single buffer (1 KiB for MIFARE Classic 1K, 4 KiB for 4K), the
+                            blocks that could not be read are left to 0
         """
         status = self.STATUS_ERR
-        dump_data = []
-        for i in range(sectors_number * 4):
+        dump_data = bytearray(get_blocks_number(sectors_number) * 16)
+        for i in range(get_blocks_number(sectors_number)):
             (status, block_data) = self.read_block(i)
-            dump_data.append(block_data)
+            if len(block_data) == 16:
+                dump_data[i * 16:(i + 1) * 16] = block_data
 
         if self.debug:
-            print(f"[d] RC522Manager.dump() >>> status={status}, dump_data={dump_data}")
+            print(f"[d] RC522Manager.dump() >>> status={status}, dump_data={dump_data.hex()}")
 
         return status, dump_data
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import time
+from typing import Iterator
+
+from .events import PresenceTracker, TagEvent
+from .rc522 import RC522
+from .rc522manager import RC522Manager
+
+
+class PollScheduler:
+    """
+    Polls several readers, each one with its own SPI device and reset pin, in an interleaved and fair way.
+
+    Every round starts a tag request on all the readers, then checks them in turn until each one has answered or
+    has used its scan budget. The chip timers run in parallel: while a reader waits for a tag, the bus serves the
+    others, so a round lasts about as long as the slowest reader instead of the sum of all of them.
+    The reader served first rotates at every round.
+
+    Example:
+        readers = {"door": RC522Manager(device="/dev/spidev0.0", pin_rst=25),
+                   "desk": RC522Manager(device="/dev/spidev0.1", pin_rst=23)}
+        for event in PollScheduler(readers).events():
+            if event.kind == TagEvent.ARRIVED:
+                manager = readers[event.reader]
+                ...
+    """
+
+    DEFAULT_SCAN_INTERVAL = RC522Manager.DEFAULT_SCAN_INTERVAL
+    DEFAULT_SCAN_BUDGET_MS = RC522.CMD_TIMEOUT_MS
+    POLL_INTERVAL_S = RC522.POLL_INTERVAL_S
+
+    STATUS_OK = RC522Manager.STATUS_OK
+    STATUS_NO_TAG_ERR = RC522Manager.STATUS_NO_TAG_ERR
+    STATUS_ERR = RC522Manager.STATUS_ERR
+
+    def __init__(self, readers: dict[str, RC522Manager] | list[RC522Manager],
+                 scan_interval: float = DEFAULT_SCAN_INTERVAL, scan_budget_ms: int = DEFAULT_SCAN_BUDGET_MS,
+                 debug: bool = False):
+        """
+        :param readers: managers to poll, by name (a list is named by index: "0", "1", ...)
+        :param scan_interval: seconds between the start of two rounds
+        :param scan_budget_ms: time given to the tags of each reader to answer, in a round. A tag answers a request
+                               within 1 ms, the rest is the wait for the timeout of an empty field
+        :param debug: True to print debug messages
+        """
+        if not isinstance(readers, dict):
+            readers = {str(i): reader for (i, reader) in enumerate(readers)}
+        if not readers:
+            raise ValueError("PollScheduler needs at least one reader")
+
+        self.readers: dict[str, RC522Manager] = readers
+        self.scan_interval = scan_interval
+        self.scan_budget_ms = scan_budget_ms
+        self.debug = debug
+        self.rounds = 0
+        self.__names = list(readers)
+        self.__first = 0
+
+    def poll(self) -> dict[str, tuple[int, bytes]]:
+        """
+        Performs a round, scanning every reader once.
+        The anti-collision of a reader that found a tag runs as soon as its request is answered.
+        :return: (status, uid_data) of each reader, by name in the order they were served
+                 status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                 uid_data: UID of the tag (4 bytes) concatenated with checksum (1 byte), 5 bytes total
+        """
+        names = self.__names[self.__first:] + self.__names[:self.__first]
+        self.__first = (self.__first + 1) % len(self.__names)
+        self.rounds += 1
+
+        for name in names:
+            self.readers[name].start_scan(timeout_ms=self.scan_budget_ms)
+
+        results = {}
+        pending = names
+        while pending:
+            still_pending = []
+            for name in pending:
+                (status, uid_data) = self.readers[name].poll_scan()
+                if status is None:
+                    still_pending.append(name)
+                else:
+                    results[name] = (status, uid_data)
+            pending = still_pending
+            if pending:
+                time.sleep(self.POLL_INTERVAL_S)
+
+        if self.debug:
+            print(f"[d] PollScheduler.poll() >>> round {self.rounds}: " +
+                  ", ".join(f"{name}={results[name][0]}" for name in names))
+
+        return {name: results[name] for name in names}
+
+    def events(self, departure_misses: int = PresenceTracker.DEFAULT_DEPARTURE_MISSES) -> Iterator[TagEvent]:
+        """
+        Polls continuously, yielding the arrival and departure of the tags on every reader (TagEvent.reader).
+        The readers are not polled while the consumer handles an event, so it can select, read and write the
+        arrived tag before asking for the next event.
+        :param departure_misses: consecutive rounds without the tag before its departure
+        :return: iterator of TagEvent
+        """
+        trackers = {name: PresenceTracker(departure_misses, reader=name) for name in self.__names}
+
+        while True:
+            start = time.monotonic()
+
+            for (name, (status, uid_data)) in self.poll().items():
+                uid = None
+                if status == self.STATUS_OK:
+                    uid = uid_data[0:4]
+                    if uid_data[0] == RC522.CASCADE_TAG and self.readers[name].select_tag(uid_data) == self.STATUS_OK:
+                        uid = self.readers[name].uid  # 7 or 10 bytes UID, resolved by the selection
+                yield from trackers[name].update(uid)
+
+            remaining = self.scan_interval - (time.monotonic() - start)
+            if remaining > 0:
+                time.sleep(remaining)
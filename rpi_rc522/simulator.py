@@ -0,0 +1,1030 @@
+#!/usr/bin/env python
+import hashlib
+import random
+import threading
+import time
+from typing import Callable, NamedTuple
+
+from .transport import Transport
+from .utils import CRC_A_TABLE, calculate_crc_a, get_sector_number, get_trailer_block_number, get_value_block, \
+    parse_value_block
+
+
+def _crc(data, preset: int) -> int:
+    """
+    CRC of the MFRC522 coprocessor (reflected CCITT polynomial), with a given preset.
+    """
+    crc = preset
+    for byte in data:
+        crc = (crc >> 8) ^ CRC_A_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _check_crc(frame: bytes) -> bool:
+    """
+    :return: True if the last two bytes of the frame are its CRC_A.
+    """
+    return len(frame) >= 3 and list(frame[-2:]) == calculate_crc_a(frame[:-2])
+
+
+def _with_crc(data) -> bytes:
+    """
+    :return: data followed by its CRC_A.
+    """
+    return bytes(data) + bytes(calculate_crc_a(data))
+
+
+def _merge_responses(responses: list["TagResponse"]) -> tuple["TagResponse", int | None]:
+    """
+    Combines the answers of several tags to the same frame, as received by the chip.
+    The tags answer at the same time with Manchester coding, so the bits are received correctly up to the first one
+    that differs: that is a collision, received as 1, and the bits after it are undefined (here, the OR of the
+    answers).
+    :param responses: answers of the tags, at least one
+    :return response: the received frame
+            coll_pos: 1-based position of the first collided bit from the start of the received data (first bit of
+                      the first byte, regardless of RxAlign), None if there is no collision
+    """
+    first = responses[0]
+    if len(responses) == 1:
+        return first, None
+
+    def bits_number(response):
+        return len(response.data) * 8 - ((8 - response.last_bits) if response.last_bits else 0)
+
+    data = bytearray(max(len(response.data) for response in responses))
+    for response in responses:
+        for (i, value) in enumerate(response.data):
+            data[i] |= value
+    longest = max(responses, key=bits_number)
+
+    coll_pos = None
+    for bit in range(bits_number(longest)):
+        values = {(response.data[bit // 8] >> (bit % 8)) & 1 if bit < bits_number(response) else None
+                  for response in responses}
+        if len(values) > 1:
+            coll_pos = bit + 1
+            break
+
+    return TagResponse(bytes(data), longest.last_bits, any(response.write for response in responses)), coll_pos
+
+
+class TimingModel:
+    """
+    Timing of a simulated reader, used by MFRC522Simulator.
+
+    SPI transactions stall the caller for transfer_overhead_s plus the time to clock the bytes at spi_speed,
+    RF frames take the ISO 14443A air time at rf_bit_rate (a parity bit per byte, plus start and end of frame),
+    and the tag answers after frame_delay_s (plus eeprom_write_s for a write).
+    When the field turns on, the tags answer only after power_up_s.
+    With realtime=False every operation completes instantly, for fast functional tests.
+    """
+
+    CHIP_CLOCK = 13560000   # 13.56 MHz, clock of the MFRC522 timer
+
+    def __init__(self, spi_speed: int = 1000000, transfer_overhead_s: float = 15e-6, rf_bit_rate: int = 106000,
+                 frame_delay_s: float = 86e-6, auth_s: float = 0.0015, eeprom_write_s: float = 0.004,
+                 power_up_s: float = 0.002, realtime: bool = True):
+        self.spi_speed = spi_speed
+        self.transfer_overhead_s = transfer_overhead_s
+        self.rf_bit_rate = rf_bit_rate
+        self.frame_delay_s = frame_delay_s
+        self.auth_s = auth_s
+        self.eeprom_write_s = eeprom_write_s
+        self.power_up_s = power_up_s
+        self.realtime = realtime
+
+    @classmethod
+    def instant(cls) -> "TimingModel":
+        """
+        :return: a timing model where every operation completes instantly.
+        """
+        return cls(realtime=False)
+
+    def spi_time(self, n_bytes: int) -> float:
+        """
+        :return: duration of an SPI transaction of n_bytes bytes
+        """
+        if not self.realtime:
+            return 0.0
+        return self.transfer_overhead_s + n_bytes * 8 / self.spi_speed
+
+    def rf_time(self, n_bits: int) -> float:
+        """
+        :return: air time of a frame of n_bits bits
+        """
+        if not self.realtime:
+            return 0.0
+        return (n_bits + n_bits // 8 + 2) / self.rf_bit_rate
+
+    def delay(self, seconds: float) -> float:
+        """
+        :return: seconds, or 0 if not realtime
+        """
+        return seconds if self.realtime else 0.0
+
+    def timer_period(self, prescaler: int, reload: int) -> float:
+        """
+        :return: time for the MFRC522 timer to expire, TPrescaler and TReloadVal given
+        """
+        return self.delay((2 * prescaler + 1) * (reload + 1) / self.CHIP_CLOCK)
+
+
+class TagResponse(NamedTuple):
+    """
+    Answer of a simulated tag to a frame.
+    """
+    data: bytes
+    last_bits: int = 0      # valid bits of the last byte, 0 = all 8
+    write: bool = False     # True if the tag had to write its EEPROM before answering
+
+
+class SimulatedTag:
+    """
+    ISO 14443-3 type A tag, with its IDLE/READY/ACTIVE/HALT state machine, cascaded anti-collision and selection.
+    Subclasses implement the commands accepted in the ACTIVE state.
+    """
+
+    STATE_IDLE = 0
+    STATE_READY = 1
+    STATE_ACTIVE = 2
+    STATE_HALT = 3
+
+    ATQA = b"\x04\x00"
+    SAK = 0x08
+
+    REQA = 0x26
+    WUPA = 0x52
+    SEL_CL = (0x93, 0x95, 0x97)
+    CASCADE_TAG = 0x88
+    ACK = TagResponse(b"\x0A", 4)
+    NAK = TagResponse(b"\x04", 4)
+    SILENT = TagResponse(b"")  # the command succeeded, but the tag does not answer
+
+    def __init__(self, uid):
+        if len(uid) not in (4, 7, 10):
+            raise ValueError("UID must be 4, 7 or 10 bytes long")
+        self.uid = bytes(uid)
+        self.state = self.STATE_IDLE
+        self.cascade_level = 0
+        self.powered = False
+        self.crypto = False
+
+    @property
+    def cascade_levels(self) -> int:
+        """
+        :return: number of cascade levels needed to select the tag (1, 2 or 3)
+        """
+        return {4: 1, 7: 2, 10: 3}[len(self.uid)]
+
+    def uid_cl(self, level: int) -> bytes:
+        """
+        :param level: cascade level, from 0
+        :return: UID part of a cascade level (with the cascade tag if incomplete), followed by the BCC
+        """
+        if level < self.cascade_levels - 1:
+            part = bytes([self.CASCADE_TAG]) + self.uid[level * 3:level * 3 + 3]
+        else:
+            part = self.uid[level * 3:level * 3 + 4]
+        bcc = 0
+        for byte in part:
+            bcc ^= byte
+        return part + bytes([bcc])
+
+    def power_on(self):
+        """
+        The tag enters the RF field (or the field is turned on).
+        """
+        self.powered = True
+        self.reset()
+
+    def power_off(self):
+        """
+        The tag leaves the RF field (or the field is turned off).
+        """
+        self.powered = False
+        self.reset()
+
+    def reset(self):
+        """
+        Goes back to the IDLE state, dropping the session.
+        """
+        self.state = self.STATE_IDLE
+        self.cascade_level = 0
+        self.crypto = False
+
+    def authenticate(self, key_type: int, block_number: int, key: bytes, uid: bytes) -> bool:
+        """
+        Three pass authentication, run by the MFAuthent command of the chip.
+        The base tag does not support it, so it drops the session.
+        :return: True if authenticated
+        """
+        self.reset()
+        return False
+
+    def receive(self, frame: bytes, last_bits: int) -> TagResponse | None:
+        """
+        Processes a frame sent by the reader.
+        :param frame: data of the frame
+        :param last_bits: valid bits of the last byte, 0 = all 8
+        :return: the answer of the tag, None if it does not answer
+        """
+        if not self.powered or not frame:
+            return None
+
+        if last_bits == 7 and len(frame) == 1:  # short frame
+            command = frame[0] & 0x7F
+            if (command == self.REQA and self.state == self.STATE_IDLE) or \
+                    (command == self.WUPA and self.state in (self.STATE_IDLE, self.STATE_HALT)):
+                self.state = self.STATE_READY
+                self.cascade_level = 0
+                return TagResponse(self.ATQA)
+            if self.state != self.STATE_HALT:
+                self.reset()
+            return None
+
+        if self.state == self.STATE_READY:
+            return self._anti_collision(frame, last_bits)
+
+        if self.state == self.STATE_ACTIVE:
+            if len(frame) == 4 and frame[0] == 0x50 and frame[1] == 0x00 and _check_crc(frame):  # HLTA
+                self.reset()
+                self.state = self.STATE_HALT
+                return None
+            response = self._command(frame)
+            if response is None or response == self.NAK:
+                self.reset()
+            return response if response is not self.SILENT else None
+
+        return None
+
+    def _anti_collision(self, frame: bytes, last_bits: int) -> TagResponse | None:
+        """
+        Anti-collision and selection of the current cascade level.
+        """
+        if frame[0] != self.SEL_CL[self.cascade_level] or len(frame) < 2:
+            self.reset()
+            return None
+
+        uid_cl = self.uid_cl(self.cascade_level)
+        nvb = frame[1]
+
+        if nvb == 0x70:  # SELECT
+            if len(frame) != 9 or not _check_crc(frame) or frame[2:7] != uid_cl:
+                self.reset()
+                return None
+            if self.cascade_level < self.cascade_levels - 1:
+                self.cascade_level += 1
+                return TagResponse(_with_crc([0x04]))
+            self.state = self.STATE_ACTIVE
+            return TagResponse(_with_crc([self.SAK]))
+
+        # ANTICOLLISION: answer with the UID bits after the known ones, aligned as in the sent frame
+        known_bits = ((nvb >> 4) - 2) * 8 + (nvb & 0x0F)
+        if known_bits < 0 or known_bits >= 40 or len(frame) < 2 + (known_bits + 7) // 8:
+            return None
+        for i in range(known_bits):
+            if ((frame[2 + i // 8] >> (i % 8)) & 1) != ((uid_cl[i // 8] >> (i % 8)) & 1):
+                return None  # the known bits do not belong to this tag
+        answer = bytearray(uid_cl[known_bits // 8:])
+        answer[0] &= (0xFF << (known_bits % 8)) & 0xFF
+        return TagResponse(bytes(answer))
+
+    def _command(self, frame: bytes) -> TagResponse | None:
+        """
+        Processes a command in the ACTIVE state.
+        :return: the answer of the tag, None if it does not answer
+        """
+        return self.NAK
+
+
+class MifareClassicTag(SimulatedTag):
+    """
+    Simulated MIFARE Classic 1K or 4K tag.
+    Keys are checked by the three pass authentication (Crypto1 session bound to the authenticated sector),
+    access conditions in the trailer are not enforced. Key A reads as zeros from the trailer.
+    The value operations (INCREMENT, DECREMENT, RESTORE) work on value blocks through the transfer buffer, written
+    to a block of the authenticated sector by TRANSFER; an overflow of the value is answered with a NAK.
+    """
+
+    DEFAULT_KEY = b"\xFF\xFF\xFF\xFF\xFF\xFF"
+    DEFAULT_ACCESS_BITS = b"\xFF\x07\x80\x69"
+
+    def __init__(self, uid=b"\x12\x34\x56\x78", size: int = 1024, data=None):
+        super().__init__(uid)
+        if size not in (1024, 4096):
+            raise ValueError("size must be 1024 (1K) or 4096 (4K)")
+        self.ATQA = b"\x04\x00" if size == 1024 else b"\x02\x00"
+        self.SAK = 0x08 if size == 1024 else 0x18
+        self.memory = bytearray(size)
+        self.auth_sector: int | None = None
+        self.__pending_write: int | None = None
+        self.__pending_value: tuple[int, int] | None = None  # (command, block number) waiting for the operand
+        self.__transfer_buffer: bytes | None = None
+
+        if data is not None:
+            self.memory[:] = bytes(data)
+        else:
+            uid_cl = self.uid_cl(0) if len(self.uid) == 4 else self.uid
+            self.memory[0:len(uid_cl)] = uid_cl
+            self.memory[len(uid_cl)] = self.SAK
+            self.memory[len(uid_cl) + 1:len(uid_cl) + 3] = self.ATQA
+            for sector in range(self.sectors_number):
+                trailer = get_trailer_block_number(sector) * 16
+                self.memory[trailer:trailer + 16] = self.DEFAULT_KEY + self.DEFAULT_ACCESS_BITS + self.DEFAULT_KEY
+
+    @property
+    def blocks_number(self) -> int:
+        return len(self.memory) // 16
+
+    @property
+    def sectors_number(self) -> int:
+        return 16 if len(self.memory) == 1024 else 40
+
+    def reset(self):
+        super().reset()
+        self.auth_sector = None
+        self.__pending_write = None
+        self.__pending_value = None
+        self.__transfer_buffer = None
+
+    def authenticate(self, key_type: int, block_number: int, key: bytes, uid: bytes) -> bool:
+        if self.state != self.STATE_ACTIVE or block_number >= self.blocks_number or bytes(uid) != self.uid[-4:]:
+            self.reset()
+            return False
+        sector = get_sector_number(block_number)
+        trailer = get_trailer_block_number(sector) * 16
+        expected = self.memory[trailer:trailer + 6] if key_type == 0x60 else self.memory[trailer + 10:trailer + 16]
+        if bytes(key) != bytes(expected):
+            self.reset()
+            return False
+        self.auth_sector = sector
+        self.crypto = True
+        return True
+
+    def _can_access(self, block_number: int) -> bool:
+        return block_number < self.blocks_number and self.auth_sector == get_sector_number(block_number)
+
+    def _command(self, frame: bytes) -> TagResponse | None:
+        if not _check_crc(frame):
+            return None
+
+        if self.__pending_write is not None:  # second part of a WRITE
+            block_number = self.__pending_write
+            self.__pending_write = None
+            if len(frame) != 18:
+                return self.NAK
+            self.memory[block_number * 16:block_number * 16 + 16] = frame[:16]
+            return TagResponse(self.ACK.data, self.ACK.last_bits, write=True)
+
+        if self.__pending_value is not None:  # operand of a value operation, not acknowledged
+            (command, block_number) = self.__pending_value
+            self.__pending_value = None
+            if len(frame) != 6:
+                return self.NAK
+            block = self.memory[block_number * 16:block_number * 16 + 16]
+            value = parse_value_block(block)[0]
+            operand = int.from_bytes(frame[:4], "little", signed=True)
+            value += {0xC1: operand, 0xC0: -operand, 0xC2: 0}[command]
+            if not -0x80000000 <= value <= 0x7FFFFFFF:
+                return self.NAK
+            self.__transfer_buffer = bytes(get_value_block(value, block[12]))
+            return self.SILENT
+
+        command = frame[0]
+        if command == 0x30 and len(frame) == 4:  # READ
+            block_number = frame[1]
+            if not self._can_access(block_number):
+                return self.NAK
+            data = bytearray(self.memory[block_number * 16:block_number * 16 + 16])
+            if block_number == get_trailer_block_number(get_sector_number(block_number)):
+                data[0:6] = bytes(6)  # key A is never readable
+            return TagResponse(_with_crc(data))
+
+        if command == 0xA0 and len(frame) == 4:  # WRITE
+            block_number = frame[1]
+            if block_number == 0 or not self._can_access(block_number):
+                return self.NAK
+            self.__pending_write = block_number
+            return self.ACK
+
+        if command in (0xC0, 0xC1, 0xC2) and len(frame) == 4:  # DECREMENT, INCREMENT, RESTORE
+            block_number = frame[1]
+            if not self._can_access(block_number) or \
+                    parse_value_block(self.memory[block_number * 16:block_number * 16 + 16]) is None:
+                return self.NAK
+            self.__pending_value = (command, block_number)
+            return self.ACK
+
+        if command == 0xB0 and len(frame) == 4:  # TRANSFER
+            block_number = frame[1]
+            if block_number == 0 or not self._can_access(block_number) or self.__transfer_buffer is None:
+                return self.NAK
+            self.memory[block_number * 16:block_number * 16 + 16] = self.__transfer_buffer
+            return TagResponse(self.ACK.data, self.ACK.last_bits, write=True)
+
+        return self.NAK
+
+
+class MifareUltralightTag(SimulatedTag):
+    """
+    Simulated MIFARE Ultralight tag (7 bytes UID, 4 bytes pages, no authentication).
+    Pages 0 and 1 hold the UID and are read-only, page 3 is OTP (bits can only be set).
+    """
+
+    ATQA = b"\x44\x00"
+    SAK = 0x00
+
+    def __init__(self, uid=b"\x04\x11\x22\x33\x44\x55\x66", pages: int = 16, data=None):
+        if len(uid) != 7:
+            raise ValueError("Ultralight UID must be 7 bytes long")
+        super().__init__(uid)
+        self.memory = bytearray(pages * 4)
+        self._pending_write: int | None = None
+
+        if data is not None:
+            self.memory[:] = bytes(data)
+        else:
+            bcc0 = self.CASCADE_TAG ^ self.uid[0] ^ self.uid[1] ^ self.uid[2]
+            bcc1 = self.uid[3] ^ self.uid[4] ^ self.uid[5] ^ self.uid[6]
+            self.memory[0:9] = self.uid[0:3] + bytes([bcc0]) + self.uid[3:7] + bytes([bcc1])
+
+    @property
+    def pages_number(self) -> int:
+        return len(self.memory) // 4
+
+    def reset(self):
+        super().reset()
+        self._pending_write = None
+
+    def _write_page(self, page: int, data: bytes) -> bool:
+        if page < 2 or page >= self.pages_number:
+            return False
+        if page == 3:  # OTP
+            data = bytes(old | new for old, new in zip(self.memory[12:16], data))
+        self.memory[page * 4:page * 4 + 4] = data[:4]
+        return True
+
+    def _command(self, frame: bytes) -> TagResponse | None:
+        if not _check_crc(frame):
+            return None
+
+        if self._pending_write is not None:  # second part of a COMPATIBILITY_WRITE
+            page = self._pending_write
+            self._pending_write = None
+            if len(frame) != 18 or not self._write_page(page, frame[:4]):
+                return self.NAK
+            return TagResponse(self.ACK.data, self.ACK.last_bits, write=True)
+
+        command = frame[0]
+        if command == 0x30 and len(frame) == 4:  # READ, 4 pages rolling over to page 0
+            page = frame[1]
+            if page >= self.pages_number:
+                return self.NAK
+            data = bytes(self.memory[((page + i) % self.pages_number) * 4 + j] for i in range(4) for j in range(4))
+            return TagResponse(_with_crc(data))
+
+        if command == 0xA2 and len(frame) == 8:  # WRITE
+            if not self._write_page(frame[1], frame[2:6]):
+                return self.NAK
+            return TagResponse(self.ACK.data, self.ACK.last_bits, write=True)
+
+        if command == 0xA0 and len(frame) == 4:  # COMPATIBILITY_WRITE
+            if frame[1] < 2 or frame[1] >= self.pages_number:
+                return self.NAK
+            self._pending_write = frame[1]
+            return self.ACK
+
+        return self.NAK
+
+
+class NTAGTag(MifareUltralightTag):
+    """
+    Simulated NTAG213, NTAG215 or NTAG216 tag: a MIFARE Ultralight with GET_VERSION, FAST_READ and READ_CNT.
+    The NFC counter counts the first READ or FAST_READ after each power up, if enabled (NFC_CNT_EN) in the ACCESS
+    byte of the second configuration page. Password protection is not modeled, PWD and PACK read as zeros.
+    """
+
+    # model -> (pages, storage size of GET_VERSION, data area size of the capability container)
+    MODELS = {"NTAG213": (45, 0x0F, 0x12), "NTAG215": (135, 0x11, 0x3E), "NTAG216": (231, 0x13, 0x6D)}
+    NFC_COUNTER = 0x02
+
+    def __init__(self, uid=b"\x04\x11\x22\x33\x44\x55\x66", model: str = "NTAG215", data=None,
+                 counter_enabled: bool = False):
+        if model not in self.MODELS:
+            raise ValueError(f"model must be one of {', '.join(self.MODELS)}")
+        (pages, self.storage_size, cc_size) = self.MODELS[model]
+        super().__init__(uid, pages, data)
+        self.counter = 0
+        self.__counted = False
+
+        if data is None:
+            self.memory[12:16] = bytes([0xE1, 0x10, cc_size, 0x00])    # capability container (OTP)
+            cfg = (pages - 4) * 4
+            self.memory[cfg:cfg + 4] = b"\x04\x00\x00\xFF"              # MIRROR, RFUI, MIRROR_PAGE, AUTH0
+            self.memory[cfg + 4] = 0x10 if counter_enabled else 0x00    # ACCESS
+        self.version = bytes([0x00, 0x04, 0x04, 0x02, 0x01, 0x00, self.storage_size, 0x03])
+
+    @property
+    def counter_enabled(self) -> bool:
+        return bool(self.memory[(self.pages_number - 3) * 4] & 0x10)
+
+    def power_on(self):
+        super().power_on()
+        self.__counted = False
+
+    def __read_pages(self, pages) -> bytes:
+        if self.counter_enabled and not self.__counted:
+            self.counter = (self.counter + 1) & 0xFFFFFF
+            self.__counted = True
+        return b"".join(bytes(4) if page >= self.pages_number - 2 else self.memory[page * 4:page * 4 + 4]  # PWD, PACK
+                        for page in pages)
+
+    def _command(self, frame: bytes) -> TagResponse | None:
+        if not _check_crc(frame) or self._pending_write is not None:
+            return super()._command(frame)
+
+        command = frame[0]
+        if command == 0x60 and len(frame) == 3:  # GET_VERSION
+            return TagResponse(_with_crc(self.version))
+
+        if command == 0x30 and len(frame) == 4:  # READ, 4 pages rolling over to page 0
+            page = frame[1]
+            if page >= self.pages_number:
+                return self.NAK
+            return TagResponse(_with_crc(self.__read_pages((page + i) % self.pages_number for i in range(4))))
+
+        if command == 0x3A and len(frame) == 5:  # FAST_READ
+            (start, end) = (frame[1], frame[2])
+            if start > end or end >= self.pages_number:
+                return self.NAK
+            return TagResponse(_with_crc(self.__read_pages(range(start, end + 1))))
+
+        if command == 0x39 and len(frame) == 4:  # READ_CNT
+            if frame[1] != self.NFC_COUNTER or not self.counter_enabled:
+                return self.NAK
+            return TagResponse(_with_crc(self.counter.to_bytes(3, "little")))
+
+        return super()._command(frame)
+
+
+class MFRC522Simulator(Transport):
+    """
+    In-process, register-level simulation of an MFRC522 chip and of the tags in its RF field.
+
+    It decodes the SPI frames as the chip does (burst FIFO access included) and models the FIFO, the IRQ registers,
+    the timer, the CRC coprocessor and the Idle, CalcCRC, Transmit, Transceive, MFAuthent and SoftReset commands.
+    Crypto1 is modeled as a session flag shared by the chip (MFCrypto1On) and the authenticated tag: frames are
+    exchanged in clear, but a tag drops its session if the chip turns Crypto1 off, as it would on a real reader.
+    Timing follows a TimingModel; with IRQ enabled, the IRQ pin callback is called from a timer thread.
+    The SPI clock is timing.spi_speed (set_speed() changes it): above max_spi_speed the bytes read are corrupted, as
+    with marginal wiring. The digital self test (AutoTestReg = 0x09 + CalcCRC) returns SELF_TEST_RESULT.
+
+    Usage:
+        tag = MifareClassicTag(uid=b"\\x12\\x34\\x56\\x78")
+        manager = RC522Manager(transport=MFRC522Simulator(tags=[tag]))
+    """
+
+    VERSION = 0x92  # MFRC522 version 2.0
+    FIFO_SIZE = 64
+    MAX_SPI_SPEED = 10000000    # 10 MHz, the maximum of the MFRC522 datasheet
+    # 64 bytes returned by the digital self test (a fixed pattern, not the one of a real chip)
+    SELF_TEST_RESULT = hashlib.sha256(b"MFRC522 self test").digest() * 2
+
+    CMD_IDLE = 0x00
+    CMD_MEM = 0x01
+    CMD_GEN_ID = 0x02
+    CMD_CALC_CRC = 0x03
+    CMD_TRANSMIT = 0x04
+    CMD_RECEIVE = 0x08
+    CMD_TRANSCEIVE = 0x0C
+    CMD_AUTHENTICATE = 0x0E
+    CMD_SOFT_RESET = 0x0F
+
+    REG_COMMAND = 0x01
+    REG_COMM_I_EN = 0x02
+    REG_DIVL_EN = 0x03
+    REG_COMM_IRQ = 0x04
+    REG_DIV_IRQ = 0x05
+    REG_ERROR = 0x06
+    REG_STATUS_1 = 0x07
+    REG_STATUS_2 = 0x08
+    REG_FIFO_DATA = 0x09
+    REG_FIFO_LEVEL = 0x0A
+    REG_CONTROL = 0x0C
+    REG_BIT_FRAMING = 0x0D
+    REG_COLLISION = 0x0E
+    REG_MODE = 0x11
+    REG_TX_CONTROL = 0x14
+    REG_CRC_RESULT_M = 0x21
+    REG_CRC_RESULT_L = 0x22
+    REG_TIMER_MODE = 0x2A
+    REG_TIMER_PRESCALER = 0x2B
+    REG_TIMER_RELOAD_H = 0x2C
+    REG_TIMER_RELOAD_L = 0x2D
+    REG_TIMER_COUNTER_VALUE_H = 0x2E
+    REG_TIMER_COUNTER_VALUE_L = 0x2F
+    REG_AUTO_TEST = 0x36
+    REG_VERSION = 0x37
+
+    READ_ONLY_REGISTERS = frozenset((REG_ERROR, REG_STATUS_1, REG_CRC_RESULT_M, REG_CRC_RESULT_L,
+                                     REG_TIMER_COUNTER_VALUE_H, REG_TIMER_COUNTER_VALUE_L, REG_VERSION))
+
+    RESET_VALUES = {
+        0x01: 0x20, 0x02: 0x80, 0x04: 0x14, 0x07: 0x21, 0x0B: 0x08, 0x0C: 0x10, 0x0E: 0x80,
+        0x11: 0x3F, 0x14: 0x80, 0x16: 0x10, 0x17: 0x84, 0x18: 0x84, 0x19: 0x4D, 0x1C: 0x62, 0x1F: 0xEB,
+        0x21: 0xFF, 0x22: 0xFF, 0x24: 0x26, 0x26: 0x48, 0x27: 0x88, 0x28: 0x20, 0x29: 0x20,
+        0x36: 0x40, 0x37: VERSION, 0x39: 0x00,
+    }
+    CRC_PRESETS = (0x0000, 0x6363, 0xA671, 0xFFFF)
+
+    def __init__(self, tags=(), timing: TimingModel | None = None, max_spi_speed: int = MAX_SPI_SPEED):
+        self.timing: TimingModel = timing if timing is not None else TimingModel()
+        self.max_spi_speed = max_spi_speed
+        self.__noise = random.Random(0)
+        self.tags: list[SimulatedTag] = []
+        self.__lock = threading.RLock()
+        self.__irq_callback: Callable[[], None] | None = None
+        self.__irq_asserted = False
+        self.__events: list[tuple[float, int, Callable[[], None]]] = []
+        self.__event_seq = 0
+        self.__running = True
+        self.__field_on = False
+        self.__ready_at: dict[SimulatedTag, float] = {}  # time.monotonic() from which each tag is powered up
+        self.regs = bytearray(64)
+        self.fifo = bytearray()
+
+        self.__reset()
+        for tag in tags:
+            self.add_tag(tag)
+
+    # --- Field management ---
+
+    def add_tag(self, tag: SimulatedTag):
+        """
+        Puts a tag in the RF field.
+        """
+        with self.__lock:
+            self.tags.append(tag)
+            if self.__field_on:
+                self.__power_on(tag)
+
+    def remove_tag(self, tag: SimulatedTag):
+        """
+        Takes a tag out of the RF field.
+        """
+        with self.__lock:
+            self.tags.remove(tag)
+            tag.power_off()
+
+    # --- Transport interface ---
+
+    def transfer(self, data) -> bytes:
+        rx = bytearray(len(data))
+        self.transfer_into(data, rx)
+        return bytes(rx)
+
+    def transfer_into(self, data, rx) -> int:
+        data = bytes(data)
+        self.__stall(self.timing.spi_time(len(data)))
+
+        with self.__lock:
+            self.__tick()
+            self.__frame(data, rx, 0)
+            self.__update_irq()
+
+        return len(data)
+
+    def transfer_frames(self, frames) -> bytes:
+        # One driver call: a single transfer overhead for the whole batch
+        frames = [bytes(frame) for frame in frames]
+        rx = bytearray(sum(len(frame) for frame in frames))
+        self.__stall(self.timing.spi_time(len(rx)))
+
+        with self.__lock:
+            offset = 0
+            for frame in frames:
+                self.__tick()
+                self.__frame(frame, rx, offset)
+                self.__update_irq()
+                offset += len(frame)
+
+        return bytes(rx)
+
+    @property
+    def speed(self) -> int:
+        return self.timing.spi_speed
+
+    def set_speed(self, speed: int) -> int:
+        self.timing.spi_speed = speed
+        return speed
+
+    def set_reset(self, value: int):
+        with self.__lock:
+            if value and not self.__running:
+                self.__reset()
+            self.__running = bool(value)
+            if not self.__running:
+                self.__update_field(False)
+
+    def enable_irq(self, callback: Callable[[], None]):
+        with self.__lock:
+            self.__irq_callback = callback
+            self.__irq_asserted = self.__irq_pending()
+
+    # --- Internals ---
+
+    def __frame(self, data: bytes, rx, offset: int):
+        """
+        Executes a chip-select frame: a register read (burst) or write (burst).
+        :param data: bytes sent
+        :param rx: buffer of the bytes received
+        :param offset: position of the frame in rx
+        """
+        if data and self.__running:
+            if data[0] & 0x80:  # read: every byte is the address of the next one, the last is 0
+                for i in range(1, len(data)):
+                    rx[offset + i] = self.__read((data[i - 1] >> 1) & 0x3F)
+                if self.timing.spi_speed > self.max_spi_speed:  # MISO sampled too early: some bits flip
+                    for i in range(1, len(data)):
+                        if self.__noise.random() < 0.5:
+                            rx[offset + i] ^= 1 << self.__noise.randrange(8)
+            else:  # write: the first byte is the address, the others are written to it
+                register = (data[0] >> 1) & 0x3F
+                for value in data[1:]:
+                    self.__write(register, value)
+
+    @staticmethod
+    def __stall(seconds: float):
+        """
+        Busy waits, the resolution of time.sleep() is too coarse for an SPI transaction.
+        """
+        if seconds > 0:
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                pass
+
+    def __reset(self):
+        """
+        Puts the chip in its reset state: registers, FIFO and pending operations. The field goes off.
+        """
+        self.regs[:] = bytes(64)
+        for register, value in self.RESET_VALUES.items():
+            self.regs[register] = value
+        self.fifo.clear()
+        self.__events.clear()
+        self.__update_field(False)
+
+    def __update_field(self, on: bool | None = None):
+        """
+        Turns the RF field on or off according to TX1/TX2, powering the tags accordingly.
+        """
+        if on is None:
+            on = self.__running and (self.regs[self.REG_TX_CONTROL] & 0x03) != 0
+        if on != self.__field_on:
+            self.__field_on = on
+            for tag in self.tags:
+                if on:
+                    self.__power_on(tag)
+                else:
+                    tag.power_off()
+
+    def __schedule(self, delay: float, action: Callable[[], None]):
+        """
+        Schedules an action of the chip after delay seconds.
+        """
+        self.__event_seq += 1
+        self.__events.append((time.monotonic() + delay, self.__event_seq, action))
+        self.__events.sort()
+        if self.__irq_callback is not None and delay > 0:
+            timer = threading.Timer(delay, self.__on_timer)
+            timer.daemon = True
+            timer.start()
+
+    def __on_timer(self):
+        with self.__lock:
+            self.__tick()
+            self.__update_irq()
+
+    def __tick(self):
+        """
+        Runs the scheduled actions that are due.
+        """
+        now = time.monotonic()
+        while self.__events and self.__events[0][0] <= now:
+            (_, _, action) = self.__events.pop(0)
+            action()
+
+    def __irq_pending(self) -> bool:
+        return bool((self.regs[self.REG_COMM_IRQ] & self.regs[self.REG_COMM_I_EN] & 0x7F) or
+                    (self.regs[self.REG_DIV_IRQ] & self.regs[self.REG_DIVL_EN] & 0x14))
+
+    def __update_irq(self):
+        """
+        Calls the IRQ callback on the falling edge of the IRQ pin.
+        """
+        asserted = self.__irq_pending()
+        if asserted and not self.__irq_asserted and self.__irq_callback is not None:
+            self.__irq_callback()
+        self.__irq_asserted = asserted
+
+    def __set_irq(self, register: int, bits: int):
+        self.regs[register] |= bits
+
+    def __set_command(self, command: int):
+        self.regs[self.REG_COMMAND] = (self.regs[self.REG_COMMAND] & 0x30) | command
+
+    def __command_done(self):
+        self.__set_command(self.CMD_IDLE)
+        self.__set_irq(self.REG_COMM_IRQ, 0x10)  # IdleIRq
+
+    def __read(self, register: int) -> int:
+        if register == self.REG_FIFO_DATA:
+            return self.fifo.pop(0) if self.fifo else 0
+        if register == self.REG_FIFO_LEVEL:
+            return len(self.fifo)
+        if register == self.REG_STATUS_1:
+            status = self.regs[register] & ~0x10
+            return status | (0x10 if self.__irq_pending() else 0)
+        return self.regs[register]
+
+    def __write(self, register: int, value: int):
+        if register == self.REG_COMMAND:
+            self.regs[register] = (self.regs[register] & 0x0F) | (value & 0x30)
+            self.__start_command(value & 0x0F)
+        elif register in (self.REG_COMM_IRQ, self.REG_DIV_IRQ):
+            mask = value & (0x7F if register == self.REG_COMM_IRQ else 0x14)
+            if value & 0x80:
+                self.regs[register] |= mask
+            else:
+                self.regs[register] &= ~mask
+        elif register == self.REG_FIFO_DATA:
+            if len(self.fifo) < self.FIFO_SIZE:
+                self.fifo.append(value)
+            else:
+                self.regs[self.REG_ERROR] |= 0x10  # BufferOvfl
+        elif register == self.REG_FIFO_LEVEL:
+            if value & 0x80:  # FlushBuffer
+                self.fifo.clear()
+                self.regs[self.REG_ERROR] &= ~0x10
+        elif register == self.REG_STATUS_2:
+            crypto = self.regs[register] & value & 0x08  # MFCrypto1On can only be cleared
+            self.regs[register] = (value & 0xC0) | crypto
+        elif register == self.REG_BIT_FRAMING:
+            self.regs[register] = value
+            if value & 0x80 and (self.regs[self.REG_COMMAND] & 0x0F) == self.CMD_TRANSCEIVE and not self.__events:
+                self.__transmit(expect_response=True)
+        elif register == self.REG_TX_CONTROL:
+            self.regs[register] = value
+            self.__update_field()
+        elif register == self.REG_CONTROL:
+            pass  # only TStopNow/TStartNow are writable, the timer is driven by TAuto here
+        elif register not in self.READ_ONLY_REGISTERS:
+            self.regs[register] = value
+
+    def __start_command(self, command: int):
+        self.__events.clear()
+        self.__set_command(command)
+
+        if command == self.CMD_SOFT_RESET:
+            self.__reset()
+        elif command == self.CMD_CALC_CRC and (self.regs[self.REG_AUTO_TEST] & 0x0F) == 0x09:
+            # Digital self test: the result fills the FIFO
+            self.fifo[:] = self.SELF_TEST_RESULT
+            self.__set_irq(self.REG_DIV_IRQ, 0x04)
+        elif command == self.CMD_CALC_CRC:
+            crc = _crc(self.fifo, self.CRC_PRESETS[self.regs[self.REG_MODE] & 0x03])
+            self.fifo.clear()
+            self.regs[self.REG_CRC_RESULT_L] = crc & 0xFF
+            self.regs[self.REG_CRC_RESULT_M] = (crc >> 8) & 0xFF
+            self.__set_irq(self.REG_DIV_IRQ, 0x04)  # CRCIRq, the command keeps running until Idle
+        elif command == self.CMD_TRANSMIT:
+            self.__transmit(expect_response=False)
+        elif command == self.CMD_AUTHENTICATE:
+            self.__authenticate()
+        elif command in (self.CMD_MEM, self.CMD_GEN_ID):
+            self.__command_done()
+
+    def __timer_period(self) -> float | None:
+        """
+        :return: time for the timer to expire once started, None if it is not started automatically (TAuto=0)
+        """
+        mode = self.regs[self.REG_TIMER_MODE]
+        if not mode & 0x80:
+            return None
+        prescaler = ((mode & 0x0F) << 8) | self.regs[self.REG_TIMER_PRESCALER]
+        reload = (self.regs[self.REG_TIMER_RELOAD_H] << 8) | self.regs[self.REG_TIMER_RELOAD_L]
+        return self.timing.timer_period(prescaler, reload)
+
+    def __schedule_timeout(self, start_delay: float):
+        """
+        Schedules the TimerIRq, with the timer started after start_delay seconds.
+        """
+        period = self.__timer_period()
+        if period is not None:
+            self.__schedule(start_delay + period, lambda: self.__set_irq(self.REG_COMM_IRQ, 0x01))
+
+    def __power_on(self, tag: SimulatedTag):
+        """
+        Powers a tag, that answers after the power up time.
+        """
+        tag.power_on()
+        self.__ready_at[tag] = time.monotonic() + self.timing.delay(self.timing.power_up_s)
+
+    def __field_tags(self) -> list[SimulatedTag]:
+        """
+        :return: the tags in the field that are powered up
+        """
+        if not self.__field_on:
+            return []
+        now = time.monotonic()
+        return [tag for tag in self.tags if self.__ready_at.get(tag, 0.0) <= now]
+
+    def __transmit(self, expect_response: bool):
+        """
+        Sends the FIFO content to the tags in the field, as Transmit or Transceive command.
+        """
+        frame = bytes(self.fifo)
+        self.fifo.clear()
+        self.regs[self.REG_ERROR] &= 0x10
+        tx_last_bits = self.regs[self.REG_BIT_FRAMING] & 0x07
+        tx_bits = len(frame) * 8 - ((8 - tx_last_bits) if tx_last_bits else 0)
+        crypto = bool(self.regs[self.REG_STATUS_2] & 0x08)
+
+        responses = []
+        for tag in self.__field_tags():
+            if tag.crypto != crypto:  # out of sync Crypto1 streams, the tag sees garbage
+                tag.reset()
+                continue
+            response = tag.receive(frame, tx_last_bits)
+            if response is not None:
+                responses.append(response)
+
+        tx_time = self.timing.rf_time(tx_bits)
+        self.__schedule(tx_time, lambda: self.__set_irq(self.REG_COMM_IRQ, 0x40))  # TxIRq
+
+        if not expect_response:
+            self.__schedule(tx_time, self.__command_done)
+            return
+
+        if not responses:
+            self.__schedule_timeout(tx_time)
+            return
+
+        (response, coll_pos) = _merge_responses(responses)
+        if coll_pos is None:
+            self.regs[self.REG_COLLISION] = (self.regs[self.REG_COLLISION] & 0x80) | 0x20  # CollPosNotValid
+        else:
+            self.regs[self.REG_ERROR] |= 0x08  # CollErr
+            self.regs[self.REG_COLLISION] = (self.regs[self.REG_COLLISION] & 0x80) | \
+                ((coll_pos & 0x1F) if coll_pos <= 32 else 0x20)
+        rx_bits = len(response.data) * 8 - ((8 - response.last_bits) if response.last_bits else 0)
+        response_delay = self.timing.delay(self.timing.frame_delay_s)
+        if response.write:
+            response_delay += self.timing.delay(self.timing.eeprom_write_s)
+        period = self.__timer_period()
+        if period is not None and response_delay > period:
+            # The timer expires before the answer starts: the chip reports a timeout (a write is done anyway)
+            self.__schedule_timeout(tx_time)
+            return
+        rx_time = tx_time + response_delay + self.timing.rf_time(rx_bits)
+        self.__schedule(rx_time, lambda: self.__receive(response))
+
+    def __receive(self, response: TagResponse):
+        """
+        Stores an answer in the FIFO, as done at the end of the reception.
+        """
+        for value in response.data:
+            if len(self.fifo) < self.FIFO_SIZE:
+                self.fifo.append(value)
+            else:
+                self.regs[self.REG_ERROR] |= 0x10
+        self.regs[self.REG_CONTROL] = (self.regs[self.REG_CONTROL] & ~0x07) | response.last_bits
+        self.__set_irq(self.REG_COMM_IRQ, 0x20)  # RxIRq
+
+    def __authenticate(self):
+        """
+        MFAuthent: FIFO = auth command (1 byte) | block number (1 byte) | key (6 bytes) | UID (4 bytes).
+        """
+        data = bytes(self.fifo)
+        self.fifo.clear()
+        crypto = bool(self.regs[self.REG_STATUS_2] & 0x08)
+        authenticated = False
+        if len(data) >= 12:
+            for tag in self.__field_tags():
+                # Nested authentication (already authenticated) runs on the current Crypto1 stream
+                if tag.state == tag.STATE_ACTIVE and tag.crypto == crypto and \
+                        tag.authenticate(data[0], data[1], data[2:8], data[8:12]):
+                    authenticated = True
+
+        period = self.__timer_period()
+        if authenticated and period is not None and self.timing.delay(self.timing.auth_s) > period:
+            authenticated = False  # the timer expires before the end of the three pass authentication
+
+        if authenticated:
+            def done():
+                self.regs[self.REG_STATUS_2] |= 0x08  # MFCrypto1On
+                self.__command_done()
+            self.__schedule(self.timing.delay(self.timing.auth_s), done)
+        else:
+            self.__schedule_timeout(self.timing.rf_time(16))
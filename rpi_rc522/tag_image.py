@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+from typing import Callable
+
+from .rc522 import RC522
+from .utils import get_blocks_number, get_block_number, get_sector_size
+
+
+class TagImage:
+    """
+    Lazy, cached image of the memory of a MIFARE Classic tag, bound to the UID of a selection.
+
+    The image is a single contiguous bytearray (16 bytes per block), exposed as a memoryview. Blocks are loaded
+    from the tag on first access, through the loader function (a block at a time, or a sector at a time with
+    sector() and load_sector()), and then served from the image without any SPI traffic.
+
+    RC522Manager keeps one image per selection: it is written through by the manager writes, and dropped on
+    a new scan (restart_crypto) or on the selection of a different UID.
+    """
+
+    BLOCK_SIZE = 16
+
+    def __init__(self, uid: bytes, sectors_number: int = 16,
+                 loader: Callable[[int], tuple[int, bytes]] | None = None):
+        """
+        :param uid: UID of the tag (4 bytes)
+        :param sectors_number: number of sectors (16 for MIFARE Classic 1K, 40 for 4K)
+        :param loader: function reading a block from the tag, block_number -> (status, data), e.g.
+                       the manager read; None for an image filled only by set_block()
+        """
+        self.uid = bytes(uid)
+        self.sectors_number = sectors_number
+        self.loader = loader
+        self.data = bytearray(get_blocks_number(sectors_number) * self.BLOCK_SIZE)
+        self.view = memoryview(self.data)
+        self.__loaded = bytearray(get_blocks_number(sectors_number))  # 1 if the block is in the image
+
+    @property
+    def blocks_number(self) -> int:
+        return len(self.__loaded)
+
+    def has_block(self, block_number: int) -> bool:
+        """
+        :return: True if the block is loaded in the image.
+        """
+        return 0 <= block_number < self.blocks_number and self.__loaded[block_number] == 1
+
+    def get_block(self, block_number: int) -> memoryview | None:
+        """
+        Returns a block only if it is already in the image, without reading the tag.
+        :param block_number: number of the block
+        :return: view of the 16 bytes of the block, None if not loaded
+        """
+        if not self.has_block(block_number):
+            return None
+        return self.view[block_number * self.BLOCK_SIZE:(block_number + 1) * self.BLOCK_SIZE]
+
+    def set_block(self, block_number: int, data):
+        """
+        Stores the content of a block, read or written on the tag.
+        :param block_number: number of the block
+        :param data: 16 bytes
+        """
+        if 0 <= block_number < self.blocks_number:
+            self.data[block_number * self.BLOCK_SIZE:(block_number + 1) * self.BLOCK_SIZE] = bytes(data[:16])
+            self.__loaded[block_number] = 1
+
+    def invalidate(self, block_number: int | None = None):
+        """
+        Drops a block from the image, or the whole image if block_number is None.
+        """
+        if block_number is None:
+            self.__loaded[:] = bytes(len(self.__loaded))
+        elif 0 <= block_number < self.blocks_number:
+            self.__loaded[block_number] = 0
+
+    def read_block(self, block_number: int) -> (int, memoryview | None):
+        """
+        Returns a block, reading it from the tag only if it is not in the image yet.
+        :param block_number: number of the block
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                data: view of the 16 bytes of the block, None on errors
+        """
+        if not self.has_block(block_number):
+            if self.loader is None or not 0 <= block_number < self.blocks_number:
+                return RC522.STATUS_ERR, None
+            (status, data) = self.loader(block_number)
+            if status != RC522.STATUS_OK:
+                return status, None
+            if len(data) < self.BLOCK_SIZE:
+                return RC522.STATUS_ERR, None
+            self.set_block(block_number, data)
+        return RC522.STATUS_OK, self.get_block(block_number)
+
+    def load_sector(self, sector_number: int) -> int:
+        """
+        Loads the missing blocks of a sector.
+        :param sector_number: number of the sector
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR, of the first failed block
+        """
+        first_block = get_block_number(sector_number, 0)
+        for block_number in range(first_block, first_block + get_sector_size(sector_number)):
+            (status, _) = self.read_block(block_number)
+            if status != RC522.STATUS_OK:
+                return status
+        return RC522.STATUS_OK
+
+    def sector(self, sector_number: int) -> (int, memoryview | None):
+        """
+        Returns a sector, loading it on first access.
+        :param sector_number: number of the sector
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                data: view of the blocks of the sector, None on errors
+        """
+        status = self.load_sector(sector_number)
+        if status != RC522.STATUS_OK:
+            return status, None
+        start = get_block_number(sector_number, 0) * self.BLOCK_SIZE
+        return RC522.STATUS_OK, self.view[start:start + get_sector_size(sector_number) * self.BLOCK_SIZE]
+
+    def load(self) -> int:
+        """
+        Loads all the missing blocks of the image.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR, of the last block
+        """
+        status = RC522.STATUS_OK
+        for block_number in range(self.blocks_number):
+            (status, _) = self.read_block(block_number)
+        return status
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+import threading
+import time
+from typing import Callable
+
+
+class Transport:
+    """
+    Interface between RC522 and the MFRC522 chip: full-duplex SPI frames, the reset pin and the IRQ pin.
+
+    Implementations:
+        - SpiTransport: the real reader, via the bundled SPI-Py extension and RPi.GPIO.
+        - MFRC522Simulator (rpi_rc522.simulator): in-process register-level simulation of the chip and the tags.
+    """
+
+    speed: int | None = None  # SPI clock requested, in Hz, None if unknown
+
+    def transfer(self, data) -> bytes | tuple[int, ...]:
+        """
+        Performs a full-duplex SPI transaction, in a single chip-select frame.
+        :param data: bytes to be sent
+        :return: bytes received, same length of data
+        """
+        raise NotImplementedError
+
+    def transfer_into(self, data, rx) -> int:
+        """
+        Performs a full-duplex SPI transaction, like transfer(), writing the bytes received into rx.
+        Used on the hot path with preallocated buffers; the default implementation copies the result of transfer().
+        :param data: bytes to be sent, a bytes-like object
+        :param rx: writable bytes-like object (bytearray, memoryview), at least as long as data
+        :return: number of bytes received
+        """
+        n = len(data)
+        rx[:n] = self.transfer(data)
+        return n
+
+    def transfer_frames(self, frames) -> bytes:
+        """
+        Performs several full-duplex SPI transactions, each in its own chip-select frame, as one batch.
+        Used to run a sequence of register accesses with a single call; the default implementation calls transfer()
+        for each frame.
+        :param frames: sequence of bytes-like objects, one per chip-select frame
+        :return: bytes received by all the frames, concatenated
+        """
+        return b"".join([bytes(self.transfer(frame)) for frame in frames])
+
+    def set_speed(self, speed: int) -> int:
+        """
+        Changes the SPI clock.
+        :param speed: clock in Hz
+        :return: clock set, as reported by the driver (the controller may round it down)
+        """
+        raise ValueError(f"{type(self).__name__} has no adjustable SPI clock")
+
+    def set_reset(self, value: int):
+        """
+        Drives the reset pin (NRSTPD) of the chip.
+        :param value: 1 = running, 0 = hard power down
+        """
+        raise NotImplementedError
+
+    def enable_irq(self, callback: Callable[[], None]):
+        """
+        Calls callback on each falling edge of the IRQ pin of the chip (asserted low, IRqInv=1).
+        :param callback: function with no arguments, it may be called from another thread
+        """
+        raise ValueError(f"{type(self).__name__} has no IRQ pin wired")
+
+    def close(self):
+        """
+        Releases the transport resources.
+        """
+        pass
+
+
+class SpiTransport(Transport):
+    """
+    Transport to a real MFRC522 chip, connected via SPI to a Raspberry Pi.
+    Uses the bundled SPI-Py extension (module spi) and RPi.GPIO in BCM mode.
+
+    Each instance owns its SPI file descriptor and its reset pin, so several readers can be used at the same time,
+    e.g. one on /dev/spidev0.0 (CE0) and one on /dev/spidev0.1 (CE1), each with a different pin_rst.
+    The extension releases the GIL during each bus transaction, so the other threads of the process keep running
+    while a reader polls; transfers and close() on the same instance are serialized by a lock.
+    """
+
+    DEFAULT_DEV = "/dev/spidev0.0"
+    DEFAULT_SPEED = 1000000
+    DEFAULT_PIN_RST = 25    # BOARD 22
+
+    def __init__(self, device: str = DEFAULT_DEV, speed: int = DEFAULT_SPEED, pin_rst: int = DEFAULT_PIN_RST,
+                 pin_irq: int | None = None, debug: bool = False):
+        # Imported here, so that the rest of the library can be used off the Raspberry Pi
+        import spi
+        import RPi.GPIO as GPIO
+
+        self.__spi = spi
+        self.__gpio = GPIO
+        self.device = device
+        self.speed = speed
+        self.pin_rst = pin_rst
+        self.pin_irq = pin_irq
+
+        self.__lock = threading.Lock()
+        self.__fd = self.__spi.openSPI(device=device, speed=speed)["fd"]
+        GPIO.setwarnings(debug)
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(self.pin_rst, GPIO.OUT)
+        GPIO.output(self.pin_rst, 1)
+
+    def transfer(self, data) -> bytes:
+        if not isinstance(data, (bytes, bytearray, memoryview, tuple)):
+            data = tuple(data)
+        with self.__lock:
+            return self.__spi.transfer(self.__open_fd(), data)
+
+    def transfer_into(self, data, rx) -> int:
+        with self.__lock:
+            return self.__spi.transfer_into(self.__open_fd(), data, rx)
+
+    def transfer_frames(self, frames) -> bytes:
+        # A single SPI_IOC_MESSAGE(n), the chip select is released between the frames
+        with self.__lock:
+            return self.__spi.transfer_frames(self.__open_fd(), frames)
+
+    def set_speed(self, speed: int) -> int:
+        with self.__lock:
+            self.speed = self.__spi.setSpeed(self.__open_fd(), speed)
+        return self.speed
+
+    def set_reset(self, value: int):
+        self.__gpio.output(self.pin_rst, value)
+
+    def enable_irq(self, callback: Callable[[], None]):
+        if self.pin_irq is None:
+            super().enable_irq(callback)
+        GPIO = self.__gpio
+        GPIO.setup(self.pin_irq, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(self.pin_irq, GPIO.FALLING, callback=lambda channel: callback())
+
+    def close(self):
+        if self.pin_irq is not None:
+            self.__gpio.remove_event_detect(self.pin_irq)
+        with self.__lock:
+            # Waits for a transfer in progress, the fd number can be reused as soon as it is closed
+            if self.__fd >= 0:
+                self.__spi.closeSPI(self.__fd)
+                self.__fd = -1
+
+    def __open_fd(self) -> int:
+        """
+        :return: the SPI file descriptor, raises ValueError if the transport is closed
+        """
+        if self.__fd < 0:
+            raise ValueError(f"SPI device {self.device} is closed")
+        return self.__fd
+
+
+class MeteredTransport(Transport):
+    """
+    Wraps another transport, counting the SPI transactions, the bytes sent and the time spent on the bus.
+    A batch of frames (transfer_frames) counts as one transaction: it is a single call to the driver.
+    """
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.transactions = 0
+        self.bytes = 0
+        self.bus_s = 0.0
+
+    def reset_counters(self):
+        """
+        Resets the counters to 0.
+        """
+        self.transactions = 0
+        self.bytes = 0
+        self.bus_s = 0.0
+
+    def transfer(self, data) -> bytes | tuple[int, ...]:
+        start = time.perf_counter()
+        rx = self.transport.transfer(data)
+        self.bus_s += time.perf_counter() - start
+        self.transactions += 1
+        self.bytes += len(data)
+        return rx
+
+    def transfer_into(self, data, rx) -> int:
+        start = time.perf_counter()
+        n = self.transport.transfer_into(data, rx)
+        self.bus_s += time.perf_counter() - start
+        self.transactions += 1
+        self.bytes += len(data)
+        return n
+
+    def transfer_frames(self, frames) -> bytes:
+        start = time.perf_counter()
+        rx = self.transport.transfer_frames(frames)
+        self.bus_s += time.perf_counter() - start
+        self.transactions += 1
+        self.bytes += len(rx)
+        return rx
+
+    @property
+    def speed(self) -> int | None:
+        return self.transport.speed
+
+    def set_speed(self, speed: int) -> int:
+        return self.transport.set_speed(speed)
+
+    def set_reset(self, value: int):
+        self.transport.set_reset(value)
+
+    def enable_irq(self, callback: Callable[[], None]):
+        self.transport.enable_irq(callback)
+
+    def close(self):
+        self.transport.close()
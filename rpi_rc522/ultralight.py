@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+from .rc522 import RC522
+from .rc522manager import RC522Manager
+
+
+class UltralightReader:
+    """
+    Access layer of the MIFARE Ultralight and NTAG tags (SAK 0x00): 4 bytes pages and no keys, so nothing is
+    authenticated. It works on the tag selected by an RC522Manager (scan() + select_tag(), presence_scan(), watch()).
+
+    The tag is identified with GET_VERSION on first use. When it supports FAST_READ (Ultralight EV1, NTAG21x) the pages
+    are read in ranges of up to RC522.FAST_READ_MAX_PAGES, the answers that fit in the FIFO, otherwise with READ
+    (4 pages): a whole NTAG215 (135 pages) takes 9 commands.
+
+    Usage:
+        manager = RC522Manager()
+        (status, uid_data) = manager.scan()
+        manager.select_tag(uid_data)
+        (status, data) = UltralightReader(manager).dump()
+    """
+
+    # (product type, storage size) of GET_VERSION -> (name, pages)
+    PRODUCTS = {
+        (0x03, 0x0B): ("MIFARE Ultralight EV1 (MF0UL11)", 20),
+        (0x03, 0x0E): ("MIFARE Ultralight EV1 (MF0UL21)", 41),
+        (0x04, 0x0F): ("NTAG213", 45),
+        (0x04, 0x11): ("NTAG215", 135),
+        (0x04, 0x13): ("NTAG216", 231),
+    }
+    DEFAULT_PAGES_NUMBER = 16   # MIFARE Ultralight (MF0ICU1), the tags without GET_VERSION
+    NTAG_NFC_COUNTER = 0x02     # address of the NFC counter of the NTAG21x, for read_counter()
+
+    # RC522 Status
+    STATUS_OK = RC522.STATUS_OK
+    STATUS_NO_TAG_ERR = RC522.STATUS_NO_TAG_ERR
+    STATUS_ERR = RC522.STATUS_ERR
+
+    def __init__(self, manager: RC522Manager):
+        self.manager = manager
+        self.reader: RC522 = manager.reader
+        self.debug: bool = manager.debug
+
+        # Identification of the selected tag, see identify()
+        self.version: bytes | None = None  # GET_VERSION answer, None if not supported
+        self.name: str | None = None
+        self.pages_number: int = self.DEFAULT_PAGES_NUMBER
+        self.fast_read: bool = False
+        self.__identified_uid: bytes | None = None
+
+    def identify(self) -> int:
+        """
+        Identifies the selected tag with GET_VERSION, setting version, name, pages_number and fast_read.
+        A tag without GET_VERSION (MIFARE Ultralight, Ultralight C) drops the selection, so it is selected again and
+        read with READ only, assuming DEFAULT_PAGES_NUMBER pages.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        uid = self.manager.uid
+        if uid is None:
+            return self.STATUS_ERR
+
+        (status, version) = self.reader.get_version()
+        if status == self.STATUS_OK:
+            (name, pages_number) = self.PRODUCTS.get((version[2], version[6]), (None, None))
+            self.version = version
+            self.name = name
+            # Unknown products: the storage size is 2^(n/2) bytes (rounded down for odd n), after 4 header pages
+            self.pages_number = pages_number or 4 + (1 << (version[6] >> 1)) // RC522.PAGE_SIZE
+            self.fast_read = True
+        else:
+            status = self.manager.select_uid(uid)
+            self.version = None
+            self.name = "MIFARE Ultralight"
+            self.pages_number = self.DEFAULT_PAGES_NUMBER
+            self.fast_read = False
+
+        self.__identified_uid = uid if status == self.STATUS_OK else None
+
+        if self.debug:
+            print(f"[d] UltralightReader.identify() >>> status={status}, name={self.name}, "
+                  f"pages_number={self.pages_number}, fast_read={self.fast_read}")
+
+        return status
+
+    def __identify_once(self) -> int:
+        """
+        Identifies the selected tag, unless already done.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        if self.__identified_uid is not None and self.__identified_uid == self.manager.uid:
+            return self.STATUS_OK
+        return self.identify()
+
+    def read_pages(self, start_page: int, count: int) -> (int, bytes):
+        """
+        Reads consecutive pages, with FAST_READ if the tag supports it, with READ otherwise.
+        :param start_page: first page
+        :param count: number of pages
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                read_data: RC522.PAGE_SIZE bytes for each page, empty on errors
+        """
+        status = self.__identify_once()
+        read_data = bytearray()
+        page = start_page
+        end_page = start_page + count
+
+        while status == self.STATUS_OK and page < end_page:
+            if self.fast_read:
+                (status, pages_data) = self.reader.fast_read(page, min(end_page, page + RC522.FAST_READ_MAX_PAGES) - 1)
+            else:
+                # READ returns 4 pages, rolling over to page 0 at the end of the memory
+                (status, pages_data) = self.reader.read_block(page)
+                if status == self.STATUS_OK and len(pages_data) != 4 * RC522.PAGE_SIZE:
+                    status = self.STATUS_ERR  # NAK
+                pages_data = pages_data[:(end_page - page) * RC522.PAGE_SIZE]
+            if status == self.STATUS_OK:
+                read_data += pages_data
+                page += len(pages_data) // RC522.PAGE_SIZE
+
+        if self.debug:
+            print(f"[d] UltralightReader.read_pages(start_page={start_page}, count={count}) >>> status={status}")
+
+        return status, bytes(read_data) if status == self.STATUS_OK else b""
+
+    def write_page(self, page: int, data, compat: bool = False) -> int:
+        """
+        Writes a page.
+        :param page: number of the page
+        :param data: RC522.PAGE_SIZE bytes to be written
+        :param compat: True to use COMPATIBILITY_WRITE, the MIFARE Classic write, instead of WRITE
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        if len(data) != RC522.PAGE_SIZE:
+            raise ValueError(f"a page is {RC522.PAGE_SIZE} bytes long")
+
+        if compat:
+            # 16 bytes are sent, only the first page is written
+            status = self.reader.write_block(page, bytes(data) + bytes(12))
+        else:
+            status = self.reader.write_page(page, data)
+
+        if self.debug:
+            print(f"[d] UltralightReader.write_page(page={page}, compat={compat}) >>> status={status}")
+
+        return status
+
+    def write_pages(self, start_page: int, data, compat: bool = False) -> int:
+        """
+        Writes consecutive pages, stopping at the first error.
+        :param start_page: first page
+        :param data: data to be written, a multiple of RC522.PAGE_SIZE bytes
+        :param compat: True to use COMPATIBILITY_WRITE instead of WRITE
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+        """
+        if len(data) % RC522.PAGE_SIZE:
+            raise ValueError(f"data must be a multiple of {RC522.PAGE_SIZE} bytes")
+
+        status = self.STATUS_OK
+        for i in range(0, len(data), RC522.PAGE_SIZE):
+            status = self.write_page(start_page + i // RC522.PAGE_SIZE, data[i:i + RC522.PAGE_SIZE], compat)
+            if status != self.STATUS_OK:
+                break
+
+        return status
+
+    def read_counter(self, counter: int = NTAG_NFC_COUNTER) -> (int, int | None):
+        """
+        Reads a one-way counter (READ_CNT), see RC522.read_counter().
+        :param counter: address of the counter, the NFC counter of the NTAG21x by default
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                value: value of the counter, None on errors
+        """
+        return self.reader.read_counter(counter)
+
+    def dump(self) -> (int, bytes):
+        """
+        Dumps the entire tag, pages_number pages after the identification.
+        :return status: 0 = OK, 1 = NO_TAG_ERROR, 2 = ERROR
+                dump_data: RC522.PAGE_SIZE bytes for each page, empty on errors
+        """
+        status = self.__identify_once()
+        dump_data = b""
+        if status == self.STATUS_OK:
+            (status, dump_data) = self.read_pages(0, self.pages_number)
+
+        if self.debug:
+            print(f"[d] UltralightReader.dump() >>> status={status}, dump_data={dump_data.hex()}")
+
+        return status, dump_data
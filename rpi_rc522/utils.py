@@ -1,14 +1,127 @@
 from typing import Any
 
 
+def _build_crc_a_table() -> tuple[int, ...]:
+    """
+    Builds the lookup table for the CRC_A (ISO 14443-3), i.e. the reflected CCITT polynomial 0x8408.
+    :return 256 entries table, indexed by (crc ^ byte) & 0xFF
+    """
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0x8408
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC_A_PRESET = 0x6363
+CRC_A_TABLE = _build_crc_a_table()
+
+
+def crc_a(data) -> int:
+    """
+    Calculates the CRC_A (ISO 14443-3 part 6.2.4, preset 0x6363) of some data, on the host.
+    It gives the same result of the CRC coprocessor of the MFRC522 chip, configured by RC522.
+    :param data: data to calculate the CRC for, any bytes-like object or sequence of ints
+    :return CRC, as a 16 bits int (sent LSB first)
+    """
+    crc = CRC_A_PRESET
+    for byte in data:
+        crc = (crc >> 8) ^ CRC_A_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def calculate_crc_a(data) -> list[int]:
+    """
+    Calculates the CRC_A of some data, as crc_a().
+    :param data: data to calculate the CRC for
+    :return CRC (2 bytes), LSB first
+    """
+    crc = crc_a(data)
+    return [crc & 0xFF, (crc >> 8) & 0xFF]
+
+
 def get_block_number(sector_num: int, relative_block_num: int) -> int:
     """
     Returns the block number starting from the relative block number and the sector number.
+    Sectors from 32 on (MIFARE Classic 4K) have 16 blocks.
     :param sector_num: sector number (from 0 to SECTORS_NUMBER - 1)
-    :param relative_block_num: relative block number (from 0 to 3)
-    :return number of the block (from 0 to SECTORS_NUMBER * 4 - 1)
+    :param relative_block_num: relative block number (from 0 to 3, or to 15 for sectors from 32 on)
+    :return number of the block
+    """
+    if sector_num < 32:
+        return sector_num * 4 + relative_block_num
+    return 128 + (sector_num - 32) * 16 + relative_block_num
+
+
+def get_sector_number(block_number: int) -> int:
+    """
+    Returns the sector of a given block, i.e. the unit of the MIFARE Classic authentication.
+    Blocks from 128 on (MIFARE Classic 4K) are in sectors of 16 blocks.
+    :param block_number: number of the block
+    :return number of the sector
+    """
+    if block_number < 128:
+        return block_number // 4
+    return 32 + (block_number - 128) // 16
+
+
+def get_sector_size(sector_num: int) -> int:
+    """
+    Returns the number of blocks of a sector: 4, or 16 for sectors from 32 on (MIFARE Classic 4K).
+    :param sector_num: sector number
+    :return number of blocks
+    """
+    return 4 if sector_num < 32 else 16
+
+
+def get_trailer_block_number(sector_num: int) -> int:
+    """
+    Returns the block number of the sector trailer (last block) of a sector.
+    :param sector_num: sector number
+    :return number of the block
+    """
+    return get_block_number(sector_num, get_sector_size(sector_num) - 1)
+
+
+def get_blocks_number(sectors_number: int) -> int:
+    """
+    Returns the number of blocks of a tag with the given number of sectors (16 = 1K, 40 = 4K).
+    :param sectors_number: number of sectors
+    :return number of blocks
+    """
+    return get_block_number(sectors_number, 0)
+
+
+def get_value_block(value: int, address: int) -> bytes:
+    """
+    Encodes a MIFARE Classic value block: the value (signed 32 bits, LSB first) stored three times, once inverted,
+    followed by an address byte stored four times, twice inverted (free for the application, e.g. a backup block).
+    :param value: value, from -2^31 to 2^31 - 1
+    :param address: address byte
+    :return the 16 bytes of the block
+    """
+    value_bytes = value.to_bytes(4, "little", signed=True)
+    address &= 0xFF
+    return value_bytes + bytes(~byte & 0xFF for byte in value_bytes) + value_bytes + \
+        bytes((address, ~address & 0xFF, address, ~address & 0xFF))
+
+
+def parse_value_block(block_data) -> tuple[int, int] | None:
+    """
+    Decodes a MIFARE Classic value block.
+    :param block_data: the 16 bytes of the block
+    :return (value, address byte), None if the block is not in the value block format
     """
-    return sector_num * 4 + relative_block_num
+    data = bytes(block_data)
+    if len(data) != 16 or data[0:4] != data[8:12] or data[12] != data[14] or data[13] != data[15] or \
+            any(data[i] ^ data[i + 4] != 0xFF for i in range(4)) or data[12] ^ data[13] != 0xFF:
+        return None
+    return int.from_bytes(data[0:4], "little", signed=True), data[12]
 
 
 def get_block_repr(block_number: int) -> str:
@@ -17,7 +130,8 @@ def get_block_repr(block_number: int) -> str:
     S01B03 for sector trailer in second sector.
     :return string representation
     """
-    return f"S{(block_number - (block_number % 4)) // 4}B{block_number % 4}"
+    sector_num = get_sector_number(block_number)
+    return f"S{sector_num}B{block_number - get_block_number(sector_num, 0)}"
 
 
 def get_access_bits(c0: tuple[int | Any, int | Any, int | Any, int | Any],
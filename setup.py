@@ -23,4 +23,8 @@ setup(
     url='https://github.com/Mik3Rizzo/rpi-rc522',
     license='GNU Lesser General Public License v3.0',
     install_requires=['SPI-Py', 'RPi.GPIO'],
+    entry_points={
+        'console_scripts': ['rc522-bench=rpi_rc522.bench.__main__:main',
+                            'rc522-daemon=rpi_rc522.daemon.__main__:main'],
+    },
 )
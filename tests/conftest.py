@@ -0,0 +1,79 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics, MeteredTransport
+
+UID = bytes.fromhex("12345678")
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+@pytest.fixture
+def classic_tag():
+    return MifareClassicTag(uid=UID)
+
+
+@pytest.fixture
+def simulator(classic_tag):
+    return MFRC522Simulator(tags=[classic_tag])
+
+
+@pytest.fixture
+def transport(simulator):
+    return MeteredTransport(simulator)
+
+
+@pytest.fixture
+def manager(transport, metrics):
+    """
+    Manager with the MIFARE Classic 1K tag selected and the default key set.
+    """
+    manager = RC522Manager(transport=transport, metrics=metrics)
+    (status, uid_data) = manager.scan(scan_once=True)
+    assert status == manager.STATUS_OK
+    assert manager.select_tag(uid_data) == manager.STATUS_OK
+    manager.set_auth()
+    return manager
+
+
+def count(metrics: Metrics, operation: str) -> int:
+    """
+    :return: number of times the operation ran
+    """
+    return metrics.snapshot()["operations"].get(operation, {}).get("count", 0)
+
+
+class RecordingTransport(MeteredTransport):
+    """
+    MeteredTransport that also records the register accesses: (register, True for a read, length of the frame), one
+    per SPI frame.
+    """
+
+    def __init__(self, transport):
+        super().__init__(transport)
+        self.accesses: list[tuple[int, bool, int]] = []
+
+    def reset_counters(self):
+        super().reset_counters()
+        self.accesses.clear()
+
+    def __record(self, frame):
+        self.accesses.append(((frame[0] >> 1) & 0x3F, bool(frame[0] & 0x80), len(frame)))
+
+    def transfer_into(self, data, rx) -> int:
+        self.__record(data)
+        return super().transfer_into(data, rx)
+
+    def transfer_frames(self, frames) -> bytes:
+        frames = [bytes(frame) for frame in frames]
+        for frame in frames:
+            self.__record(frame)
+        return super().transfer_frames(frames)
+
+    def reads(self, registers) -> int:
+        return sum(1 for (register, read, _) in self.accesses if read and register in registers)
+
+    def writes(self, register) -> int:
+        return sum(1 for (address, read, _) in self.accesses if not read and address == register)
@@ -0,0 +1,41 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, MifareUltralightTag
+
+
+# UIDs differing at the first, an inner and the last bit of the cascade level
+@pytest.mark.parametrize("uids", [
+    ("12345678", "92345678"),
+    ("12345678", "12345679"),
+    ("12345678", "123456f8"),
+])
+def test_inventory_resolves_collisions(uids):
+    tags = [MifareClassicTag(uid=bytes.fromhex(uid)) for uid in uids]
+    manager = RC522Manager(transport=MFRC522Simulator(tags=tags))
+
+    (status, found) = manager.inventory()
+
+    assert status == manager.STATUS_OK
+    assert sorted(uid.hex() for uid in found) == sorted(uids)
+
+
+def test_scan_collision_at_last_bit():
+    tags = [MifareClassicTag(uid=bytes.fromhex("12345678")), MifareClassicTag(uid=bytes.fromhex("123456f8"))]
+    manager = RC522Manager(transport=MFRC522Simulator(tags=tags))
+
+    (status, uid_data) = manager.scan(scan_once=True)
+
+    assert status == manager.STATUS_OK
+    assert uid_data == bytes.fromhex("123456f8") + bytes((0x12 ^ 0x34 ^ 0x56 ^ 0xF8,))
+    assert manager.select_tag(uid_data) == manager.STATUS_OK
+
+
+def test_inventory_collision_at_last_bit_of_cascade_level_2():
+    uids = ("04112233445566", "041122334455e6")
+    tags = [MifareUltralightTag(uid=bytes.fromhex(uid)) for uid in uids]
+    manager = RC522Manager(transport=MFRC522Simulator(tags=tags))
+
+    (status, found) = manager.inventory()
+
+    assert status == manager.STATUS_OK
+    assert sorted(uid.hex() for uid in found) == sorted(uids)
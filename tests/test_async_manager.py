@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+from rpi_rc522 import AsyncRC522Manager, MFRC522Simulator, MifareClassicTag, TagEvent
+
+from conftest import UID
+
+
+def test_operations():
+    async def main():
+        async with AsyncRC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag(uid=UID)])) as reader:
+            (status, uid_data) = await reader.scan(scan_once=True)
+            assert status == reader.STATUS_OK
+            assert await reader.select_tag(uid_data) == reader.STATUS_OK
+            reader.set_auth()
+            assert await reader.write_block(4, bytes(range(16))) == reader.STATUS_OK
+            assert await reader.write_blocks({5: bytes(16), 6: [None, 0xAB]}) == reader.STATUS_OK
+            assert await reader.read_block(4) == (reader.STATUS_OK, bytes(range(16)))
+            (status, data) = await reader.dump(2)
+            assert status == reader.STATUS_OK
+            assert data[64:80] == bytes(range(16)) and data[97] == 0xAB
+
+    asyncio.run(main())
+
+
+def test_reader_thread_does_not_block_the_loop():
+    async def main():
+        async with AsyncRC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag(uid=UID)])) as reader:
+            assert (await reader.scan(scan_once=True))[0] == reader.STATUS_OK
+            await reader.select_tag(UID)
+            reader.set_auth()
+
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+
+            task = asyncio.create_task(tick())
+            await asyncio.sleep(0)
+            (status, _) = await reader.dump()
+            task.cancel()
+            assert status == reader.STATUS_OK
+            assert ticks > 10
+
+            # Every operation runs in the same reader thread
+            names = {await reader.run(lambda: threading.current_thread().name) for _ in range(3)}
+            assert len(names) == 1 and names.pop().startswith("rc522")
+            assert threading.current_thread().name not in names
+
+    asyncio.run(main())
+
+
+def test_events():
+    tag = MifareClassicTag(uid=UID)
+    simulator = MFRC522Simulator(tags=[tag])
+
+    async def main():
+        async with AsyncRC522Manager(transport=simulator) as reader:
+            events = reader.events(scan_interval=0.001, departure_misses=2)
+            event = await events.__anext__()
+            assert (event.kind, event.uid) == (TagEvent.ARRIVED, UID)
+
+            # The arrived tag is selected: it can be read before the next event
+            reader.set_auth()
+            assert (await reader.read_block(1))[0] == reader.STATUS_OK
+
+            simulator.remove_tag(tag)
+            event = await events.__anext__()
+            assert (event.kind, event.uid) == (TagEvent.DEPARTED, UID)
+            await events.aclose()
+
+    asyncio.run(asyncio.wait_for(main(), 5))
@@ -0,0 +1,68 @@
+import copy
+
+import pytest
+
+from rpi_rc522 import MFRC522Simulator, MifareClassicTag, TimingModel
+from rpi_rc522.bench import __main__ as bench
+from rpi_rc522.bench.benchmark import Benchmark, OPERATIONS, compare, load_baseline, percentile
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.fixture(scope="module")
+def results():
+    simulator = MFRC522Simulator(tags=[MifareClassicTag()], timing=TimingModel.instant())
+    return Benchmark(simulator).run(OPERATIONS, iterations=3, label="test")
+
+
+def test_all_operations_succeed(results):
+    assert results["meta"]["label"] == "test"
+    assert results["meta"]["transport"] == "MFRC522Simulator"
+    for operation in OPERATIONS:
+        assert results["operations"][operation]["samples"] == 3
+        assert results["operations"][operation]["failures"] == 0
+        assert results["operations"][operation]["spi_transactions"] > 0
+
+    # A dump reads the 64 blocks and authenticates once per sector
+    read = results["operations"]["read"]["spi_transactions"]
+    auth = results["operations"]["auth"]["spi_transactions"]
+    assert results["operations"]["dump"]["spi_transactions"] >= 64 * read + 16 * auth
+
+
+def test_compare(results):
+    assert compare(results, results) == []
+
+    slower = copy.deepcopy(results)
+    slower["operations"]["read"]["spi_transactions"] *= 1.5
+    slower["operations"]["write"]["spi_bytes"] *= 1.05
+    regressions = compare(results, slower, threshold=0.10)
+    assert len(regressions) == 1 and regressions[0].startswith("read: SPI transactions")
+
+
+def test_main_saves_and_compares_a_baseline(tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    assert bench.main(["--instant", "-n", "2", "--ops", "read,write", "-o", path]) == 0
+    baseline = load_baseline(path)
+    assert set(baseline["operations"]) == {"read", "write"}
+
+    assert bench.main(["--instant", "-n", "2", "--ops", "read,write", "--baseline", path, "--threshold", "10"]) == 0
+    assert "read" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("args", [
+    ["--wait-strategy", ","],
+    ["--wait-strategy", "busy"],
+    ["--ops", "erase"],
+    ["--wait-strategy", "all", "-o", "baseline.json"],
+])
+def test_main_rejects_invalid_arguments(args):
+    with pytest.raises(SystemExit) as e:
+        bench.main(["--instant", *args])
+    assert e.value.code == 2
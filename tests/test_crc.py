@@ -0,0 +1,54 @@
+import pytest
+
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics, calculate_crc_a
+from rpi_rc522.utils import crc_a
+
+from conftest import UID, count
+
+
+# ISO 14443-3 annex B and the usual READ/HLTA frames
+@pytest.mark.parametrize(("data", "crc"), [
+    ("0000", "a01e"),
+    ("1234", "26cf"),
+    ("3004", "26ee"),
+    ("5000", "57cd"),
+])
+def test_crc_a_vectors(data, crc):
+    assert crc_a(bytes.fromhex(data)) == int.from_bytes(bytes.fromhex(crc), "little")
+    assert bytes(calculate_crc_a(bytes.fromhex(data))) == bytes.fromhex(crc)
+    assert calculate_crc_a(list(bytes.fromhex(data))) == calculate_crc_a(bytes.fromhex(data))
+
+
+def build_manager(simulator: MFRC522Simulator, metrics: Metrics, crc_mode: int) -> RC522Manager:
+    manager = RC522Manager(transport=simulator, metrics=metrics)
+    manager.reader.crc_mode = crc_mode
+    return manager
+
+
+@pytest.mark.parametrize("crc_mode", [RC522.CRC_MODE_HOST, RC522.CRC_MODE_CHIP, RC522.CRC_MODE_VERIFY])
+def test_crc_modes_agree(crc_mode):
+    metrics = Metrics()
+    manager = build_manager(MFRC522Simulator(tags=[MifareClassicTag(uid=UID)]), metrics, crc_mode)
+
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    (status, data) = manager.read_block(1)
+
+    assert status == manager.STATUS_OK and len(data) == 16
+    # Only the chip modes use the coprocessor, and the host and chip results never differ
+    assert (count(metrics, "crc") > 0) == (crc_mode != RC522.CRC_MODE_HOST)
+    assert metrics.snapshot()["operations"].get("crc", {}).get("errors", {}).get("crc_mismatch", 0) == 0
+
+
+def test_crc_mode_verify_reports_a_corrupted_result():
+    metrics = Metrics()
+    simulator = MFRC522Simulator(tags=[MifareClassicTag(uid=UID)])
+    # A faulty coprocessor: the CRC_A is computed with the wrong preset
+    simulator.CRC_PRESETS = (0x0000,) * 4
+    manager = build_manager(simulator, metrics, RC522.CRC_MODE_VERIFY)
+
+    (status, uid) = manager.presence_scan()
+
+    # The tag rejects the SELECT sent with the chip result, and every mismatch is counted
+    assert status != manager.STATUS_OK
+    assert metrics.snapshot()["operations"]["crc"]["errors"]["crc_mismatch"] > 0
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics
+from rpi_rc522.daemon import ReaderDaemon, ReaderClient
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    simulator = MFRC522Simulator(tags=[MifareClassicTag(uid=b"\x12\x34\x56\x78")])
+    daemon = ReaderDaemon(RC522Manager(transport=simulator), path=str(tmp_path / "rc522.sock"), scan_interval=0.01)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    async def serve():
+        async with daemon:
+            started.set()
+            try:
+                await daemon.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    task = loop.create_task(serve())
+    thread = threading.Thread(target=loop.run_until_complete, args=(task,))
+    thread.start()
+    started.wait(5)
+    deadline = time.monotonic() + 5
+    while daemon.tracker.uid is None and time.monotonic() < deadline:
+        time.sleep(0.01)  # first scan
+    yield daemon
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+
+
+def test_events_and_requests(daemon):
+    with ReaderClient(daemon.path, timeout=5) as client:
+        assert client.subscribe() == b"\x12\x34\x56\x78"
+        assert client.write_block(4, bytes(range(16)), key=b"\xff" * 6) == client.STATUS_OK
+        assert client.read_block(4, key=b"\xff" * 6, uid=b"\x12\x34\x56\x78") == (client.STATUS_OK, bytes(range(16)))
+        assert client.read_block(4, key=b"\xff" * 6, uid=b"\x00\x00\x00\x00")[0] == client.STATUS_NO_TAG_ERR
+
+
+def test_operation_errors_do_not_stop_the_daemon(daemon):
+    def broken_read_block(block_number):
+        raise OSError("SPI transfer failed")
+
+    read_block = daemon.manager.read_block
+    daemon.manager.read_block = broken_read_block
+    with ReaderClient(daemon.path, timeout=5) as client:
+        response = client.request("read_block", block=4, key="ffffffffffff")
+        assert response["status"] == client.STATUS_ERR
+        assert "SPI transfer failed" in response["error"]
+
+        daemon.manager.read_block = read_block
+        assert client.read_block(4, key=b"\xff" * 6)[0] == client.STATUS_OK
+
+
+def wait_until(condition, timeout=5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_scan_errors_back_off(daemon, capsys):
+    def broken_presence_scan():
+        raise OSError("SPI transfer failed")
+
+    metrics = daemon.manager.reader.metrics = Metrics()
+    presence_scan = daemon.manager.presence_scan
+    daemon.manager.presence_scan = broken_presence_scan
+    assert wait_until(lambda: daemon.scan_failures >= 3)
+    # 0.02 + 0.04 + 0.08 + 0.16 s between the failing scans instead of the scan interval of 0.01 s
+    time.sleep(0.2)
+    failures = daemon.scan_failures
+    assert failures <= 6
+    assert metrics.snapshot()["operations"]["scan"]["errors"]["exception"] == failures
+
+    daemon.manager.presence_scan = presence_scan
+    assert wait_until(lambda: daemon.scan_failures == 0)
+    assert daemon.tracker.uid == b"\x12\x34\x56\x78"
+    # Only the first failure of the run is reported
+    assert capsys.readouterr().out.count("[e] ReaderDaemon: scan failed") == 1
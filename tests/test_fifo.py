@@ -0,0 +1,57 @@
+import pytest
+
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, NTAGTag, UltralightReader
+
+from conftest import RecordingTransport
+
+
+@pytest.fixture
+def transport(simulator):
+    return RecordingTransport(simulator)
+
+
+def fifo_frames(transport: RecordingTransport, read: bool) -> list[int]:
+    """
+    :return: lengths of the frames reading (or writing) the FIFO
+    """
+    return [length for (register, is_read, length) in transport.accesses
+            if register == RC522.REG_FIFO_DATA and is_read == read]
+
+
+def test_read_block_fills_and_drains_the_fifo_in_one_frame(manager, transport):
+    assert manager.read_block(4)[0] == manager.STATUS_OK  # authenticated, sector 1 in the image
+
+    transport.reset_counters()
+    assert manager.reader.read_block(5)[0] == manager.STATUS_OK
+
+    # READ + CRC_A in one write, the 16 bytes of the block in one read (an address byte per byte, and a final 0)
+    assert fifo_frames(transport, False) == [1 + 4]
+    assert fifo_frames(transport, True) == [RC522.MAX_LEN + 1]
+
+
+def test_write_block_sends_the_block_in_one_frame(manager, transport):
+    assert manager.read_block(4)[0] == manager.STATUS_OK  # authenticated
+
+    transport.reset_counters()
+    assert manager.reader.write_block(4, bytes(range(16))) == manager.STATUS_OK
+
+    # WRITE + CRC_A, then the 16 bytes + CRC_A; the ACKs are 4 bits long
+    assert fifo_frames(transport, False) == [1 + 4, 1 + 18]
+    assert fifo_frames(transport, True) == [1 + 1, 1 + 1]
+
+
+def test_fast_read_of_a_full_fifo():
+    simulator = MFRC522Simulator(tags=[NTAGTag(uid=bytes.fromhex("04112233445566"), model="NTAG215")])
+    transport = RecordingTransport(simulator)
+    manager = RC522Manager(transport=transport)
+    assert manager.presence_scan()[0] == manager.STATUS_OK
+    reader = UltralightReader(manager)
+    assert reader.identify() == reader.STATUS_OK
+
+    transport.reset_counters()
+    (status, data) = reader.read_pages(0, RC522.FAST_READ_MAX_PAGES)
+
+    # 15 pages + CRC_A, 62 of the 64 bytes of the FIFO, drained by a single frame
+    length = RC522.FAST_READ_MAX_PAGES * RC522.PAGE_SIZE
+    assert status == reader.STATUS_OK and len(data) == length
+    assert fifo_frames(transport, True) == [length + 2 + 1]
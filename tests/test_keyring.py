@@ -0,0 +1,48 @@
+import json
+
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareClassicTag, KeyRing, KeyHintCache
+
+KEY_B = bytes.fromhex("a0a1a2a3a4a5")
+
+
+def test_hints_are_saved_on_flush_without_keys(tmp_path):
+    path = tmp_path / "hints.json"
+    key_ring = KeyRing([(RC522.ACT_AUTH_A, b"\x00" * 6), (RC522.ACT_AUTH_B, KEY_B)], hints=KeyHintCache(str(path)))
+
+    key_ring.remember(b"\x12\x34\x56\x78", 1, RC522.ACT_AUTH_B, KEY_B)
+    assert not path.exists()
+
+    key_ring.flush()
+    content = path.read_text()
+    assert KEY_B.hex() not in content
+    assert json.loads(content) == [["12345678/1", RC522.ACT_AUTH_B, 1]]
+
+    reloaded = KeyRing(key_ring.candidates, hints=KeyHintCache(str(path)))
+    assert reloaded.candidates_for(b"\x12\x34\x56\x78", 1)[0] == (RC522.ACT_AUTH_B, tuple(KEY_B))
+
+
+def test_stale_and_old_hints_are_ignored(tmp_path):
+    path = tmp_path / "hints.json"
+    path.write_text(json.dumps([["12345678/1", RC522.ACT_AUTH_B, "0123456789abcdef"],
+                                ["12345678/2", RC522.ACT_AUTH_B, 7]]))
+    key_ring = KeyRing([(RC522.ACT_AUTH_A, b"\x00" * 6), (RC522.ACT_AUTH_B, KEY_B)], hints=KeyHintCache(str(path)))
+
+    assert len(key_ring.hints) == 1
+    assert key_ring.candidates_for(b"\x12\x34\x56\x78", 2) == key_ring.candidates
+
+
+def test_manager_saves_hints_when_the_field_is_empty(tmp_path):
+    path = tmp_path / "hints.json"
+    tag = MifareClassicTag(uid=b"\x12\x34\x56\x78")
+    simulator = MFRC522Simulator(tags=[tag])
+    manager = RC522Manager(transport=simulator)
+    manager.set_key_ring(KeyRing([(RC522.ACT_AUTH_B, KEY_B), (RC522.ACT_AUTH_A, b"\xff" * 6)],
+                                 hints=KeyHintCache(str(path))))
+
+    (status, uid) = manager.presence_scan()
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+    assert not path.exists()
+
+    simulator.remove_tag(tag)
+    assert manager.presence_scan()[0] == manager.STATUS_NO_TAG_ERR
+    assert json.loads(path.read_text()) == [["12345678/1", RC522.ACT_AUTH_A, 1]]
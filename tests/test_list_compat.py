@@ -0,0 +1,52 @@
+import pytest
+
+from rpi_rc522 import RC522Manager
+
+from conftest import UID
+
+
+@pytest.fixture
+def compat_manager(manager):
+    manager.list_compat = True
+    return manager
+
+
+def test_bytes(manager):
+    (status, uid_data) = manager.presence_scan()
+    assert status == manager.STATUS_OK and isinstance(uid_data, bytes) and uid_data[:4] == UID
+    assert isinstance(manager.uid, bytes)
+
+    assert manager.write_block(4, list(range(16))) == manager.STATUS_OK
+    (status, data) = manager.read_block(4)
+    assert status == manager.STATUS_OK and isinstance(data, bytes) and data == bytes(range(16))
+
+    (status, image) = manager.dump(2)
+    assert status == manager.STATUS_OK and isinstance(image, bytearray) and len(image) == 2 * 4 * 16
+    assert image[4 * 16:5 * 16] == bytes(range(16))
+
+
+def test_list_compat(compat_manager):
+    manager = compat_manager
+    (status, uid_data) = manager.presence_scan()
+    assert status == manager.STATUS_OK and uid_data[:4] == list(UID)
+    # The UID attribute is not converted
+    assert isinstance(manager.uid, bytes)
+
+    assert manager.write_block(4, bytes(range(16))) == manager.STATUS_OK
+    assert manager.read_block(4) == (manager.STATUS_OK, list(range(16)))
+
+    (status, image) = manager.dump(2)
+    assert status == manager.STATUS_OK and len(image) == 2 * 4
+    assert all(isinstance(block, list) and len(block) == 16 for block in image)
+    assert image[4] == list(range(16))
+
+    # The image in the list form is accepted back, None placeholders are filled from it
+    assert manager.write_blocks({5: [None, 0x1A]}, image=image) == manager.STATUS_OK
+    assert manager.read_block(5) == (manager.STATUS_OK, [0x00, 0x1A] + [0x00] * 14)
+
+
+@pytest.mark.parametrize(("compat", "empty"), [(False, b""), (True, [])])
+def test_no_tag(simulator, compat, empty):
+    manager = RC522Manager(transport=simulator, list_compat=compat)
+    simulator.remove_tag(simulator.tags[0])
+    assert manager.scan(scan_once=True) == (manager.STATUS_NO_TAG_ERR, empty)
@@ -0,0 +1,111 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, Metrics, prometheus_text
+
+from conftest import UID, count
+
+
+def test_observe():
+    metrics = Metrics()
+    metrics.observe("read", 0, 0.0007)
+    metrics.observe("read", 0, 0.003)
+    metrics.observe("read", 2, 1.0, "timeout")
+    metrics.count_error("crc", "crc_mismatch")
+
+    snapshot = metrics.snapshot()
+    read = snapshot["operations"]["read"]
+    assert read["count"] == 3
+    assert read["errors"] == {"timeout": 1}
+    assert read["latency_sum_s"] == pytest.approx(1.0037)
+    assert (read["latency_buckets"][0.0005], read["latency_buckets"][0.001], read["latency_buckets"][0.005]) == (0, 1, 2)
+    assert (read["latency_buckets"][0.25], read["latency_buckets"]["+Inf"]) == (2, 3)
+    assert snapshot["operations"]["crc"] == {"count": 0, "errors": {"crc_mismatch": 1}, "latency_sum_s": 0.0,
+                                             "latency_buckets": {**{bound: 0 for bound in Metrics.LATENCY_BUCKETS_S},
+                                                                 "+Inf": 0}}
+
+    metrics.reset()
+    assert metrics.snapshot()["operations"] == {}
+
+
+@pytest.mark.parametrize(("status", "last_error", "timed_out", "cause"), [
+    (0, 0x00, False, None),
+    (1, 0x00, False, "no_tag"),
+    (2, 0x00, True, "timeout"),
+    (2, 0x08, False, "collision"),
+    (2, 0x02, False, "parity"),
+    (2, 0x01, False, "protocol"),
+    (2, 0x11, False, "buffer_overflow"),
+    (2, 0x00, False, "invalid_response"),
+])
+def test_error_cause(status, last_error, timed_out, cause):
+    assert Metrics.error_cause(status, last_error, timed_out) == cause
+
+
+def test_instrumented_operations(manager, metrics, transport):
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+    assert manager.write_block(4, bytes(range(16))) == manager.STATUS_OK
+
+    for operation in ("reqa", "anticollision", "select", "auth", "read", "write"):
+        assert count(metrics, operation) >= 1
+    assert all(not values["errors"] for values in metrics.snapshot()["operations"].values())
+    # Every driver call is counted once, as by MeteredTransport
+    assert metrics.snapshot()["spi"]["transactions"] == transport.transactions
+
+    manager.reader.restart_crypto()
+    assert manager.presence_scan()[0] == manager.STATUS_OK
+    manager.reader.transport.transport.remove_tag(manager.reader.transport.transport.tags[0])
+    assert manager.presence_scan()[0] == manager.STATUS_NO_TAG_ERR
+    assert metrics.snapshot()["operations"]["reqa"]["errors"] == {"no_tag": 1}
+
+
+def test_hooks_and_exceptions():
+    class BrokenTransport(MFRC522Simulator):
+        broken = False
+
+        def transfer_frames(self, frames) -> bytes:
+            if self.broken:
+                raise OSError("SPI transfer failed")
+            return super().transfer_frames(frames)
+
+    transport = BrokenTransport()
+    metrics = Metrics()
+    manager = RC522Manager(transport=transport, metrics=metrics)
+    observed = []
+
+    def hook(*args):
+        observed.append(args)
+
+    metrics.add_hook(hook)
+
+    assert manager.reader.request_tag()[0] == manager.STATUS_NO_TAG_ERR
+    assert [(operation, status, cause) for (operation, status, _, cause) in observed] == [("reqa", 1, "no_tag")]
+
+    transport.broken = True
+    with pytest.raises(OSError):
+        manager.reader.request_tag()
+    assert observed[-1][0] == "reqa" and observed[-1][3] == "exception"
+
+    metrics.remove_hook(hook)
+    with pytest.raises(OSError):
+        manager.reader.request_tag()
+    assert len(observed) == 2
+    assert metrics.snapshot()["operations"]["reqa"]["errors"] == {"no_tag": 1, "exception": 2}
+
+
+def test_prometheus_text():
+    door = Metrics(labels={"reader": "door"})
+    desk = Metrics(labels={"reader": 'de"sk'})
+    door.observe("read", 0, 0.002)
+    desk.observe("read", 1, 0.02, "no_tag")
+    door.count_spi(5)
+
+    text = prometheus_text([door, desk], prefix="nfc")
+
+    assert "# TYPE nfc_operations_total counter" in text
+    assert "# TYPE nfc_operation_duration_seconds histogram" in text
+    assert 'nfc_operations_total{reader="door",operation="read"} 1' in text
+    assert 'nfc_errors_total{reader="de\\"sk",operation="read",cause="no_tag"} 1' in text
+    assert 'nfc_operation_duration_seconds_bucket{reader="door",operation="read",le="0.002"} 1' in text
+    assert 'nfc_spi_bytes_total{reader="door"} 5' in text
+    assert text.endswith("\n")
+    assert door.prometheus() == prometheus_text([door])
@@ -0,0 +1,83 @@
+import time
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics, PresenceTracker, TagEvent
+
+from conftest import UID, count
+
+OTHER_UID = bytes.fromhex("cafebabe")
+
+
+def kinds(events: list[TagEvent]) -> list[tuple[str, bytes]]:
+    return [(event.kind, event.uid) for event in events]
+
+
+def test_tracker_debounces_the_departures():
+    tracker = PresenceTracker(departure_misses=2, reader="door")
+
+    events = tracker.update(UID)
+    assert kinds(events) == [(TagEvent.ARRIVED, UID)] and events[0].reader == "door"
+    assert tracker.update(UID) == []
+    assert tracker.update(None) == []  # a single missed answer
+    assert tracker.update(UID) == []
+    assert tracker.update(None) == []
+    assert kinds(tracker.update(None)) == [(TagEvent.DEPARTED, UID)]
+    assert tracker.uid is None
+
+    # A tag replacing another one without a scan in between
+    tracker.update(UID)
+    assert kinds(tracker.update(OTHER_UID)) == [(TagEvent.DEPARTED, UID), (TagEvent.ARRIVED, OTHER_UID)]
+
+
+def test_presence_scan_keeps_the_tag_selected(manager, metrics):
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+    image = manager.image
+    (anticollisions, reads) = (count(metrics, "anticollision"), count(metrics, "read"))
+
+    for _ in range(5):
+        assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    # The parked tag is selected again directly, and its image is kept
+    assert count(metrics, "anticollision") == anticollisions
+    assert count(metrics, "halt") >= 5
+    assert manager.image is image
+    manager.set_auth()
+    assert manager.read_block(5)[0] == manager.STATUS_OK
+    assert count(metrics, "read") == reads
+
+
+def test_presence_scan_follows_a_tag_swap(simulator, classic_tag, manager):
+    other = MifareClassicTag(uid=OTHER_UID)
+    simulator.remove_tag(classic_tag)
+    simulator.add_tag(other)
+    time.sleep(simulator.timing.power_up_s)
+
+    assert manager.presence_scan() == (manager.STATUS_OK, OTHER_UID)
+    assert manager.image.uid == OTHER_UID
+
+    simulator.remove_tag(other)
+    assert manager.presence_scan() == (manager.STATUS_NO_TAG_ERR, b"")
+    assert manager.image is None
+
+
+def test_watch():
+    tag = MifareClassicTag(uid=UID)
+    simulator = MFRC522Simulator(tags=[tag])
+    metrics = Metrics()
+    manager = RC522Manager(transport=simulator, metrics=metrics)
+    events = manager.watch(scan_interval=0.001, departure_misses=2)
+
+    event = next(events)
+    assert (event.kind, event.uid) == (TagEvent.ARRIVED, UID)
+    # The arrived tag is selected
+    manager.set_auth()
+    assert manager.write_block(4, bytes(range(16))) == manager.STATUS_OK
+
+    simulator.remove_tag(tag)
+    event = next(events)
+    assert (event.kind, event.uid) == (TagEvent.DEPARTED, UID)
+    simulator.add_tag(tag)
+    event = next(events)
+    assert (event.kind, event.uid) == (TagEvent.ARRIVED, UID)
+    manager.set_auth()
+    assert manager.read_block(4) == (manager.STATUS_OK, bytes(range(16)))
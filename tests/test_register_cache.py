@@ -0,0 +1,57 @@
+import pytest
+
+from rpi_rc522 import RC522, RC522Manager
+
+from conftest import RecordingTransport
+
+
+@pytest.fixture
+def transport(simulator):
+    return RecordingTransport(simulator)
+
+
+def test_host_owned_registers_are_read_from_the_cache(manager, transport):
+    for _ in range(2):
+        # A whole session: halt, WUPA, anti-collision, select, auth and read
+        transport.reset_counters()
+        assert manager.presence_scan() == (manager.STATUS_OK, bytes.fromhex("12345678"))
+        assert manager.read_block(1)[0] == manager.STATUS_OK
+
+        # The configuration is never read back: the transactions are only the commands and their polling
+        assert transport.transactions > 0
+        assert transport.reads(RC522.HOST_OWNED_REGISTERS) == 0
+
+
+def test_soft_reset_clears_the_cache(manager, transport):
+    transport.reset_counters()
+    manager.reader.restart_crypto()
+    assert transport.reads(RC522.HOST_OWNED_REGISTERS) == 0
+
+    # Each soft reset brings the registers back to their reset value: TxControlReg is read again to turn the antenna on
+    transactions = []
+    for _ in range(2):
+        transport.reset_counters()
+        manager.reader.restart_crypto(soft_reset=True)
+        assert transport.reads(RC522.HOST_OWNED_REGISTERS) == 1
+        assert transport.reads({RC522.REG_TX_CONTROL}) == 1
+        transactions.append(transport.transactions)
+    assert transactions[0] == transactions[1] == len(transport.accesses)
+
+    assert manager.scan(scan_once=True)[0] == manager.STATUS_OK
+
+
+def test_writes_go_through_to_the_chip(simulator, transport):
+    RC522Manager(transport=transport)
+
+    assert simulator.regs[RC522.REG_MODE] == 0x3D
+    assert simulator.regs[RC522.REG_TX_AUTO] == 0x40
+    assert simulator.regs[RC522.REG_TIMER_MODE] == 0x80 | (RC522.TIMER_PRESCALER >> 8)
+    assert simulator.regs[RC522.REG_TX_CONTROL] & 0x03 == 0x03
+
+    # A write is sent even when the cached value is the same
+    reader = RC522(transport=transport)
+    transport.reset_counters()
+    reader.restart_crypto()
+    reader.restart_crypto()
+    assert transport.writes(RC522.REG_BIT_FRAMING) >= 2
+    assert simulator.regs[RC522.REG_BIT_FRAMING] == 0x00
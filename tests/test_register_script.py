@@ -0,0 +1,73 @@
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareClassicTag, Transport
+from rpi_rc522.rc522 import RegisterScript
+
+from conftest import UID, RecordingTransport
+
+
+class FrameTransport(Transport):
+    """
+    Transport with only transfer(): transfer_frames() falls back to a transfer per frame.
+    """
+
+    def __init__(self, simulator: MFRC522Simulator):
+        self.simulator = simulator
+        self.transfers = 0
+
+    def transfer(self, data) -> bytes:
+        self.transfers += 1
+        return self.simulator.transfer(data)
+
+    def set_reset(self, value: int):
+        self.simulator.set_reset(value)
+
+
+def build_script() -> RegisterScript:
+    script = RegisterScript()
+    script.write(RC522.REG_TIMER_RELOAD_L, 0x5A)
+    script.write_burst(RC522.REG_FIFO_DATA, b"\x01\x02\x03")
+    script.read(RC522.REG_TIMER_RELOAD_L)
+    script.read(RC522.REG_FIFO_LEVEL)
+    script.read_burst(RC522.REG_FIFO_DATA, 3)
+    script.read(RC522.REG_VERSION)
+    return script
+
+
+def test_script_results():
+    script = build_script()
+
+    assert len(script.frames) == 6
+    assert script.writes == [(RC522.REG_TIMER_RELOAD_L, 0x5A)]
+    rx = MFRC522Simulator().transfer_frames(script.frames)
+    assert len(rx) == sum(len(frame) for frame in script.frames)
+    assert script.results(rx) == [0x5A, 3, 1, 2, 3, MFRC522Simulator.VERSION]
+
+
+def test_default_transfer_frames():
+    transport = FrameTransport(MFRC522Simulator())
+    script = build_script()
+
+    assert script.results(transport.transfer_frames(script.frames)) == [0x5A, 3, 1, 2, 3, MFRC522Simulator.VERSION]
+    assert transport.transfers == len(script.frames)
+
+
+def test_reader_over_a_transport_without_batches():
+    transport = FrameTransport(MFRC522Simulator(tags=[MifareClassicTag(uid=UID)]))
+    manager = RC522Manager(transport=transport)
+
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.write_block(4, bytes(range(16))) == manager.STATUS_OK
+    assert manager.reader.read_block(4) == (manager.STATUS_OK, bytes(range(16)))
+
+
+def test_commands_are_started_in_one_transaction(manager, simulator):
+    transport = RecordingTransport(simulator)
+    manager.reader.transport = transport
+    assert manager.auth(4) == manager.STATUS_OK
+
+    transport.reset_counters()
+    assert manager.reader.read_block(4)[0] == manager.STATUS_OK
+
+    # Start (IRQ enable, IRQ clear, FIFO flush, idle, FIFO data, command, StartSend) and end (StartSend off, error,
+    # FIFO level, control) of the command: 11 frames in 2 driver calls
+    assert len(transport.accesses) - transport.transactions == (7 - 1) + (4 - 1)
@@ -0,0 +1,65 @@
+import pytest
+
+from rpi_rc522 import RC522
+
+from conftest import UID, RecordingTransport
+
+
+@pytest.fixture
+def transport(simulator):
+    return RecordingTransport(simulator)
+
+
+@pytest.fixture
+def reader(manager):
+    """
+    RC522 with the tag selected and its sector 1 authenticated.
+    """
+    assert manager.auth(4) == manager.STATUS_OK
+    return manager.reader
+
+
+def test_restart_crypto_halts_the_tag(reader, simulator, transport):
+    assert simulator.regs[RC522.REG_STATUS_2] & 0x08  # MFCrypto1On
+    sleep_s = reader.sleep_s
+    transport.reset_counters()
+
+    reader.restart_crypto()
+
+    assert not simulator.regs[RC522.REG_STATUS_2] & 0x08
+    assert (reader.uid, reader.sak) == (None, None)
+    # The chip stays configured and the field stays on: no register is read back, no wait for the tags to power up
+    assert transport.reads(RC522.HOST_OWNED_REGISTERS) == 0
+    assert simulator.regs[RC522.REG_TX_CONTROL] & 0x03 == 0x03
+    assert reader.sleep_s == sleep_s
+
+    # The halted tag answers only WUPA
+    assert reader.request_tag(RC522.ACT_REQ_IDL)[0] == RC522.STATUS_NO_TAG_ERR
+    assert reader.request_tag(RC522.ACT_REQ_ALL)[0] == RC522.STATUS_OK
+    assert reader.select_any_tag() == (RC522.STATUS_OK, UID)
+
+
+def test_restart_crypto_with_soft_reset(reader, simulator, transport):
+    sleep_s = reader.sleep_s
+    transport.reset_counters()
+
+    reader.restart_crypto(soft_reset=True)
+
+    assert not simulator.regs[RC522.REG_STATUS_2] & 0x08
+    assert (reader.uid, reader.sak) == (None, None)
+    # The field went off and on: the tag is powered up again and answers REQA
+    assert reader.sleep_s - sleep_s >= RC522.FIELD_ON_DELAY_S
+    assert reader.request_tag(RC522.ACT_REQ_IDL)[0] == RC522.STATUS_OK
+    assert reader.select_any_tag() == (RC522.STATUS_OK, UID)
+
+
+def test_scan_after_a_session(manager):
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+
+    # scan() ends the session with restart_crypto() and finds the halted tag with WUPA
+    for _ in range(3):
+        (status, uid_data) = manager.scan(scan_once=True)
+        assert status == manager.STATUS_OK and uid_data[:4] == UID
+        assert manager.select_tag(uid_data) == manager.STATUS_OK
+        manager.set_auth()
+        assert manager.read_block(4)[0] == manager.STATUS_OK
@@ -0,0 +1,53 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, MifareUltralightTag, PollScheduler, TagEvent
+
+from conftest import UID
+
+UL_UID = bytes.fromhex("04112233445566")
+
+
+def build_readers(*tags) -> dict[str, RC522Manager]:
+    names = ("door", "desk", "gate")
+    return {name: RC522Manager(transport=MFRC522Simulator(tags=[tag] if tag is not None else []))
+            for (name, tag) in zip(names, tags)}
+
+
+def test_poll_serves_each_reader_once_per_round():
+    scheduler = PollScheduler(build_readers(MifareClassicTag(uid=UID), None, MifareUltralightTag(uid=UL_UID)),
+                              scan_interval=0)
+
+    results = scheduler.poll()
+    assert list(results) == ["door", "desk", "gate"]
+    assert results["door"] == (scheduler.STATUS_OK, UID + bytes((0x12 ^ 0x34 ^ 0x56 ^ 0x78,)))
+    assert results["desk"][0] == scheduler.STATUS_NO_TAG_ERR
+    assert results["gate"][0] == scheduler.STATUS_OK and results["gate"][1][0] == 0x88  # cascade tag
+
+    # The reader served first rotates
+    assert list(scheduler.poll()) == ["desk", "gate", "door"]
+    assert list(scheduler.poll()) == ["gate", "door", "desk"]
+    assert scheduler.rounds == 3
+
+
+def test_readers_as_a_list():
+    scheduler = PollScheduler([RC522Manager(transport=MFRC522Simulator()) for _ in range(2)])
+    assert sorted(scheduler.poll()) == ["0", "1"]
+
+    with pytest.raises(ValueError):
+        PollScheduler([])
+
+
+def test_events_of_several_readers():
+    door_tag = MifareClassicTag(uid=UID)
+    readers = build_readers(door_tag, None, MifareUltralightTag(uid=UL_UID))
+    events = PollScheduler(readers, scan_interval=0).events(departure_misses=1)
+
+    arrived = {next(events), next(events)}
+    assert {(event.kind, event.reader, event.uid) for event in arrived} == {
+        (TagEvent.ARRIVED, "door", UID),
+        (TagEvent.ARRIVED, "gate", UL_UID),  # the 7 bytes UID, resolved by the selection
+    }
+
+    readers["door"].reader.transport.remove_tag(door_tag)
+    event = next(events)
+    assert (event.kind, event.reader, event.uid) == (TagEvent.DEPARTED, "door", UID)
@@ -0,0 +1,51 @@
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics
+
+from conftest import UID, count
+
+
+def test_one_auth_per_sector(manager, metrics):
+    for block_number in (4, 5, 6, 7):
+        assert manager.auth(block_number) == manager.STATUS_OK
+    assert count(metrics, "auth") == 1
+
+    # A single Crypto1 session: going back to sector 1 authenticates it again
+    assert manager.auth(8) == manager.STATUS_OK
+    assert manager.auth(4) == manager.STATUS_OK
+    assert count(metrics, "auth") == 3
+
+    assert manager.auth(4, force=True) == manager.STATUS_OK
+    assert count(metrics, "auth") == 4
+
+
+def test_new_auth_info_authenticates_again(manager, metrics):
+    assert manager.auth(4) == manager.STATUS_OK
+    manager.set_auth(RC522.ACT_AUTH_B)
+    assert manager.auth(4) == manager.STATUS_OK
+    assert manager.auth(5) == manager.STATUS_OK
+    assert count(metrics, "auth") == 2
+
+
+def test_failed_auth_ends_the_session(manager, metrics):
+    assert manager.auth(4) == manager.STATUS_OK
+    manager.set_auth(key=bytes(6))
+    assert manager.auth(4) != manager.STATUS_OK
+    assert manager.last_auth_data is None
+
+    # The tag is back to IDLE: select it again, the next auth is not skipped
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.auth(4) == manager.STATUS_OK
+    assert count(metrics, "auth") == 3
+
+
+def test_dump_of_a_4k_tag_authenticates_each_sector_once():
+    metrics = Metrics()
+    manager = RC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag(uid=UID, size=4096)]), metrics=metrics)
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+
+    (status, data) = manager.dump(40)
+
+    assert status == manager.STATUS_OK and len(data) == 4096
+    assert count(metrics, "auth") == 40
+    assert count(metrics, "read") == 256
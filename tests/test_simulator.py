@@ -0,0 +1,101 @@
+import time
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, MeteredTransport, TimingModel
+
+from conftest import UID
+
+
+def read_register(transport, register: int) -> int:
+    return transport.transfer(bytes((((register << 1) & 0x7E) | 0x80, 0)))[1]
+
+
+def write_register(transport, register: int, value: int):
+    transport.transfer(bytes(((register << 1) & 0x7E, value)))
+
+
+def test_registers():
+    simulator = MFRC522Simulator()
+
+    assert read_register(simulator, simulator.REG_VERSION) == simulator.VERSION
+    assert read_register(simulator, simulator.REG_MODE) == simulator.RESET_VALUES[simulator.REG_MODE]
+
+    write_register(simulator, simulator.REG_TIMER_RELOAD_L, 0xA5)
+    assert read_register(simulator, simulator.REG_TIMER_RELOAD_L) == 0xA5
+    # Read-only registers ignore the writes
+    write_register(simulator, simulator.REG_VERSION, 0x00)
+    assert read_register(simulator, simulator.REG_VERSION) == simulator.VERSION
+
+
+def test_fifo_burst_access():
+    simulator = MFRC522Simulator()
+    data = bytes(range(1, 11))
+
+    simulator.transfer(bytes(((simulator.REG_FIFO_DATA << 1) & 0x7E,)) + data)
+    assert read_register(simulator, simulator.REG_FIFO_LEVEL) == len(data)
+
+    address = ((simulator.REG_FIFO_DATA << 1) & 0x7E) | 0x80
+    assert simulator.transfer(bytes((address,)) * len(data) + b"\x00")[1:] == data
+    assert read_register(simulator, simulator.REG_FIFO_LEVEL) == 0
+
+
+def test_metered_transport_counts_a_batch_once():
+    transport = MeteredTransport(MFRC522Simulator())
+    version = bytes((((MFRC522Simulator.REG_VERSION << 1) & 0x7E) | 0x80, 0))
+
+    assert transport.transfer(version)[1] == MFRC522Simulator.VERSION
+    assert transport.transfer_frames([version] * 3) == bytes((0, MFRC522Simulator.VERSION)) * 3
+    assert (transport.transactions, transport.bytes) == (2, 8)
+
+    transport.reset_counters()
+    assert (transport.transactions, transport.bytes, transport.bus_s) == (0, 0, 0.0)
+
+
+def test_tags_enter_and_leave_the_field():
+    tag = MifareClassicTag(uid=UID)
+    simulator = MFRC522Simulator()
+    manager = RC522Manager(transport=simulator)
+
+    assert manager.presence_scan()[0] == manager.STATUS_NO_TAG_ERR
+    for _ in range(2):
+        simulator.add_tag(tag)
+        time.sleep(simulator.timing.power_up_s)  # the tag answers once powered up by the field
+        assert manager.presence_scan() == (manager.STATUS_OK, UID)
+        simulator.remove_tag(tag)
+        assert manager.presence_scan()[0] == manager.STATUS_NO_TAG_ERR
+
+
+def test_wrong_key_fails_the_authentication():
+    tag = MifareClassicTag(uid=UID)
+    manager = RC522Manager(transport=MFRC522Simulator(tags=[tag]))
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+
+    manager.set_auth(key=bytes(6))
+    assert manager.read_block(4)[0] != manager.STATUS_OK
+
+    # The tag went back to IDLE after the failed authentication: it must be selected again
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.read_block(4) == (manager.STATUS_OK, bytes(16))
+
+
+def test_timing_model():
+    timing = TimingModel(spi_speed=1000000, transfer_overhead_s=15e-6)
+    assert timing.spi_time(2) == 15e-6 + 16e-6
+    assert TimingModel.instant().spi_time(64) == 0.0
+
+    # The instant model runs a whole dump without waiting for the RF or the EEPROM
+    manager = RC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag(uid=UID)], timing=TimingModel.instant()))
+    start = time.perf_counter()
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.dump(16)[0] == manager.STATUS_OK
+    assert time.perf_counter() - start < 1.0
+
+
+def test_spi_clock_above_the_maximum_corrupts_the_reads():
+    simulator = MFRC522Simulator(max_spi_speed=4000000)
+
+    simulator.set_speed(4000000)
+    assert all(read_register(simulator, simulator.REG_VERSION) == simulator.VERSION for _ in range(50))
+    simulator.set_speed(8000000)
+    assert any(read_register(simulator, simulator.REG_VERSION) != simulator.VERSION for _ in range(50))
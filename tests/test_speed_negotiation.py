@@ -0,0 +1,58 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, MeteredTransport, Transport
+
+from conftest import UID
+
+
+@pytest.mark.parametrize(("margin_steps", "expected"), [(0, 4000000), (1, 2000000), (5, 1000000)])
+def test_negotiate_speed_margin(margin_steps, expected):
+    simulator = MFRC522Simulator(tags=[MifareClassicTag(uid=UID)], max_spi_speed=4000000)
+    manager = RC522Manager(transport=simulator)
+
+    assert manager.reader.negotiate_speed(margin_steps=margin_steps) == expected
+    assert simulator.speed == expected
+    assert manager.reader.spi_clock_hz > 0
+
+    # The reader is re-initialized after the failed step
+    (status, uid_data) = manager.scan(scan_once=True)
+    assert status == manager.STATUS_OK and uid_data[:4] == UID
+    assert manager.select_tag(uid_data) == manager.STATUS_OK
+    manager.set_auth()
+    assert manager.read_block(4) == (manager.STATUS_OK, bytes(16))
+
+
+def test_negotiate_speed_limits():
+    simulator = MFRC522Simulator()
+    reader = RC522Manager(transport=simulator).reader
+
+    # No step fails: the highest one is kept without margin
+    assert reader.negotiate_speed(max_speed=5000000, self_test=True) == 5000000
+    assert reader.negotiate_speed() == 10000000
+    # The steps below the current clock are not tried
+    assert reader.negotiate_speed(steps=(1000000, 2000000)) == 10000000
+
+
+def test_negotiate_speed_unsupported():
+    class FixedClockTransport(Transport):
+        def __init__(self, transport):
+            self.transport = transport
+
+        def transfer(self, data):
+            return self.transport.transfer(data)
+
+        def set_reset(self, value):
+            self.transport.set_reset(value)
+
+    reader = RC522Manager(transport=FixedClockTransport(MFRC522Simulator())).reader
+    with pytest.raises(ValueError):
+        reader.negotiate_speed()
+
+
+def test_auto_speed():
+    simulator = MFRC522Simulator(max_spi_speed=5000000)
+    transport = MeteredTransport(simulator)
+    manager = RC522Manager(transport=transport, auto_speed=True)
+
+    assert transport.speed == 4000000
+    assert manager.reader.spi_clock_hz is not None
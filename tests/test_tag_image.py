@@ -0,0 +1,43 @@
+from rpi_rc522 import RC522, TagImage
+
+from conftest import UID, count
+
+
+def test_first_read_loads_the_sector(manager, metrics):
+    assert manager.write_block(9, bytes(range(16))) == manager.STATUS_OK
+    auths = count(metrics, "auth")
+    reads = count(metrics, "read")
+
+    # Block 9 is in the image after the write, the other blocks of sector 2 are loaded by the first read
+    assert manager.read_block(8) == (manager.STATUS_OK, bytes(16))
+    assert count(metrics, "read") == reads + 3
+    assert all(manager.image.has_block(block_number) for block_number in range(8, 12))
+    assert not manager.image.has_block(12)
+
+    assert manager.read_block(9) == (manager.STATUS_OK, bytes(range(16)))
+    assert manager.read_block(10) == (manager.STATUS_OK, bytes(16))
+    assert manager.read_block(11)[0] == manager.STATUS_OK
+    assert count(metrics, "read") == reads + 3
+    assert count(metrics, "auth") == auths
+
+
+def test_dump_reads_each_block_once(manager, metrics):
+    (status, data) = manager.dump(16)
+
+    assert status == manager.STATUS_OK
+    assert data[:4] == UID
+    assert count(metrics, "read") == 64
+    assert count(metrics, "auth") == 16
+    assert manager.dump(16) == (status, data)
+    assert count(metrics, "read") == 64
+
+
+def test_image_without_loader():
+    image = TagImage(UID, sectors_number=1)
+    image.set_block(1, bytes(range(16)))
+
+    assert image.read_block(1) == (RC522.STATUS_OK, bytes(range(16)))
+    assert image.read_block(2) == (RC522.STATUS_ERR, None)
+    assert image.sector(0) == (RC522.STATUS_ERR, None)
+    image.invalidate(1)
+    assert image.get_block(1) is None
@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+from rpi_rc522 import RC522, MFRC522Simulator, MifareClassicTag, Metrics
+
+from conftest import UID, RecordingTransport
+
+
+def reload_value(period_ms: float) -> int:
+    return math.ceil(period_ms / 1000 * RC522.CHIP_CLOCK / (2 * RC522.TIMER_PRESCALER + 1)) - 1
+
+
+def reload_writes(transport: RecordingTransport) -> int:
+    return transport.writes(RC522.REG_TIMER_RELOAD_H) + transport.writes(RC522.REG_TIMER_RELOAD_L)
+
+
+def programmed_reload(simulator: MFRC522Simulator) -> int:
+    return (simulator.regs[RC522.REG_TIMER_RELOAD_H] << 8) | simulator.regs[RC522.REG_TIMER_RELOAD_L]
+
+
+def select(timeout_profiles=None, metrics=None) -> (RC522, MFRC522Simulator, RecordingTransport):
+    simulator = MFRC522Simulator(tags=[MifareClassicTag(uid=UID)])
+    transport = RecordingTransport(simulator)
+    reader = RC522(transport=transport, metrics=metrics, timeout_profiles=timeout_profiles)
+    assert reader.request_tag(RC522.ACT_REQ_ALL)[0] == reader.STATUS_OK
+    assert reader.select_any_tag() == (reader.STATUS_OK, UID)
+    assert reader.auth(RC522.ACT_AUTH_A, 4, [0xFF] * 6, UID) == reader.STATUS_OK
+    return reader, simulator, transport
+
+
+def test_reload_is_reprogrammed_only_when_the_profile_changes():
+    (reader, simulator, transport) = select()
+    assert programmed_reload(simulator) == reload_value(RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_TRANSCEIVE])
+
+    transport.reset_counters()
+    assert reader.read_block(4)[0] == reader.STATUS_OK
+    assert reader.read_block(5)[0] == reader.STATUS_OK
+    assert reload_writes(transport) == 0
+
+    # transceive -> write for the second phase of the write
+    assert reader.write_block(4, bytes(range(16))) == reader.STATUS_OK
+    assert reload_writes(transport) == 1
+    assert programmed_reload(simulator) == reload_value(RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_WRITE])
+
+    # write -> transceive, then no change
+    assert reader.read_block(4) == (reader.STATUS_OK, bytes(range(16)))
+    assert reader.read_block(4)[0] == reader.STATUS_OK
+    assert reload_writes(transport) == 2
+    assert programmed_reload(simulator) == reload_value(RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_TRANSCEIVE])
+
+
+def test_request_profile():
+    (reader, simulator, transport) = select()
+    reader.restart_crypto()
+
+    transport.reset_counters()
+    assert reader.request_tag(RC522.ACT_REQ_ALL)[0] == reader.STATUS_OK
+    # The tag is READY and does not answer again: the request fails after the 1 ms period
+    assert reader.request_tag(RC522.ACT_REQ_ALL)[0] == reader.STATUS_NO_TAG_ERR
+    assert reload_writes(transport) == 1
+    assert programmed_reload(simulator) == reload_value(RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_REQUEST])
+
+
+@pytest.mark.parametrize(("write_ms", "status"), [(30.0, RC522.STATUS_OK), (2.0, RC522.STATUS_ERR)])
+def test_timeout_profiles_override(write_ms, status):
+    metrics = Metrics()
+    (reader, simulator, transport) = select({RC522.TIMEOUT_WRITE: write_ms}, metrics)
+    assert reader.timeout_profiles[RC522.TIMEOUT_WRITE] == write_ms
+    assert reader.timeout_profiles[RC522.TIMEOUT_TRANSCEIVE] == RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_TRANSCEIVE]
+
+    # The simulated tag programs its EEPROM in 4 ms: a 2 ms period expires before the ACK
+    assert reader.write_block(4, bytes(range(16))) == status
+    assert programmed_reload(simulator) == reload_value(write_ms)
+    if status != reader.STATUS_OK:
+        assert metrics.snapshot()["operations"]["write"]["errors"]
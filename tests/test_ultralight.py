@@ -0,0 +1,102 @@
+import pytest
+
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareUltralightTag, NTAGTag, UltralightReader, Metrics
+
+from conftest import count
+
+NTAG_UID = bytes.fromhex("04112233445566")
+
+
+def select(tag, metrics=None) -> UltralightReader:
+    manager = RC522Manager(transport=MFRC522Simulator(tags=[tag]), metrics=metrics)
+    (status, uid) = manager.presence_scan()
+    assert (status, uid) == (manager.STATUS_OK, NTAG_UID)
+    return UltralightReader(manager)
+
+
+def test_identify_ntag():
+    reader = select(NTAGTag(uid=NTAG_UID, model="NTAG215"))
+
+    assert reader.identify() == reader.STATUS_OK
+    assert (reader.name, reader.pages_number, reader.fast_read) == ("NTAG215", 135, True)
+    assert reader.version[2] == 0x04 and reader.version[6] == 0x11
+
+
+def test_identify_ultralight_without_get_version():
+    reader = select(MifareUltralightTag(uid=NTAG_UID))
+
+    assert reader.identify() == reader.STATUS_OK
+    assert (reader.name, reader.pages_number, reader.fast_read) == ("MIFARE Ultralight", 16, False)
+    assert reader.version is None
+    # The tag was selected again after the unsupported GET_VERSION
+    assert reader.read_pages(0, 1)[0] == reader.STATUS_OK
+
+
+def test_ntag215_dump_in_fast_read_chunks():
+    metrics = Metrics()
+    tag = NTAGTag(uid=NTAG_UID, model="NTAG215")
+    reader = select(tag, metrics)
+
+    (status, data) = reader.dump()
+
+    assert status == reader.STATUS_OK
+    assert len(data) == 135 * RC522.PAGE_SIZE
+    assert count(metrics, "fast_read") == -(-135 // RC522.FAST_READ_MAX_PAGES) == 9
+    assert count(metrics, "read") == 0
+    assert data[:3] == NTAG_UID[:3]
+    assert data[16:135 * 4 - 8] == tag.memory[16:135 * 4 - 8]  # PWD and PACK read as 0
+
+
+def test_ultralight_reads_4_pages_at_a_time():
+    metrics = Metrics()
+    tag = MifareUltralightTag(uid=NTAG_UID, data=bytes(range(64)))
+    reader = select(tag, metrics)
+
+    (status, data) = reader.read_pages(2, 6)
+
+    assert status == reader.STATUS_OK
+    assert data == bytes(tag.memory[8:32])
+    assert count(metrics, "read") == 2
+    assert count(metrics, "fast_read") == 0
+
+    # READ rolls over to page 0 at the end of the memory: only the requested pages are returned
+    assert reader.read_pages(14, 2) == (reader.STATUS_OK, bytes(tag.memory[56:64]))
+
+
+def test_write_page():
+    metrics = Metrics()
+    tag = NTAGTag(uid=NTAG_UID, model="NTAG213")
+    reader = select(tag, metrics)
+
+    assert reader.write_page(5, b"abcd") == reader.STATUS_OK
+    assert reader.write_page(6, b"efgh", compat=True) == reader.STATUS_OK
+    assert reader.write_pages(7, b"ijklmnop") == reader.STATUS_OK
+
+    assert reader.read_pages(5, 4) == (reader.STATUS_OK, b"abcdefghijklmnop")
+    assert bytes(tag.memory[20:36]) == b"abcdefghijklmnop"
+    assert count(metrics, "write_page") == 3
+    assert count(metrics, "write") == 1  # COMPATIBILITY_WRITE
+
+
+def test_write_page_checks_the_length():
+    reader = select(NTAGTag(uid=NTAG_UID, model="NTAG213"))
+
+    with pytest.raises(ValueError):
+        reader.write_page(5, b"abc")
+    with pytest.raises(ValueError):
+        reader.write_pages(5, b"abcde")
+
+
+def test_read_counter_disabled():
+    reader = select(NTAGTag(uid=NTAG_UID, model="NTAG213"))
+
+    assert reader.read_counter() == (reader.STATUS_ERR, None)
+
+
+def test_read_counter_enabled():
+    tag = NTAGTag(uid=NTAG_UID, model="NTAG213", counter_enabled=True)
+    reader = select(tag)
+
+    assert reader.read_pages(4, 1)[0] == reader.STATUS_OK
+    assert reader.read_counter() == (reader.STATUS_OK, 1)
+    assert reader.read_counter() == (reader.STATUS_OK, tag.counter)
@@ -0,0 +1,58 @@
+import pytest
+
+from rpi_rc522 import get_value_block, parse_value_block
+
+from conftest import count
+
+
+def test_value_block_format():
+    block = get_value_block(-75, 4)
+    assert block == bytes.fromhex("b5ffffff4a000000b5ffffff04fb04fb")
+    assert parse_value_block(block) == (-75, 4)
+    assert parse_value_block(bytes(16)) is None
+
+
+def test_value_operations(manager, metrics):
+    assert manager.write_value(4, 100) == manager.STATUS_OK
+    assert manager.read_value(4) == (manager.STATUS_OK, 100)
+
+    assert manager.decrement(4, 25) == manager.STATUS_OK
+    assert manager.increment(4, 5) == manager.STATUS_OK
+    assert manager.restore(4, 5) == manager.STATUS_OK
+
+    # The results are in the image after the transfers: nothing is read again
+    reads = count(metrics, "read")
+    assert manager.read_value(4) == (manager.STATUS_OK, 80)
+    assert manager.read_value(5) == (manager.STATUS_OK, 80)
+    assert count(metrics, "read") == reads
+    assert manager.image.get_block(5) == get_value_block(80, 4)
+
+    # The tag agrees with the image, reloaded a sector at a time
+    manager.image.invalidate()
+    assert manager.read_value(4) == (manager.STATUS_OK, 80)
+    assert manager.read_value(5) == (manager.STATUS_OK, 80)
+    assert count(metrics, "read") == reads + 4
+
+
+def test_transfer_to_another_block(manager):
+    assert manager.write_value(4, 10) == manager.STATUS_OK
+    assert manager.increment(4, 7, transfer_block=6) == manager.STATUS_OK
+
+    manager.image.invalidate()
+    assert manager.read_value(4) == (manager.STATUS_OK, 10)
+    assert manager.read_value(6) == (manager.STATUS_OK, 17)
+
+
+def test_invalid_value_operations(manager):
+    assert manager.write_value(4, 10) == manager.STATUS_OK
+
+    with pytest.raises(ValueError):
+        manager.increment(4, -1)
+    with pytest.raises(ValueError):
+        manager.decrement(4, -1)
+    with pytest.raises(ValueError):
+        manager.restore(4, 8)  # another sector
+
+    assert manager.write_block(5, bytes(range(16))) == manager.STATUS_OK
+    assert manager.read_value(5) == (manager.STATUS_ERR, None)
+    assert manager.increment(5, 1) == manager.STATUS_ERR  # not a value block
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from rpi_rc522 import RC522, RC522Manager, MFRC522Simulator, MifareClassicTag
+
+from conftest import UID, RecordingTransport
+
+STRATEGIES = [RC522.WAIT_SLEEP, RC522.WAIT_SPIN, RC522.WAIT_HYBRID, RC522.WAIT_IRQ]
+
+
+def build_manager(wait_strategy: int, tags=()) -> (RC522Manager, RecordingTransport):
+    transport = RecordingTransport(MFRC522Simulator(tags=tags))
+    return RC522Manager(transport=transport, wait_strategy=wait_strategy), transport
+
+
+@pytest.mark.parametrize("wait_strategy", STRATEGIES)
+def test_operations(wait_strategy):
+    (manager, transport) = build_manager(wait_strategy, [MifareClassicTag(uid=UID)])
+
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    sleep_s = manager.reader.sleep_s  # the field turned on by the initialization
+    assert manager.write_block(4, bytes(range(16))) == manager.STATUS_OK
+    assert manager.reader.read_block(4) == (manager.STATUS_OK, bytes(range(16)))
+
+    # The write waits 4 ms for the EEPROM: only the spin never sleeps
+    assert (manager.reader.sleep_s == sleep_s) == (wait_strategy == RC522.WAIT_SPIN)
+
+
+@pytest.mark.parametrize("wait_strategy", STRATEGIES)
+def test_empty_field_fails_at_the_deadline(wait_strategy):
+    (manager, transport) = build_manager(wait_strategy)
+
+    start = time.perf_counter()
+    assert manager.reader.request_tag()[0] == manager.STATUS_NO_TAG_ERR
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    # The chip timer of the request profile expires first, the host deadline is only a guard
+    assert elapsed_ms >= RC522.TIMEOUT_PROFILES_MS[RC522.TIMEOUT_REQUEST]
+    assert elapsed_ms < 100
+
+
+def test_irq_wakes_up_without_polling():
+    (manager, transport) = build_manager(RC522.WAIT_IRQ, [MifareClassicTag(uid=UID)])
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+
+    transport.reset_counters()
+    assert manager.reader.write_block(4, bytes(range(16))) == manager.STATUS_OK
+
+    # ComIrqReg is read once per phase of the write, after the edge of the IRQ pin
+    assert transport.reads({RC522.REG_COMM_IRQ}) == 2
+
+
+def test_spin_polls_until_the_completion():
+    (manager, transport) = build_manager(RC522.WAIT_SPIN, [MifareClassicTag(uid=UID)])
+    assert manager.presence_scan() == (manager.STATUS_OK, UID)
+    manager.set_auth()
+    assert manager.read_block(4)[0] == manager.STATUS_OK
+
+    transport.reset_counters()
+    sleep_s = manager.reader.sleep_s
+    assert manager.reader.write_block(4, bytes(range(16))) == manager.STATUS_OK
+
+    assert transport.reads({RC522.REG_COMM_IRQ}) > 2
+    assert manager.reader.sleep_s == sleep_s
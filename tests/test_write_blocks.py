@@ -0,0 +1,31 @@
+import pytest
+
+from rpi_rc522 import RC522Manager, MFRC522Simulator, MifareClassicTag, Metrics
+
+
+def writes(metrics: Metrics) -> int:
+    return metrics.snapshot()["operations"].get("write", {}).get("count", 0)
+
+
+@pytest.mark.parametrize("list_compat", [False, True])
+def test_unchanged_blocks_are_not_written(list_compat):
+    metrics = Metrics()
+    manager = RC522Manager(transport=MFRC522Simulator(tags=[MifareClassicTag(uid=bytes.fromhex("12345678"))]),
+                           metrics=metrics, list_compat=list_compat)
+    (status, uid_data) = manager.scan(scan_once=True)
+    assert manager.select_tag(uid_data) == manager.STATUS_OK
+    manager.set_auth()
+    (status, image) = manager.dump(1)
+    assert status == manager.STATUS_OK
+
+    if list_compat:
+        unchanged = {1: image[1], 2: list(image[2])}
+    else:
+        unchanged = {1: image[16:32], 2: list(image[32:48])}
+    assert manager.write_blocks(unchanged, image=image) == manager.STATUS_OK
+    assert writes(metrics) == 0
+
+    assert manager.write_blocks({1: bytes(range(16)), 2: [None, 0xAB]}, image=image) == manager.STATUS_OK
+    assert writes(metrics) == 2
+    assert bytes(image[1] if list_compat else image[16:32]) == bytes(range(16))
+    assert manager.read_block(2)[1][1] == 0xAB